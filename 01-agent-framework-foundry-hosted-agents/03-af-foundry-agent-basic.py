@@ -14,15 +14,19 @@ Prereqs (roughly):
 """
 
 import os
+import sys
 import asyncio
+from pathlib import Path
 from dotenv import load_dotenv
 
-from azure.identity.aio import DefaultAzureCredential
-from azure.ai.agents.aio import AgentsClient
-
 # Agent Framework adapter that wraps Foundry Agent Service as an "agent" you can run
 from agent_framework.azure import AzureAIAgentClient
 
+from agent_registry import AgentRegistry
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root: foundry_clients
+from foundry_clients import aclose_all, get_async_agents_client
+
 
 load_dotenv()
 
@@ -39,35 +43,55 @@ async def main() -> None:
     if not model_deployment:
         raise ValueError("Missing MODEL_DEPLOYMENT_NAME (or AZURE_OPENAI_DEPLOYMENT_NAME).")
 
-    # DefaultAzureCredential works locally (Azure CLI / VS Code / etc.) and in Azure (Managed Identity)
-    async with DefaultAzureCredential() as credential:
+    # The shared DefaultAzureCredential works locally (Azure CLI / VS Code / etc.) and in Azure
+    # (Managed Identity); the factory also supplies a pooled keep-alive transport
+    try:
         # AgentsClient talks to Foundry Agent Service (classic) at the *project endpoint*
-        async with AgentsClient(endpoint=project_endpoint, credential=credential) as agents_client:
+        # It is shared by the process, so it is not entered as a context manager:
+        # aclose_all() below closes it once
+        agents_client = get_async_agents_client(project_endpoint)
+        # Look up (or create once) the service-side agent for this exact definition,
+        # instead of creating and deleting it on every run
+        registry = AgentRegistry(agents_client, endpoint=project_endpoint)
+
+        async def run(agent_id):
             # AzureAIAgentClient is the Agent Framework wrapper around the Foundry Agent Service agent lifecycle
             #
-            # should_cleanup_agent=True:
-            #   - creates an agent in the service
+            # agent_id + should_cleanup_agent=False:
+            #   - uses the registered agent in the service
             #   - creates/uses a thread in the service
-            #   - deletes the created agent when the context exits
+            #   - leaves the agent in place for the next run
             async with AzureAIAgentClient(
                 agents_client=agents_client,
+                agent_id=agent_id,
                 model_deployment_name=model_deployment,
-                should_cleanup_agent=True,
+                should_cleanup_agent=False,
             ).create_agent(
                 name="Quickstart",
                 instructions="Be concise.",
             ) as agent:
                 # Run executes server-side in Foundry Agent Service
-                result = await agent.run("Write a haiku about Azure AI Foundry.")
-                print(result)
-
-                # Optional: if your AF version exposes thread/messages helpers, this is where you'd fetch them.
-                # (Different preview builds expose slightly different helpers.)
-                # Example patterns you might have available:
-                #   msgs = await agent.get_messages()
-                #   print(msgs)
-                #
-                # If not, you can always drop down to agents_client.messages.list(thread_id=...) if you have thread_id.
+                return await agent.run("Write a haiku about Azure AI Foundry.")
+
+        # If the agent was deleted in the service since it was registered, the run's 404
+        # makes the registry forget it, resolve the definition again and retry once
+        result = await registry.arun_with_agent(
+            run,
+            model=model_deployment,
+            name="Quickstart",
+            instructions="Be concise.",
+        )
+        print(result)
+
+        # Optional: if your AF version exposes thread/messages helpers, this is where you'd fetch them.
+        # (Different preview builds expose slightly different helpers.)
+        # Example patterns you might have available:
+        #   msgs = await agent.get_messages()
+        #   print(msgs)
+        #
+        # If not, you can always drop down to agents_client.messages.list(thread_id=...) if you have thread_id.
+    finally:
+        await aclose_all()
 
 
 if __name__ == "__main__":
@@ -4,14 +4,24 @@ Foundry Agent Service (classic) quickstart-style client.
 Key point:
 - The agent + thread + run live in Foundry Agent Service.
 - This script is still the *client/orchestrator* that drives those API calls.
+- The agent definition is reused across runs (see agent_registry.py) and the thread
+  comes from a pre-created pool, so a warm run starts with a single runs call.
+- The run is consumed as an event stream (see run_executor.py): deltas print as they
+  arrive and only this run's messages are collected, instead of polling + messages.list.
 """
 
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
-from azure.ai.agents import AgentsClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import CodeInterpreterTool
+from azure.ai.agents.models import CodeInterpreterTool, ThreadMessageOptions
+
+from agent_registry import AgentRegistry
+from run_executor import StreamingRunExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root: foundry_clients
+from foundry_clients import close_all, get_agents_client, pool_stats
 
 load_dotenv()
 
@@ -27,53 +37,71 @@ def main() -> None:
     if not model_deployment:
         raise ValueError("Missing MODEL_DEPLOYMENT_NAME (or AZURE_OPENAI_DEPLOYMENT_NAME).")
 
-    # DefaultAzureCredential will work locally (Azure CLI), and also in Azure (Managed Identity)
-    credential = DefaultAzureCredential()
-
-    # Use AgentsClient directly (not AIProjectClient.agents)
-    agents_client = AgentsClient(endpoint=project_endpoint, credential=credential)
-
-    with agents_client:
-        # Optional: attach built-in tool(s) that execute in the service.
-        code_interpreter = CodeInterpreterTool()
-
-        # Create agent in the service
-        agent = agents_client.create_agent(
-            model=model_deployment,
-            name="Quickstart",
-            instructions="Be concise.",
-            tools=code_interpreter.definitions,
-            tool_resources=code_interpreter.resources,
+    # Use AgentsClient directly (not AIProjectClient.agents), from the shared factory:
+    # one DefaultAzureCredential (Azure CLI locally, Managed Identity in Azure) and a
+    # pooled keep-alive transport reused by every client in the process. The client is
+    # shared, so it is not used as a context manager: exiting one would close it for
+    # every other caller. close_all() below closes it once
+    agents_client = get_agents_client(project_endpoint)
+
+    # Optional: attach built-in tool(s) that execute in the service.
+    code_interpreter = CodeInterpreterTool()
+
+    registry = AgentRegistry(agents_client, endpoint=project_endpoint)
+
+    # Take a pre-created thread from the pool
+    thread_id = registry.acquire_thread()
+    print(f"Using thread: {thread_id}")
+
+    # Post the user message and start the run in one request (server-side execution),
+    # then follow the run's event stream until it finishes
+    executor = StreamingRunExecutor(
+        agents_client,
+        on_delta=lambda text: print(text, end="", flush=True),
+        on_tool_call=lambda step: print(f"\n[tool call] {step.id}"),
+    )
+
+    def run(agent_id):
+        print(f"Using agent: {agent_id}")
+        return executor.execute(
+            thread_id=thread_id,
+            agent_id=agent_id,
+            additional_messages=[
+                ThreadMessageOptions(role="user", content="Write a haiku about Azure AI Foundry."),
+            ],
         )
-        print(f"Created agent: {agent.id}")
-
-        # Create thread in the service
-        thread = agents_client.threads.create()
-        print(f"Created thread: {thread.id}")
-
-        # Create message in the service
-        agents_client.messages.create(
-            thread_id=thread.id,
-            role="user",
-            content="Write a haiku about Azure AI Foundry.",
-        )
-
-        # Create + process run in the service (server-side execution)
-        run = agents_client.runs.create_and_process(
-            thread_id=thread.id,
-            agent_id=agent.id,
-        )
-        print(f"Run status: {run.status}")
-
-        # Fetch conversation from the service
-        messages = agents_client.messages.list(thread_id=thread.id)
-        for m in messages:
-            # Message content is structured; print the raw for now
-            print(f"{m.role}: {m.content}")
 
-        # Cleanup (optional)
-        # agents_client.delete_agent(agent.id)
-        # agents_client.threads.delete(thread.id)
+    # Reuse the service-side agent if (model, instructions, tools) is unchanged;
+    # otherwise create it once and remember it for the next run. If it was deleted
+    # in the service since, the 404 makes the registry resolve it again
+    result = registry.run_with_agent(
+        run,
+        model=model_deployment,
+        name="Quickstart",
+        instructions="Be concise.",
+        tools=code_interpreter.definitions,
+        tool_resources=code_interpreter.resources,
+    )
+    print()
+    print(f"Run status: {result.status}")
+    if result.first_delta_s is not None:
+        print(f"First delta: {result.first_delta_s:.2f}s, total: {result.total_s:.2f}s")
+
+    # Only the messages this run produced - no need to list the whole thread
+    for m in result.messages:
+        text = " ".join(c.text.value for c in m.text_messages)
+        print(f"{m.role}: {text}")
+
+    # Pre-create threads for the next runs now that this one is done
+    registry.top_up_threads(4)
+    print(f"Connection pool: {pool_stats()}")
+
+    # Cleanup (optional) - the agent is kept for reuse; forget it if you delete it
+    # agents_client.delete_agent(agent_id); registry.forget_agent(agent_id)
+    # agents_client.threads.delete(thread_id)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        close_all()
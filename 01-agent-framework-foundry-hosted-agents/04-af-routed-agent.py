@@ -0,0 +1,32 @@
+import asyncio
+import json
+import logging
+
+from dotenv import load_dotenv
+
+from model_router import ModelRouter
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+PROMPTS = [
+    "Hi there!",
+    "What is the capital of France?",
+    "Explain step by step why the event horizon of a black hole scales linearly with its mass, and derive the formula.",
+]
+
+async def main():
+    # Same env vars as 01-af-standard-agent.py / 02-af-standard-agent-resoning.py,
+    # but the deployment and reasoning_effort are picked per prompt instead of per script.
+    router = ModelRouter.from_env()
+
+    for prompt in PROMPTS:
+        result, decision, latency_ms = await router.run(prompt, instructions="You are professor in astrophysics")
+        print(f"[{decision.label} -> {decision.route.deployment}, {latency_ms:.0f} ms] {prompt}")
+        print(result)
+        print()
+
+    print(json.dumps(router.latency_report(), indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,266 @@
+"""
+Persistent registry of Foundry Agent Service (classic) agents and pre-created threads.
+
+Key point:
+- An agent definition is identified by a content hash of (model, name, instructions, tools,
+  tool_resources), so an agent pointing at stale files or vector stores is not reused.
+- If an agent with that hash already exists in the project it is reused, so short-lived
+  jobs stop paying create_agent/delete_agent on every run.
+- Spare threads are created ahead of time (N single threads.create calls on a small thread
+  pool, off the hot path), so a one-shot run can start with a single
+  runs.create(..., additional_messages=[...]) call.
+
+The hash is also written to the service-side agent metadata, so a fresh machine (empty
+local registry file) still finds agents created elsewhere. An agent deleted on the service
+side is forgotten and resolved again by run_with_agent() when a run gets a 404 for it.
+
+Jobs sharing one registry file take <file>.lock around every read-modify-write, so two
+processes never claim the same spare thread or overwrite each other's changes.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, TypeVar
+
+HASH_METADATA_KEY = "definition_hash"
+LOCK_TIMEOUT_S = 10.0
+LOCK_STALE_S = 30.0  # a lock file this old was left behind by a killed job
+
+T = TypeVar("T")
+
+
+def _as_plain(value: Any) -> Any:
+    """SDK models (tool definitions) expose as_dict(); hash their JSON form."""
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    if isinstance(value, (list, tuple)):
+        return [_as_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _as_plain(v) for k, v in value.items()}
+    return value
+
+
+def definition_hash(
+    model: str, name: str, instructions: str, tools: Any = None, tool_resources: Any = None
+) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "name": name,
+            "instructions": instructions,
+            "tools": _as_plain(tools or []),
+            "tool_resources": _as_plain(tool_resources or {}),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _is_not_found(exc: BaseException | None) -> bool:
+    """True for a 404 from the service, also when wrapped (Agent Framework re-raises SDK errors)."""
+    while exc is not None:
+        status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+        if status == 404:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class AgentRegistry:
+    """Maps definition hashes to service-side agent ids and holds a pool of spare threads.
+
+    Works with the sync ``azure.ai.agents.AgentsClient``; the ``a*`` methods take the
+    async ``azure.ai.agents.aio.AgentsClient`` instead.
+    """
+
+    def __init__(self, agents_client: Any, endpoint: str, path: str | os.PathLike | None = None):
+        self.agents_client = agents_client
+        self.endpoint = endpoint
+        self.path = Path(path or os.getenv("AGENT_REGISTRY_PATH", ".agent-registry.json"))
+        self._load()
+
+    def _load(self) -> None:
+        self._all = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self._state = self._all.setdefault(self.endpoint, {"agents": {}, "threads": []})
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self._all, indent=2))
+        tmp.replace(self.path)
+
+    @contextmanager
+    def _locked(self):
+        """Re-read the file under <file>.lock, yield its state for changes, save them."""
+        lock = self.path.with_suffix(self.path.suffix + ".lock")
+        deadline = time.monotonic() + LOCK_TIMEOUT_S
+        while True:
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - lock.stat().st_mtime > LOCK_STALE_S:
+                        lock.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{lock} is held by another job")
+                time.sleep(0.01)
+        try:
+            self._load()
+            yield self._state
+            self._save()
+        finally:
+            lock.unlink(missing_ok=True)
+
+    def _remember(self, digest: str, agent_id: str) -> str:
+        with self._locked() as state:
+            state["agents"][digest] = agent_id
+        return agent_id
+
+    @staticmethod
+    def _matches(agent: Any, digest: str) -> bool:
+        return (getattr(agent, "metadata", None) or {}).get(HASH_METADATA_KEY) == digest
+
+    # ----- agents -------------------------------------------------------------
+
+    def get_or_create_agent(
+        self,
+        model: str,
+        name: str,
+        instructions: str,
+        tools: Any = None,
+        tool_resources: Any = None,
+        verify: bool = False,
+    ) -> str:
+        """Return the id of an agent matching the definition, creating one only if needed.
+
+        With verify=False a local hit costs zero requests; pass verify=True to confirm
+        the agent still exists (one get_agent call) before reusing it.
+        """
+        digest = definition_hash(model, name, instructions, tools, tool_resources)
+        agent_id = self._state["agents"].get(digest)
+        if agent_id and not verify:
+            return agent_id
+        if agent_id:
+            try:
+                self.agents_client.get_agent(agent_id)
+                return agent_id
+            except Exception:
+                del self._state["agents"][digest]
+
+        for agent in self.agents_client.list_agents():
+            if self._matches(agent, digest):
+                return self._remember(digest, agent.id)
+
+        agent = self.agents_client.create_agent(
+            model=model,
+            name=name,
+            instructions=instructions,
+            tools=tools,
+            tool_resources=tool_resources,
+            metadata={HASH_METADATA_KEY: digest},
+        )
+        return self._remember(digest, agent.id)
+
+    async def aget_or_create_agent(
+        self,
+        model: str,
+        name: str,
+        instructions: str,
+        tools: Any = None,
+        tool_resources: Any = None,
+        verify: bool = False,
+    ) -> str:
+        """Async counterpart of get_or_create_agent for the aio AgentsClient."""
+        digest = definition_hash(model, name, instructions, tools, tool_resources)
+        agent_id = self._state["agents"].get(digest)
+        if agent_id and not verify:
+            return agent_id
+        if agent_id:
+            try:
+                await self.agents_client.get_agent(agent_id)
+                return agent_id
+            except Exception:
+                del self._state["agents"][digest]
+
+        async for agent in self.agents_client.list_agents():
+            if self._matches(agent, digest):
+                return self._remember(digest, agent.id)
+
+        agent = await self.agents_client.create_agent(
+            model=model,
+            name=name,
+            instructions=instructions,
+            tools=tools,
+            tool_resources=tool_resources,
+            metadata={HASH_METADATA_KEY: digest},
+        )
+        return self._remember(digest, agent.id)
+
+    def forget_agent(self, agent_id: str) -> None:
+        with self._locked() as state:
+            state["agents"] = {k: v for k, v in state["agents"].items() if v != agent_id}
+
+    def run_with_agent(self, run: Callable[[str], T], **definition: Any) -> T:
+        """Call run(agent_id) for the agent matching `definition` (get_or_create_agent kwargs).
+
+        If the agent was deleted on the service side, the run fails with a 404: the stale id
+        is forgotten, the definition resolved again (found or re-created) and the run retried once.
+        """
+        agent_id = self.get_or_create_agent(**definition)
+        try:
+            return run(agent_id)
+        except Exception as exc:
+            if not _is_not_found(exc):
+                raise
+        self.forget_agent(agent_id)
+        return run(self.get_or_create_agent(**definition))
+
+    async def arun_with_agent(self, run: Callable[[str], Awaitable[T]], **definition: Any) -> T:
+        """Async counterpart of run_with_agent for the aio AgentsClient."""
+        agent_id = await self.aget_or_create_agent(**definition)
+        try:
+            return await run(agent_id)
+        except Exception as exc:
+            if not _is_not_found(exc):
+                raise
+        self.forget_agent(agent_id)
+        return await run(await self.aget_or_create_agent(**definition))
+
+    # ----- threads ------------------------------------------------------------
+
+    def prefetch_threads(self, count: int, max_workers: int = 8) -> list[str]:
+        """Create `count` empty threads and add them to the pool.
+
+        There is no batch endpoint for threads: this is `count` single threads.create calls,
+        run concurrently on up to `max_workers` pool threads.
+        """
+        if count <= 0:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, count)) as pool:
+            thread_ids = [t.id for t in pool.map(lambda _: self.agents_client.threads.create(), range(count))]
+        with self._locked() as state:
+            state["threads"].extend(thread_ids)
+        return thread_ids
+
+    def acquire_thread(self) -> str:
+        """Claim a pre-created thread id, creating one inline only if the pool is empty."""
+        with self._locked() as state:
+            thread_id = state["threads"].pop(0) if state["threads"] else None
+        return thread_id or self.agents_client.threads.create().id
+
+    def top_up_threads(self, target: int) -> list[str]:
+        """Refill the pool to `target` spare threads; call it off the hot path (after a run)."""
+        return self.prefetch_threads(target - self.spare_threads())
+
+    def spare_threads(self) -> int:
+        self._load()
+        return len(self._state["threads"])
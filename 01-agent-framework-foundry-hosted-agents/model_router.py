@@ -0,0 +1,265 @@
+"""
+Latency-aware routing between the chat and reasoning deployments.
+
+Key point:
+- Scripts 01/02 pick a deployment by hand-editing code, so a "hi" pays reasoning-model latency.
+- This module classifies each prompt with a cheap local heuristic (no model call),
+  picks the deployment + reasoning_effort that fits the latency SLO, and falls back
+  to the other deployment when the preferred one is slow or throttled.
+
+Env vars (same ones the 01/02 scripts use):
+  - AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_VERSION, AZURE_OPENAI_API_KEY
+  - AZURE_OPENAI_DEPLOYMENT_NAME            (fast chat route)
+  - AZURE_OPENAI_REASONING_DEPLOYMENT_NAME  (reasoning route)
+  - ROUTER_CHAT_SLO_MS / ROUTER_REASONING_SLO_MS (optional, defaults below)
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger("model_router")
+
+CHAT = "chat"
+REASONING = "reasoning"
+
+# Words that usually mean "think before answering". Cheap to check, good enough to keep
+# greetings and lookups off the reasoning deployment.
+_REASONING_HINTS = re.compile(
+    r"\b(why|prove|derive|explain|analy[sz]e|compare|step[- ]by[- ]step|plan|design|"
+    r"debug|optimi[sz]e|calculate|estimate|trade-?offs?|algorithm|refactor)\b",
+    re.IGNORECASE,
+)
+_CODE_OR_MATH = re.compile(r"```|[=+*/^<>]{2,}|\d+\s*[-+*/^]\s*\d+|\bdef\b|\bclass\b")
+
+
+@dataclass
+class Route:
+    """A deployment the router can send a request to."""
+
+    name: str
+    deployment: str
+    slo_ms: float
+    reasoning_effort: str | None = None
+    # Hard ceiling for a single call before we give up and fall back.
+    timeout_s: float = 60.0
+
+
+@dataclass
+class RouteStats:
+    """Rolling latency window and throttle state for one route."""
+
+    window: deque = field(default_factory=lambda: deque(maxlen=50))
+    throttled_until: float = 0.0
+    calls: int = 0
+    failures: int = 0
+
+    def record(self, latency_ms: float) -> None:
+        self.calls += 1
+        self.window.append(latency_ms)
+
+    def p95_ms(self) -> float | None:
+        if len(self.window) < 5:
+            return None
+        ordered = sorted(self.window)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def is_throttled(self) -> bool:
+        return time.monotonic() < self.throttled_until
+
+
+@dataclass
+class RouteDecision:
+    """What the router picked for one prompt, and why."""
+
+    route: Route
+    label: str
+    reason: str
+    fallback: Route | None = None
+
+
+def classify(prompt: str) -> str:
+    """Return CHAT or REASONING for a prompt using local heuristics only."""
+    text = prompt.strip()
+    if not text:
+        return CHAT
+    words = len(text.split())
+    score = 0
+    if words > 60:
+        score += 2
+    elif words > 25:
+        score += 1
+    score += min(len(_REASONING_HINTS.findall(text)), 2)
+    if _CODE_OR_MATH.search(text):
+        score += 2
+    if text.count("?") > 1:
+        score += 1
+    return REASONING if score >= 2 else CHAT
+
+
+def _is_throttle(exc: BaseException) -> tuple[bool, float]:
+    """Detect an HTTP 429 status anywhere in the exception chain and return its Retry-After (seconds).
+
+    Only the status code counts: a message that merely mentions "429" (an order number, a token count)
+    is not a throttle.
+    """
+    seen = exc
+    while seen is not None:
+        status = getattr(seen, "status_code", None)
+        response = getattr(seen, "response", None)
+        if status is None and response is not None:
+            status = getattr(response, "status_code", None)
+        if status == 429:
+            retry_after = 10.0
+            headers = getattr(response, "headers", None) or {}
+            try:
+                retry_after = float(headers.get("retry-after", retry_after))
+            except (TypeError, ValueError):
+                pass
+            return True, retry_after
+        seen = seen.__cause__ or seen.__context__
+    return False, 0.0
+
+
+class ModelRouter:
+    """Routes prompts between a fast chat deployment and a reasoning deployment."""
+
+    def __init__(self, chat: Route, reasoning: Route, **client_kwargs: Any):
+        self.routes = {CHAT: chat, REASONING: reasoning}
+        self.stats = {CHAT: RouteStats(), REASONING: RouteStats()}
+        self._client_kwargs = client_kwargs
+        self._agents: dict[tuple[str, str], Any] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        chat = Route(
+            name=CHAT,
+            deployment=os.environ["AZURE_OPENAI_DEPLOYMENT_NAME"],
+            slo_ms=float(os.getenv("ROUTER_CHAT_SLO_MS", "2000")),
+        )
+        reasoning = Route(
+            name=REASONING,
+            deployment=os.environ["AZURE_OPENAI_REASONING_DEPLOYMENT_NAME"],
+            slo_ms=float(os.getenv("ROUTER_REASONING_SLO_MS", "8000")),
+            reasoning_effort=os.getenv("ROUTER_REASONING_EFFORT", "minimal"),
+        )
+        return cls(
+            chat,
+            reasoning,
+            endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            api_version=os.environ["AZURE_OPENAI_API_VERSION"],
+            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        )
+
+    def select(self, prompt: str) -> RouteDecision:
+        """Pick a route for the prompt without calling any model."""
+        label = classify(prompt)
+        preferred = self.routes[label]
+        other = self.routes[REASONING if label == CHAT else CHAT]
+        stats, other_stats = self.stats[label], self.stats[other.name]
+
+        if stats.is_throttled():
+            if other_stats.is_throttled():
+                # Both cooling down: run() waits on whichever recovers first rather than bouncing between them
+                first = preferred if stats.throttled_until <= other_stats.throttled_until else other
+                return RouteDecision(first, label, "both routes throttled", fallback=None)
+            return RouteDecision(other, label, f"{preferred.name} throttled", fallback=None)
+        p95 = stats.p95_ms()
+        if p95 is not None and p95 > preferred.slo_ms:
+            other_p95 = other_stats.p95_ms()
+            if not other_stats.is_throttled() and (other_p95 is None or other_p95 < p95):
+                return RouteDecision(
+                    other, label, f"{preferred.name} p95 {p95:.0f}ms > SLO {preferred.slo_ms:.0f}ms", fallback=preferred
+                )
+        return RouteDecision(preferred, label, "classified", fallback=None if other_stats.is_throttled() else other)
+
+    def _agent_for(self, route: Route, instructions: str, name: str):
+        key = (route.name, instructions)
+        agent = self._agents.get(key)
+        if agent is None:
+            from agent_framework.azure import AzureOpenAIResponsesClient
+
+            options: dict[str, Any] = {}
+            if route.reasoning_effort:
+                options["reasoning_effort"] = route.reasoning_effort
+            agent = AzureOpenAIResponsesClient(deployment_name=route.deployment, **self._client_kwargs).create_agent(
+                name=name,
+                instructions=instructions,
+                **options,
+            )
+            self._agents[key] = agent
+        return agent
+
+    async def _call(self, route: Route, prompt: str, instructions: str, name: str):
+        agent = self._agent_for(route, instructions, name)
+        started = time.perf_counter()
+        result = await asyncio.wait_for(agent.run(prompt), timeout=route.timeout_s)
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.stats[route.name].record(latency_ms)
+        return result, latency_ms
+
+    async def run(self, prompt: str, instructions: str, name: str = "routed-agent"):
+        """Route, run and (if needed) fall back once. Returns (result, decision, latency_ms)."""
+        decision = self.select(prompt)
+        attempts = [decision.route] + ([decision.fallback] if decision.fallback else [])
+        wait_s = self.stats[decision.route.name].throttled_until - time.monotonic()
+        if wait_s > 0:
+            logger.warning("route=%s deployment=%s throttled, waiting %.1fs", decision.route.name, decision.route.deployment, wait_s)
+            await asyncio.sleep(wait_s)
+
+        for i, route in enumerate(attempts):
+            try:
+                result, latency_ms = await self._call(route, prompt, instructions, name)
+            except asyncio.TimeoutError:
+                # Count the timeout as a call that took the whole budget, so its p95 rises and
+                # select() stops preferring a route that keeps timing out.
+                self.stats[route.name].record(route.timeout_s * 1000)
+                self.stats[route.name].failures += 1
+                logger.warning("route=%s deployment=%s timed out after %.1fs", route.name, route.deployment, route.timeout_s)
+                if i == len(attempts) - 1:
+                    raise
+                continue
+            except Exception as exc:
+                throttled, retry_after = _is_throttle(exc)
+                if not throttled:
+                    raise
+                self.stats[route.name].failures += 1
+                self.stats[route.name].throttled_until = time.monotonic() + retry_after
+                logger.warning("route=%s deployment=%s throttled, cooling down %.0fs", route.name, route.deployment, retry_after)
+                if i == len(attempts) - 1:
+                    raise
+                continue
+
+            logger.info(
+                "label=%s route=%s deployment=%s effort=%s reason=%r fallback_used=%s latency_ms=%.0f",
+                decision.label,
+                route.name,
+                route.deployment,
+                route.reasoning_effort or "-",
+                decision.reason,
+                i > 0,
+                latency_ms,
+            )
+            return result, decision, latency_ms
+
+        raise RuntimeError("No route available")  # unreachable: the last attempt re-raises
+
+    def latency_report(self) -> dict[str, dict[str, Any]]:
+        """Per-route call counts and latency percentiles for logging/dashboards."""
+        report = {}
+        for name, stats in self.stats.items():
+            ordered = sorted(stats.window)
+            report[name] = {
+                "deployment": self.routes[name].deployment,
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "p50_ms": ordered[len(ordered) // 2] if ordered else None,
+                "p95_ms": stats.p95_ms(),
+                "throttled": stats.is_throttled(),
+            }
+        return report
@@ -0,0 +1,128 @@
+"""
+Event-streamed run execution for Foundry Agent Service (classic).
+
+Key point:
+- runs.create_and_process() polls run status until it finishes, then the caller
+  re-downloads the whole thread with messages.list().
+- This executor consumes the run's event stream instead: text deltas and tool-call
+  steps are surfaced as they happen, and only the messages produced by *this* run
+  are collected (from thread.message.completed events), so no history is re-fetched.
+
+For function tools, call agents_client.enable_auto_function_calls(toolset) first;
+the stream then executes them in-line and their steps show up as tool-call events.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from azure.ai.agents.models import (
+    AgentStreamEvent,
+    MessageDeltaChunk,
+    RunStep,
+    RunStepDeltaChunk,
+    ThreadMessage,
+    ThreadRun,
+)
+
+_TERMINAL_RUN_EVENTS = {
+    AgentStreamEvent.THREAD_RUN_COMPLETED,
+    AgentStreamEvent.THREAD_RUN_FAILED,
+    AgentStreamEvent.THREAD_RUN_CANCELLED,
+    AgentStreamEvent.THREAD_RUN_EXPIRED,
+    AgentStreamEvent.THREAD_RUN_INCOMPLETE,
+}
+
+
+@dataclass
+class RunResult:
+    """Outcome of one streamed run."""
+
+    run: ThreadRun | None = None
+    messages: list[ThreadMessage] = field(default_factory=list)
+    tool_steps: list[RunStep] = field(default_factory=list)
+    first_delta_s: float | None = None
+    total_s: float = 0.0
+
+    @property
+    def status(self) -> str | None:
+        return self.run.status if self.run is not None else None
+
+    @property
+    def text(self) -> str:
+        parts = []
+        for message in self.messages:
+            for content in message.text_messages:
+                parts.append(content.text.value)
+        return "\n".join(parts)
+
+
+class StreamingRunExecutor:
+    """Runs an agent on a thread by consuming the service's event stream.
+
+    Callbacks are optional and run on the calling thread, in event order:
+      on_delta(text)            - assistant text as it is generated
+      on_tool_call(step_or_delta) - tool-call run steps (deltas and completed steps)
+      on_event(event_type, data)  - every raw event, for logging/tracing
+    """
+
+    def __init__(
+        self,
+        agents_client: Any,
+        on_delta: Callable[[str], None] | None = None,
+        on_tool_call: Callable[[Any], None] | None = None,
+        on_event: Callable[[str, Any], None] | None = None,
+    ):
+        self.agents_client = agents_client
+        self.on_delta = on_delta
+        self.on_tool_call = on_tool_call
+        self.on_event = on_event
+
+    def execute(self, thread_id: str, agent_id: str, **run_kwargs: Any) -> RunResult:
+        """Start a run and block until its stream ends.
+
+        run_kwargs go straight to runs.stream (e.g. additional_messages, instructions).
+        """
+        result = RunResult()
+        started = time.perf_counter()
+
+        with self.agents_client.runs.stream(thread_id=thread_id, agent_id=agent_id, **run_kwargs) as stream:
+            for event_type, event_data, _ in stream:
+                if self.on_event is not None:
+                    self.on_event(event_type, event_data)
+
+                if isinstance(event_data, MessageDeltaChunk):
+                    if result.first_delta_s is None:
+                        result.first_delta_s = time.perf_counter() - started
+                    if self.on_delta is not None and event_data.text:
+                        self.on_delta(event_data.text)
+
+                elif isinstance(event_data, RunStepDeltaChunk):
+                    if self.on_tool_call is not None and getattr(event_data.delta.step_details, "tool_calls", None):
+                        self.on_tool_call(event_data)
+
+                elif isinstance(event_data, RunStep):
+                    if event_type == AgentStreamEvent.THREAD_RUN_STEP_COMPLETED and getattr(
+                        event_data.step_details, "tool_calls", None
+                    ):
+                        result.tool_steps.append(event_data)
+                        if self.on_tool_call is not None:
+                            self.on_tool_call(event_data)
+
+                elif isinstance(event_data, ThreadMessage):
+                    if event_type == AgentStreamEvent.THREAD_MESSAGE_COMPLETED and event_data.role == "assistant":
+                        result.messages.append(event_data)
+
+                elif isinstance(event_data, ThreadRun):
+                    result.run = event_data
+                    if event_type in _TERMINAL_RUN_EVENTS:
+                        break
+
+                elif event_type == AgentStreamEvent.ERROR:
+                    raise RuntimeError(f"Run stream error: {event_data}")
+
+                elif event_type == AgentStreamEvent.DONE:
+                    break
+
+        result.total_s = time.perf_counter() - started
+        return result
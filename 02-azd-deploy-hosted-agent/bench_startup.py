@@ -0,0 +1,136 @@
+"""
+Cold-start benchmark for the hosted agent image.
+
+Measures, for a freshly started container:
+  container start -> port 8088 accepting -> first successful /responses reply
+and prints an import-time breakdown of `import main` from `python -X importtime`.
+
+Usage:
+  python bench_startup.py --image my-hosted-agent:c-1234abcd --runs 3
+  python bench_startup.py --build            # build src/my-hosted-agent first
+  python bench_startup.py --imports-only     # just the -X importtime breakdown
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+from deploy_pipeline import AGENT_SOURCE_DIR, content_tag
+
+PORT = 8088
+# The agent reads these at startup; pass through whatever the caller has set
+PASSTHROUGH_ENV = ["AZURE_AI_PROJECT_ENDPOINT", "MODEL_DEPLOYMENT_NAME", "AZURE_CLIENT_ID", "AZURE_TENANT_ID", "AZURE_CLIENT_SECRET"]
+
+
+def _wait_for_port(port: int, deadline: float) -> float:
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return time.monotonic()
+        except OSError:
+            time.sleep(0.02)
+    raise TimeoutError(f"port {port} never accepted connections")
+
+
+def _wait_for_response(port: int, deadline: float) -> float:
+    body = json.dumps({"input": [{"role": "user", "content": "ping"}], "stream": False}).encode()
+    while time.monotonic() < deadline:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/responses", data=body, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as resp:
+                resp.read()
+                return time.monotonic()
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    raise TimeoutError("no successful /responses reply")
+
+
+def measure_once(image: str, timeout_s: float = 120) -> dict[str, float]:
+    env_args = []
+    for name in PASSTHROUGH_ENV:
+        if os.getenv(name):
+            env_args += ["-e", name]
+
+    started = time.monotonic()
+    container_id = subprocess.run(
+        ["docker", "run", "-d", "--rm", "-p", f"{PORT}:{PORT}", *env_args, image],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    try:
+        deadline = started + timeout_s
+        accepting = _wait_for_port(PORT, deadline)
+        responded = _wait_for_response(PORT, deadline)
+    finally:
+        subprocess.run(["docker", "rm", "-f", container_id], capture_output=True)
+
+    return {"port_accepting_s": accepting - started, "first_response_s": responded - started}
+
+
+def import_breakdown(image: str | None, top: int = 15) -> list[tuple[str, float]]:
+    """Cumulative import time (ms) per top-level package for `import main`."""
+    code = "import main"
+    if image:
+        cmd = ["docker", "run", "--rm", "--entrypoint", "python", image, "-X", "importtime", "-c", code]
+        cwd = None
+    else:
+        cmd = ["python", "-X", "importtime", "-c", code]
+        cwd = AGENT_SOURCE_DIR
+    stderr = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd).stderr
+
+    # Lines come in post-order (children before their parent), indented two spaces per
+    # level. A module's cumulative time is charged to its top-level package only where
+    # the package is entered from a different one, so nothing is counted twice.
+    totals: dict[str, float] = defaultdict(float)
+    pending: dict[int, list[tuple[str, float]]] = defaultdict(list)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        package = name.strip().split(".")[0]
+        for child_package, child_ms in pending.pop(depth + 1, []):
+            if child_package != package:
+                totals[child_package] += child_ms
+        pending[depth].append((package, int(cumulative) / 1000))
+    for package, ms in pending[0]:
+        totals[package] += ms
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image", help="image to benchmark (default: the content-tagged local build)")
+    parser.add_argument("--build", action="store_true", help="docker build src/my-hosted-agent first")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--imports-only", action="store_true", help="skip container runs; local -X importtime only")
+    args = parser.parse_args()
+
+    image = args.image or f"my-hosted-agent:{content_tag()}"
+    if args.build:
+        subprocess.run(["docker", "build", "-t", image, str(AGENT_SOURCE_DIR)], check=True)
+
+    if not args.imports_only:
+        results = [measure_once(image) for _ in range(args.runs)]
+        print(f"Cold start ({args.runs} runs, image {image}):")
+        for key in ("port_accepting_s", "first_response_s"):
+            values = [r[key] for r in results]
+            print(f"  {key:<18} median {statistics.median(values):6.2f}s   min {min(values):6.2f}s   max {max(values):6.2f}s")
+
+    print("\n`import main` breakdown (cumulative ms by top-level package):")
+    for package, ms in import_breakdown(None if args.imports_only else image):
+        print(f"  {package:<28} {ms:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
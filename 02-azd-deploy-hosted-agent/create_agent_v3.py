@@ -1,21 +1,28 @@
 import os
-from azure.identity import DefaultAzureCredential
-from azure.ai.projects import AIProjectClient
-from azure.ai.projects.models import (
-    ImageBasedHostedAgentDefinition,
-    ProtocolVersionRecord,
-    AgentProtocol,
-)
+import sys
+import time
+from pathlib import Path
+
+from deploy_pipeline import HostedAgentSpec, content_tag, deploy, image_ref
+from wait_for_agent import wait_for_agent
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root: foundry_clients
+from foundry_clients import get_project_client
 
 # Load from azd environment
 endpoint = "https://ozgurguler-7212-resource.services.ai.azure.com/api/projects/ozgurguler-7212"
 
-# Set up credentials and client
-credential = DefaultAzureCredential()
-client = AIProjectClient(endpoint=endpoint, credential=credential)
+# Shared credential + pooled client
+client = get_project_client(endpoint)
 
 HOSTED_AGENT_NAME = "my-hosted-agent"
-IMAGE_REF = "containervault01.azurecr.io/my-hosted-agent:v8"
+ACR_NAME = "containervault01"
+REPOSITORY = "my-hosted-agent"
+# The echo agent's build context; deploy() builds and pushes it under its content tag
+# (skipped when ACR already has that tag). IMAGE_TAG=v8 deploys an already-pushed tag instead.
+SOURCE_DIR = Path(__file__).resolve().parent / "hosted_agent_app"
+PINNED_TAG = os.getenv("IMAGE_TAG")
+IMAGE_TAG = PINNED_TAG or content_tag(SOURCE_DIR)
 HOSTED_CPU = "1"
 HOSTED_MEMORY = "2Gi"
 CONTAINER_PROTOCOL_VERSION = "v1"
@@ -26,30 +33,39 @@ env_vars = {
 }
 
 print(f"Creating agent version for {HOSTED_AGENT_NAME}")
-print(f"  Image: {IMAGE_REF}")
+print(f"  Image: {image_ref(ACR_NAME, REPOSITORY, IMAGE_TAG)}" + (" (pinned)" if PINNED_TAG else ""))
 print(f"  CPU: {HOSTED_CPU}, Memory: {HOSTED_MEMORY}")
 
-# Create new version with v3 image
-agent_version = client.agents.create_version(
+spec = HostedAgentSpec(
     agent_name=HOSTED_AGENT_NAME,
-    description="v14: Echo agent with correct protocol version v1, v8 image",
-    definition=ImageBasedHostedAgentDefinition(
-        container_protocol_versions=[
-            ProtocolVersionRecord(protocol=AgentProtocol.RESPONSES, version=CONTAINER_PROTOCOL_VERSION)
-        ],
-        cpu=HOSTED_CPU,
-        memory=HOSTED_MEMORY,
-        image=IMAGE_REF,
-        environment_variables=env_vars,
-    ),
+    description=f"Echo agent with protocol version v1, image {IMAGE_TAG}",
+    environment_variables=env_vars,
+    cpu=HOSTED_CPU,
+    memory=HOSTED_MEMORY,
+    protocol_version=CONTAINER_PROTOCOL_VERSION,
 )
+# Build + push (unless pinned or already in ACR), then create the version
+IMAGE_REF, versions, timer = deploy(
+    client,
+    ACR_NAME,
+    REPOSITORY,
+    [spec],
+    source_dir=SOURCE_DIR,
+    start=False,
+    image=image_ref(ACR_NAME, REPOSITORY, PINNED_TAG) if PINNED_TAG else None,
+)
+CREATED_VERSION = versions[HOSTED_AGENT_NAME]
 
-CREATED_VERSION = agent_version.version if hasattr(agent_version, "version") else "?"
-
-print(f"\nCreated agent version: {CREATED_VERSION}")
-print(f"Status: {agent_version.status if hasattr(agent_version, 'status') else 'unknown'}")
+print(f"\nCreated agent version: {CREATED_VERSION} ({IMAGE_REF})")
+print(timer.report())
 
 # Start the agent
 print("\nStarting agent...")
+started_at = time.monotonic()
 client.agents.start(agent_name=HOSTED_AGENT_NAME)
 print("Start command sent. Agent is now deploying.")
+
+# Poll the version we just created until it runs and answers
+readiness = wait_for_agent(client, HOSTED_AGENT_NAME, CREATED_VERSION, deployed_at=started_at)
+print("\nAgent is running!")
+print(readiness.report())
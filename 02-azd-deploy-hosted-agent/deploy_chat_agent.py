@@ -3,54 +3,42 @@ Deploy Chat Agent with Azure OpenAI
 
 This script creates a new hosted agent version with proper environment variables
 for Azure OpenAI connectivity.
+
+The image tag is derived from the content of src/my-hosted-agent (see deploy_pipeline.py),
+so re-running without source changes skips docker build/push entirely.
 """
 
-import subprocess
-from azure.identity import DefaultAzureCredential
-from azure.ai.projects import AIProjectClient
-from azure.ai.projects.models import (
-    ImageBasedHostedAgentDefinition,
-    ProtocolVersionRecord,
-    AgentProtocol,
-)
+import sys
+import time
+from pathlib import Path
+
+from deploy_pipeline import HostedAgentSpec, build_and_push, create_versions, StageTimer
+from wait_for_agent import wait_for_agent
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root: foundry_clients
+from foundry_clients import get_project_client
 
 # Configuration
 PROJECT_ENDPOINT = "https://ozgurguler-7212-resource.services.ai.azure.com/api/projects/ozgurguler-7212"
 HOSTED_AGENT_NAME = "my-hosted-agent"
 ACR_NAME = "aicontainervault01"
-IMAGE_TAG = "chat-v1"  # New tag for chat agent
 
-# Build and push the image first
+timer = StageTimer()
+
+# Build and push the image first (skipped when ACR already has this content tag)
 print("=" * 60)
 print("Step 1: Building and pushing container image")
 print("=" * 60)
 
-IMAGE_REF = f"{ACR_NAME}.azurecr.io/{HOSTED_AGENT_NAME}:{IMAGE_TAG}"
+IMAGE_REF = build_and_push(ACR_NAME, HOSTED_AGENT_NAME, timer=timer)
 print(f"Image: {IMAGE_REF}")
 
-# Build the image
-print("\nBuilding Docker image...")
-subprocess.run([
-    "docker", "build",
-    "-t", f"{HOSTED_AGENT_NAME}:{IMAGE_TAG}",
-    "-t", IMAGE_REF,
-    "./src/my-hosted-agent"
-], check=True)
-
-# Login to ACR and push
-print("\nLogging into ACR...")
-subprocess.run(["az", "acr", "login", "--name", ACR_NAME], check=True)
-
-print("\nPushing image to ACR...")
-subprocess.run(["docker", "push", IMAGE_REF], check=True)
-
 # Create agent version with SDK
 print("\n" + "=" * 60)
 print("Step 2: Creating hosted agent version")
 print("=" * 60)
 
-credential = DefaultAzureCredential()
-client = AIProjectClient(endpoint=PROJECT_ENDPOINT, credential=credential)
+client = get_project_client(PROJECT_ENDPOINT)
 
 # Environment variables for the container
 env_vars = {
@@ -65,30 +53,35 @@ print("Environment variables:")
 for k, v in env_vars.items():
     print(f"  {k}: {v}")
 
-# Create new version
-agent_version = client.agents.create_version(
-    agent_name=HOSTED_AGENT_NAME,
-    description="Chat agent with Azure OpenAI (gpt-5-nano)",
-    definition=ImageBasedHostedAgentDefinition(
-        container_protocol_versions=[
-            ProtocolVersionRecord(protocol=AgentProtocol.RESPONSES, version="v1")
-        ],
-        cpu="1",
-        memory="2Gi",
-        image=IMAGE_REF,
+# Create new version(s) - add more specs here to roll the same image out to several agents
+specs = [
+    HostedAgentSpec(
+        agent_name=HOSTED_AGENT_NAME,
+        description="Chat agent with Azure OpenAI (gpt-5-nano)",
         environment_variables=env_vars,
     ),
-)
+]
+versions = create_versions(client, IMAGE_REF, specs, timer=timer)
 
-version = agent_version.version if hasattr(agent_version, "version") else "?"
+version = versions[HOSTED_AGENT_NAME]
 print(f"\nCreated version: {version}")
-print(f"Status: {agent_version.status if hasattr(agent_version, 'status') else 'unknown'}")
 
 # Start the agent
 print("\n" + "=" * 60)
 print("Step 3: Starting agent")
 print("=" * 60)
 
-client.agents.start(agent_name=HOSTED_AGENT_NAME)
+started_at = time.monotonic()
+with timer.stage("start agent"):
+    client.agents.start(agent_name=HOSTED_AGENT_NAME)
 print("Start command sent. Agent is now deploying.")
+
+# Wait for *this* version to run and answer, then warm it up
+with timer.stage("wait + warmup"):
+    readiness = wait_for_agent(client, HOSTED_AGENT_NAME, version, deployed_at=started_at)
 print(f"\nAgent endpoint: {PROJECT_ENDPOINT}/agents/{HOSTED_AGENT_NAME}/versions/{version}")
+
+print("\nDeploy timings:")
+print(timer.report())
+print("\nReadiness timings:")
+print(readiness.report())
@@ -0,0 +1,255 @@
+"""
+Content-addressed build + parallel deploy pipeline for hosted agents.
+
+- The image tag is a hash of the docker build context (code, requirements.txt, Dockerfile;
+  minus whatever .dockerignore excludes), so an unchanged agent maps to an image that already
+  exists in ACR.
+- Build and push are skipped when ACR already has that tag.
+- `az acr login` runs in parallel with the registry check and `docker build`.
+- Agent versions for several definitions are created concurrently.
+- Every stage is timed and reported at the end.
+"""
+
+import hashlib
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from azure.ai.projects.models import (
+    AgentProtocol,
+    ImageBasedHostedAgentDefinition,
+    ProtocolVersionRecord,
+)
+
+AGENT_SOURCE_DIR = Path(__file__).resolve().parent / "src" / "my-hosted-agent"
+
+# Docker always sends these, even when .dockerignore lists them
+_ALWAYS_SENT = {"Dockerfile", ".dockerignore"}
+
+
+def _glob_regex(pattern: str) -> re.Pattern:
+    """Translate a .dockerignore pattern (Go filepath.Match plus `**`) into a regex."""
+    out, i = [], 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**", i):
+            i += 2
+            if pattern.startswith("/", i):  # "**/" also matches zero directories
+                i += 1
+                out.append("(?:.*/)?")
+            else:
+                out.append(".*")
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end]
+                out.append("[" + ("^" + body[1:] if body.startswith("^") else body) + "]")
+                i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out))
+
+
+def dockerignore_rules(source_dir: str | Path) -> list[tuple[re.Pattern, bool]]:
+    """(pattern, is_exception) pairs from the build context's .dockerignore, in file order."""
+    path = Path(source_dir) / ".dockerignore"
+    if not path.exists():
+        return []
+    rules = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        exception = line.startswith("!")
+        pattern = line[1:].strip() if exception else line
+        # Docker cleans patterns: leading and trailing slashes and "./" do not matter
+        pattern = re.sub(r"(^|/)\./", r"\1", pattern).strip("/")
+        if pattern:
+            rules.append((_glob_regex(pattern), exception))
+    return rules
+
+
+def is_ignored(rel_path: str, rules: list[tuple[re.Pattern, bool]]) -> bool:
+    """Docker semantics: the last matching rule wins; a pattern matching a directory covers its contents."""
+    parts = rel_path.split("/")
+    prefixes = ["/".join(parts[: n + 1]) for n in range(len(parts))]
+    ignored = False
+    for regex, exception in rules:
+        if any(regex.fullmatch(prefix) for prefix in prefixes):
+            ignored = not exception
+    return ignored
+
+
+def content_tag(source_dir: str | Path = AGENT_SOURCE_DIR, prefix: str = "c-") -> str:
+    """Hash every file docker build would send as context (path + bytes) into a short image tag."""
+    root = Path(source_dir)
+    rules = dockerignore_rules(root)
+    digest = hashlib.sha256()
+    for path in sorted(p for p in root.rglob("*") if p.is_file()):
+        rel = path.relative_to(root).as_posix()
+        if rel not in _ALWAYS_SENT and is_ignored(rel, rules):
+            continue
+        digest.update(rel.encode("utf-8") + b"\0")
+        digest.update(path.read_bytes() + b"\0")
+    return prefix + digest.hexdigest()[:12]
+
+
+def image_ref(acr_name: str, repository: str, tag: str) -> str:
+    return f"{acr_name}.azurecr.io/{repository}:{tag}"
+
+
+def image_exists(acr_name: str, repository: str, tag: str) -> bool:
+    """True if ACR already holds repository:tag (no docker login needed)."""
+    result = subprocess.run(
+        ["az", "acr", "repository", "show", "--name", acr_name, "--image", f"{repository}:{tag}", "-o", "none"],
+        capture_output=True,
+        text=True,
+    )
+    return result.returncode == 0
+
+
+@dataclass
+class HostedAgentSpec:
+    """One hosted agent version to create from the built image."""
+
+    agent_name: str
+    description: str
+    environment_variables: dict[str, str] = field(default_factory=dict)
+    cpu: str = "1"
+    memory: str = "2Gi"
+    protocol_version: str = "v1"
+
+    def definition(self, image: str) -> ImageBasedHostedAgentDefinition:
+        return ImageBasedHostedAgentDefinition(
+            container_protocol_versions=[
+                ProtocolVersionRecord(protocol=AgentProtocol.RESPONSES, version=self.protocol_version)
+            ],
+            cpu=self.cpu,
+            memory=self.memory,
+            image=image,
+            environment_variables=self.environment_variables,
+        )
+
+
+class StageTimer:
+    """Collects wall-clock durations per pipeline stage."""
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - started
+
+    def skip(self, name: str) -> None:
+        self.stages[name] = 0.0
+
+    def report(self) -> str:
+        lines = [f"  {name:<24} {seconds:7.2f}s" for name, seconds in self.stages.items()]
+        lines.append(f"  {'total':<24} {time.perf_counter() - self._started:7.2f}s")
+        return "\n".join(lines)
+
+
+def build_and_push(
+    acr_name: str,
+    repository: str,
+    source_dir: str | Path = AGENT_SOURCE_DIR,
+    timer: StageTimer | None = None,
+    force: bool = False,
+) -> str:
+    """Build and push the content-tagged image unless ACR already has it. Returns the image ref."""
+    timer = timer or StageTimer()
+    with timer.stage("hash source"):
+        tag = content_tag(source_dir)
+    ref = image_ref(acr_name, repository, tag)
+
+    # Login is only needed for push, so it runs in the background during the check and build
+    login_started = time.perf_counter()
+    login = subprocess.Popen(["az", "acr", "login", "--name", acr_name], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        with timer.stage("registry check"):
+            exists = not force and image_exists(acr_name, repository, tag)
+        if exists:
+            print(f"Image {ref} already in registry - skipping build and push")
+            timer.skip("docker build")
+            timer.skip("docker push")
+            return ref
+
+        with timer.stage("docker build"):
+            subprocess.run(["docker", "build", "-t", f"{repository}:{tag}", "-t", ref, str(source_dir)], check=True)
+        with timer.stage("wait for acr login"):
+            _, login_err = login.communicate()
+        timer.stages["acr login (parallel)"] = time.perf_counter() - login_started
+        if login.returncode != 0:
+            raise RuntimeError(f"az acr login failed: {login_err.strip()}")
+        with timer.stage("docker push"):
+            subprocess.run(["docker", "push", ref], check=True)
+        return ref
+    finally:
+        # Registry hit, failed check or failed build: don't leave the login process behind
+        if login.poll() is None:
+            login.terminate()
+        if not login.stderr.closed:
+            login.communicate()  # reap it and close the pipe
+
+
+def create_versions(client, image: str, specs: list[HostedAgentSpec], timer: StageTimer | None = None) -> dict[str, str]:
+    """Create one agent version per spec, concurrently. Returns {agent_name: version}."""
+    timer = timer or StageTimer()
+
+    def create(spec: HostedAgentSpec) -> tuple[str, str]:
+        agent_version = client.agents.create_version(
+            agent_name=spec.agent_name,
+            description=spec.description,
+            definition=spec.definition(image),
+        )
+        return spec.agent_name, getattr(agent_version, "version", "?")
+
+    with timer.stage("create versions"):
+        with ThreadPoolExecutor(max_workers=max(1, len(specs))) as pool:
+            return dict(pool.map(create, specs))
+
+
+def deploy(
+    client,
+    acr_name: str,
+    repository: str,
+    specs: list[HostedAgentSpec],
+    source_dir: str | Path = AGENT_SOURCE_DIR,
+    start: bool = True,
+    force_build: bool = False,
+    image: str | None = None,
+) -> tuple[str, dict[str, str], StageTimer]:
+    """Full pipeline: content tag → (build ∥ login) → push → create versions → start.
+
+    Pass `image` to deploy an image that is already in the registry (no hash, build or push).
+    """
+    timer = StageTimer()
+    if image is None:
+        image = build_and_push(acr_name, repository, source_dir, timer=timer, force=force_build)
+    versions = create_versions(client, image, specs, timer=timer)
+    if start:
+        with timer.stage("start agents"):
+            with ThreadPoolExecutor(max_workers=max(1, len(specs))) as pool:
+                list(pool.map(lambda spec: client.agents.start(agent_name=spec.agent_name), specs))
+    return image, versions, timer
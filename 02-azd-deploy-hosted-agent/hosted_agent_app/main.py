@@ -44,11 +44,16 @@ class MyHostedAgent(BaseAgent):
         self,
         name: str = "my-hosted-agent",
         description: str = "A hosted agent running on Azure AI Foundry",
+        stream_delay_s: float | None = None,
         **kwargs
     ):
         super().__init__(name=name, description=description, **kwargs)
         self.model_deployment = os.getenv("MODEL_DEPLOYMENT_NAME", "gpt-4o")
         self.project_endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT", "")
+        # Pause between streamed words (demo pacing); STREAM_DELAY_S=0 turns it off
+        if stream_delay_s is None:
+            stream_delay_s = float(os.getenv("STREAM_DELAY_S", "0.05"))
+        self.stream_delay_s = stream_delay_s
 
     def run(self, request: AgentRunRequest) -> AgentRunResponse:
         """
@@ -106,7 +111,8 @@ class MyHostedAgent(BaseAgent):
             )
 
             # Small delay to simulate streaming
-            await asyncio.sleep(0.05)
+            if self.stream_delay_s > 0:
+                await asyncio.sleep(self.stream_delay_s)
 
         # Final message for thread notification
         final_message = Message(
@@ -0,0 +1,160 @@
+"""
+Hedged chat completions across two Azure OpenAI deployments.
+
+If the primary deployment has not produced its first token within a percentile of
+recent time-to-first-token (TTFT), a second request is started against a backup
+deployment. Whichever produces a token first is streamed; the other is closed.
+The share of hedged requests is capped so the extra spend stays bounded.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator
+
+logger = logging.getLogger("hedging")
+
+
+def _has_token(chunk: Any) -> bool:
+    return bool(chunk.choices and chunk.choices[0].delta.content)
+
+
+class HedgedCompletions:
+    """Drop-in for ``client.chat.completions.create`` with tail-latency hedging."""
+
+    def __init__(
+        self,
+        primary_client: Any,
+        primary_model: str,
+        backup_client: Any,
+        backup_model: str,
+        percentile: float = 0.95,
+        max_hedge_rate: float = 0.05,
+        min_samples: int = 20,
+        initial_delay_s: float = 2.0,
+        window: int = 200,
+    ):
+        self.targets = [(primary_client, primary_model), (backup_client, backup_model)]
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.initial_delay_s = initial_delay_s
+        # Streaming TTFT and non-streaming full latency are tracked separately.
+        self._ttft = {True: deque(maxlen=window), False: deque(maxlen=window)}
+        self._hedged = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, stream: bool = True) -> float:
+        """Seconds to wait for the primary's first token before hedging."""
+        with self._lock:
+            samples = self._ttft[stream]
+            if len(samples) < self.min_samples:
+                return self.initial_delay_s
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            if not self._hedged:
+                return self.max_hedge_rate > 0
+            return sum(self._hedged) / len(self._hedged) < self.max_hedge_rate
+
+    def _record(self, stream: bool, ttft: float | None, hedged: bool) -> None:
+        with self._lock:
+            if ttft is not None:
+                self._ttft[stream].append(ttft)
+            self._hedged.append(hedged)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hedged = sum(self._hedged)
+            total = len(self._hedged)
+        return {"requests": total, "hedged": hedged, "hedge_rate": hedged / total if total else 0.0, "hedge_delay_s": self.hedge_delay()}
+
+    def _start(self, index: int, results: queue.Queue, cancelled: threading.Event, stream: bool, kwargs: dict) -> None:
+        client, model = self.targets[index]
+
+        def worker() -> None:
+            started = time.perf_counter()
+            try:
+                response = client.chat.completions.create(model=model, stream=stream, **kwargs)
+                if not stream:
+                    results.put((index, None, None, [response], time.perf_counter() - started, None))
+                    return
+                buffered = []
+                chunks = iter(response)
+                for chunk in chunks:
+                    buffered.append(chunk)
+                    if cancelled.is_set() or _has_token(chunk):
+                        break
+                if cancelled.is_set():
+                    response.close()
+                    response = chunks = None  # lost the race; closed here
+                results.put((index, response, chunks, buffered, time.perf_counter() - started, None))
+            except Exception as exc:
+                results.put((index, None, None, [], time.perf_counter() - started, exc))
+
+        threading.Thread(target=worker, name=f"hedge-{index}", daemon=True).start()
+
+    def create(self, *, stream: bool = False, **kwargs: Any) -> Any:
+        """Same contract as ``chat.completions.create`` minus ``model`` (chosen per target)."""
+        results: queue.Queue = queue.Queue()
+        cancelled = threading.Event()
+        self._start(0, results, cancelled, stream, kwargs)
+        running, hedged, backup_started = 1, False, False
+        delay = self.hedge_delay(stream)
+
+        try:
+            first = results.get(timeout=delay)
+        except queue.Empty:
+            first = None
+            if self._may_hedge():
+                logger.info("primary TTFT > %.2fs, hedging to %s", delay, self.targets[1][1])
+                self._start(1, results, cancelled, stream, kwargs)
+                running, hedged, backup_started = 2, True, True
+
+        while True:
+            if first is None:
+                first = results.get()
+            index, response, chunks, buffered, ttft, error = first
+            running -= 1
+            if error is None:
+                break
+            if running == 0 and not backup_started:
+                # Primary failed outright: fail over once, regardless of the hedge budget.
+                logger.warning("primary failed (%s), failing over to %s", error, self.targets[1][1])
+                self._start(1, results, cancelled, stream, kwargs)
+                running, backup_started = 1, True
+            elif running == 0:
+                self._record(stream, None, hedged)
+                raise error
+            first = None
+
+        cancelled.set()
+        # Only primary-side TTFT drives the hedge delay; backup wins would skew it low.
+        self._record(stream, ttft if index == 0 else None, hedged)
+        if running:
+            threading.Thread(target=self._close_loser, args=(results,), name="hedge-close", daemon=True).start()
+
+        if not stream:
+            return buffered[0]
+        return self._relay(chunks, buffered)
+
+    @staticmethod
+    def _close_loser(results: queue.Queue) -> None:
+        # Every worker puts exactly one result. The loser either noticed `cancelled` and closed its
+        # stream itself (response is None), or delivered a stream nobody will read: close it here.
+        # The timeout only bounds a loser whose request is still hanging; it closes itself later.
+        try:
+            _, response, _, _, _, _ = results.get(timeout=120)
+        except queue.Empty:
+            return
+        if response is not None:
+            response.close()
+
+    @staticmethod
+    def _relay(chunks: Iterator[Any], buffered: list) -> Iterator[Any]:
+        yield from buffered
+        yield from chunks
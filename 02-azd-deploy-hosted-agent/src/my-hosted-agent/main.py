@@ -1,8 +1,30 @@
 """
 Chatbot Agent - Uses Azure OpenAI gpt-5-nano for responses
+
+Startup note: only agent_framework (plus the stdlib-only profiler hook) is imported at module load. The OpenAI SDK and the
+hosting adapter are imported when first needed, so `import main` stays cheap on cold start.
+Before the hosting adapter starts listening, warmup() fetches the token, opens the
+connection pool to the model endpoint and (optionally) sends one tiny completion, so the
+first user request sees steady-state latency.
+
+PII redaction (redaction.py) is applied to run/run_stream output and to exported span
+content when REDACT_PII=1. It defaults to on whenever
+AZURE_TRACING_GEN_AI_CONTENT_RECORDING_ENABLED is, so recorded content is always scrubbed:
+install_redacted_tracing() has the hosting adapter create its tracer provider with every
+span exporter behind a RedactingSpanExporter.
+
+With THREAD_STORE_DIR set, new threads keep their history in the on-disk append-only
+store (thread_store.py) instead of an in-memory list.
+
+Run from the repo with CASSETTE=<file>, model traffic is recorded/replayed through the
+repo root's cassettes.py; CASSETTE_MODE=replay also skips DefaultAzureCredential.
 """
 
 import os
+import sys
+import threading
+import time
+from pathlib import Path
 from typing import Any, AsyncIterable
 
 from agent_framework import (
@@ -14,8 +36,101 @@ from agent_framework import (
     Role,
     TextContent,
 )
-from azure.ai.agentserver.agentframework import from_agent_framework
-from openai import AzureOpenAI
+
+from profiler import track_request
+
+API_VERSION = "2024-12-01-preview"
+TOKEN_SCOPE = "https://cognitiveservices.azure.com/.default"
+# Refresh the cached token this many seconds before it expires
+TOKEN_REFRESH_MARGIN_S = 300
+
+
+def redaction_enabled() -> bool:
+    recording = os.environ.get("AZURE_TRACING_GEN_AI_CONTENT_RECORDING_ENABLED", "false").lower() == "true"
+    return os.environ.get("REDACT_PII", "1" if recording else "0") == "1"
+
+
+def _span_exporters() -> list:
+    """The span exporters the hosting adapter builds from its env: OTLP, then Application Insights
+    (OTEL_EXPORTER_ENDPOINT, APPLICATIONINSIGHTS_CONNECTION_STRING, else the project's connection)."""
+    exporters = []
+    endpoint = os.environ.get("OTEL_EXPORTER_ENDPOINT")
+    if endpoint:
+        if os.environ.get("OTEL_EXPORTER_OTLP_PROTOCOL", "").lower() in ("http", "http/protobuf", "http/json"):
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        else:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        exporters.append(OTLPSpanExporter(endpoint=endpoint))
+
+    connection_string = os.environ.get("APPLICATIONINSIGHTS_CONNECTION_STRING")
+    if not connection_string and not exporters and os.environ.get("AZURE_AI_PROJECT_ENDPOINT"):
+        from azure.ai.projects import AIProjectClient
+        from azure.identity import DefaultAzureCredential
+
+        with AIProjectClient(os.environ["AZURE_AI_PROJECT_ENDPOINT"], DefaultAzureCredential()) as project:
+            connection_string = project.telemetry.get_application_insights_connection_string()
+    if connection_string:
+        from azure.monitor.opentelemetry.exporter import AzureMonitorTraceExporter
+
+        exporters.append(AzureMonitorTraceExporter.from_connection_string(connection_string))
+    return exporters
+
+
+def install_redacted_tracing(server, redactor) -> None:
+    """Make the hosting adapter set up tracing with every exporter behind RedactingSpanExporter.
+
+    The adapter creates its tracer provider in init_tracing(), which server.run() calls;
+    this replaces it on `server` with one that creates the same exporters inside a
+    redacting_tracer_provider(). If they cannot be created, tracing stays off: spans are
+    never exported unredacted.
+    """
+    from opentelemetry import trace
+
+    def init_tracing():
+        from redaction import content_recording_enabled, redacting_tracer_provider
+
+        try:
+            exporters = _span_exporters()
+        except Exception as exc:
+            print(f"Tracing off: span exporters could not be created ({exc})")
+            exporters = []
+        if exporters:
+            from opentelemetry.sdk.resources import Resource
+
+            resource = Resource.create(server.get_trace_attributes())
+            trace.set_tracer_provider(redacting_tracer_provider(exporters, redactor, resource))
+            try:
+                from agent_framework.observability import OBSERVABILITY_SETTINGS
+            except ImportError:
+                pass
+            else:
+                OBSERVABILITY_SETTINGS.enable_otel = True
+                OBSERVABILITY_SETTINGS.enable_sensitive_data = content_recording_enabled()
+        print(f"PII redaction on: output and {len(exporters)} span exporter(s)")
+        server.tracer = trace.get_tracer(__name__)
+
+    server.init_tracing = init_tracing
+
+
+def _cassettes():
+    """The repo root's cassettes module when CASSETTE is set (local runs only), else None."""
+    if not os.environ.get("CASSETTE"):
+        return None
+    parents = Path(__file__).resolve().parents
+    if len(parents) > 3 and str(parents[3]) not in sys.path:
+        sys.path.append(str(parents[3]))  # src/my-hosted-agent -> repo root
+    import cassettes
+
+    return cassettes
+
+
+def _request_text(messages) -> str:
+    """Plain text of the incoming messages, for the profiler's request filter."""
+    if messages is None:
+        return ""
+    if isinstance(messages, (str, ChatMessage)):
+        messages = [messages]
+    return "\n".join(m if isinstance(m, str) else (m.text or "") for m in messages)
 
 
 class ChatbotAgent(BaseAgent):
@@ -28,23 +143,184 @@ class ChatbotAgent(BaseAgent):
         self.project_endpoint = os.environ.get("AZURE_AI_PROJECT_ENDPOINT", "")
         self.model_deployment = os.environ.get("MODEL_DEPLOYMENT_NAME", "gpt-5-nano")
 
-        # Initialize Azure OpenAI client using the project endpoint
         # The endpoint format is: https://<resource>.services.ai.azure.com/api/projects/<project>
         # We need to extract the base endpoint for Azure OpenAI
-        base_endpoint = self.project_endpoint.split("/api/projects")[0] if "/api/projects" in self.project_endpoint else self.project_endpoint
+        self.base_endpoint = self.project_endpoint.split("/api/projects")[0] if "/api/projects" in self.project_endpoint else self.project_endpoint
+
+        # Clients are built on first use (see the properties below), once, under _build_lock;
+        # a *_built flag is only set after its object was built, so a failure is retried
+        self._build_lock = threading.RLock()
+        self._http = None
+        self._client = None
+        self._hedger = None
+        self._hedger_built = False
+        self._redactor = None
+        self._redactor_built = False
+
+        # One credential and one cached token for the process lifetime
+        self._credential = None
+        self._token = None
+        self._token_lock = threading.Lock()
+
+    def _http_client(self):
+        """Shared keep-alive connection pool for every model client this agent builds."""
+        if self._http is None:
+            with self._build_lock:
+                if self._http is None:
+                    self._http = self._build_http_client()
+        return self._http
+
+    def _build_http_client(self):
+        import httpx
 
-        self.client = AzureOpenAI(
-            azure_endpoint=base_endpoint,
-            api_version="2024-12-01-preview",
-            azure_ad_token_provider=self._get_token,
+        limits = httpx.Limits(
+            max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.environ.get("HTTP_KEEPALIVE_EXPIRY_S", "120")),
         )
+        transport = None
+        cassettes = _cassettes()
+        if cassettes is not None:
+            # httpx ignores `limits` once a transport is given, so the pool goes on the inner one
+            transport = cassettes.CassetteTransport(cassettes.from_env(), httpx.HTTPTransport(limits=limits))
+        return httpx.Client(transport=transport, limits=limits)
+
+    @property
+    def client(self):
+        """Azure OpenAI client, created (and `openai` imported) on first access."""
+        if self._client is None:
+            with self._build_lock:
+                if self._client is None:
+                    from openai import AzureOpenAI
+
+                    self._client = AzureOpenAI(
+                        azure_endpoint=self.base_endpoint,
+                        api_version=API_VERSION,
+                        azure_ad_token_provider=self._get_token,
+                        http_client=self._http_client(),
+                    )
+        return self._client
+
+    @property
+    def hedger(self):
+        """Optional hedging: a slow first token on the primary deployment triggers a
+        second request against HEDGE_BACKUP_DEPLOYMENT (same endpoint unless overridden)."""
+        if not self._hedger_built:
+            with self._build_lock:
+                if not self._hedger_built:
+                    self._hedger = self._build_hedger()
+                    self._hedger_built = True
+        return self._hedger
+
+    def _build_hedger(self):
+        backup_deployment = os.environ.get("HEDGE_BACKUP_DEPLOYMENT")
+        if not backup_deployment:
+            return None
+        from hedging import HedgedCompletions
+
+        backup_endpoint = os.environ.get("HEDGE_BACKUP_ENDPOINT")
+        backup_client = self.client
+        if backup_endpoint:
+            from openai import AzureOpenAI
+
+            backup_client = AzureOpenAI(
+                azure_endpoint=backup_endpoint,
+                api_version=API_VERSION,
+                azure_ad_token_provider=self._get_token,
+                http_client=self._http_client(),
+            )
+        return HedgedCompletions(
+            self.client,
+            self.model_deployment,
+            backup_client,
+            backup_deployment,
+            percentile=float(os.environ.get("HEDGE_TTFT_PERCENTILE", "0.95")),
+            max_hedge_rate=float(os.environ.get("HEDGE_MAX_RATE", "0.05")),
+        )
+
+    @property
+    def redactor(self):
+        """PII redactor for model output, or None when REDACT_PII is off."""
+        if not self._redactor_built:
+            with self._build_lock:
+                if not self._redactor_built:
+                    if redaction_enabled():
+                        from redaction import Redactor
+
+                        self._redactor = Redactor.from_env()
+                    self._redactor_built = True
+        return self._redactor
+
+    def get_new_thread(self, **kwargs: Any) -> AgentThread:
+        """A thread backed by the on-disk thread store when THREAD_STORE_DIR is set."""
+        if not os.environ.get("THREAD_STORE_DIR") or "service_thread_id" in kwargs or "message_store" in kwargs:
+            return super().get_new_thread(**kwargs)
+        from thread_store import StoredAgentThread, ThreadStoreMessageStore
+
+        return StoredAgentThread(message_store=ThreadStoreMessageStore(), context_provider=self.context_provider, **kwargs)
 
     def _get_token(self) -> str:
-        """Get Azure AD token for authentication."""
-        from azure.identity import DefaultAzureCredential
-        credential = DefaultAzureCredential()
-        token = credential.get_token("https://cognitiveservices.azure.com/.default")
-        return token.token
+        """Get Azure AD token for authentication (cached until shortly before it expires)."""
+        token = self._token
+        if token is not None and token.expires_on - time.time() > TOKEN_REFRESH_MARGIN_S:
+            return token.token
+        with self._token_lock:
+            if self._token is None or self._token.expires_on - time.time() <= TOKEN_REFRESH_MARGIN_S:
+                if self._credential is None:
+                    cassettes = _cassettes()
+                    if cassettes is not None and cassettes.replaying():
+                        self._credential = cassettes.ReplayCredential()
+                    else:
+                        from azure.identity import DefaultAzureCredential
+
+                        self._credential = DefaultAzureCredential()
+                self._token = self._credential.get_token(TOKEN_SCOPE)
+            return self._token.token
+
+    def warmup(self, completion: bool | None = None) -> dict[str, float]:
+        """Pay one-time startup costs before the first user request.
+
+        - walks the DefaultAzureCredential chain and caches the token
+        - opens the keep-alive pool (DNS + TLS) with a cheap authenticated GET
+        - opens the thread store when THREAD_STORE_DIR is set (index rebuild)
+        - optionally sends one tiny completion (WARMUP_COMPLETION=1)
+
+        Failures are reported, not raised: a cold agent is better than no agent.
+        """
+        if completion is None:
+            completion = os.environ.get("WARMUP_COMPLETION", "0") == "1"
+        timings: dict[str, float] = {}
+
+        steps = [("token_s", self._get_token), ("connect_s", lambda: self.client.models.list())]
+        if redaction_enabled():
+            steps.append(("redactor_s", lambda: self.redactor))
+        if os.environ.get("THREAD_STORE_DIR"):
+            from thread_store import get_store
+
+            # Opening the store rebuilds its index from the segment headers
+            steps.append(("thread_store_s", get_store))
+        hedger = self.hedger
+        if hedger is not None and hedger.targets[1][0] is not self.client:
+            steps.append(("connect_backup_s", lambda: hedger.targets[1][0].models.list()))
+        if completion:
+            steps.append((
+                "completion_s",
+                lambda: self.client.chat.completions.create(
+                    model=self.model_deployment,
+                    messages=[{"role": "user", "content": "ping"}],
+                    max_completion_tokens=16,
+                ),
+            ))
+
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as exc:
+                print(f"Warmup step {name[:-2]} failed: {exc}")
+                continue
+            timings[name] = time.perf_counter() - started
+        return timings
 
     def _extract_text(self, messages) -> list[dict]:
         """Convert input messages to OpenAI format."""
@@ -76,12 +352,44 @@ class ChatbotAgent(BaseAgent):
 
         return openai_messages
 
+    def _create_completion(self, messages: list[dict], stream: bool = False):
+        """Call the model directly, or through the hedger when one is configured."""
+        if self.hedger is not None:
+            return self.hedger.create(messages=messages, stream=stream)
+        return self.client.chat.completions.create(
+            model=self.model_deployment,
+            messages=messages,
+            stream=stream,
+        )
+
     async def run(
         self,
         messages: str | ChatMessage | list[str] | list[ChatMessage] | None = None,
         *,
         thread: AgentThread | None = None,
         **kwargs: Any,
+    ) -> AgentRunResponse:
+        # Marks this request for a filtered profile (profiler.py); a no-op when idle
+        with track_request(lambda: _request_text(messages)):
+            return await self._run(messages, thread=thread, **kwargs)
+
+    async def run_stream(
+        self,
+        messages: str | ChatMessage | list[str] | list[ChatMessage] | None = None,
+        *,
+        thread: AgentThread | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[AgentRunResponseUpdate]:
+        with track_request(lambda: _request_text(messages)):
+            async for update in self._run_stream(messages, thread=thread, **kwargs):
+                yield update
+
+    async def _run(
+        self,
+        messages: str | ChatMessage | list[str] | list[ChatMessage] | None = None,
+        *,
+        thread: AgentThread | None = None,
+        **kwargs: Any,
     ) -> AgentRunResponse:
         # Convert messages to OpenAI format
         openai_messages = self._extract_text(messages)
@@ -91,13 +399,12 @@ class ChatbotAgent(BaseAgent):
         all_messages = [system_message] + openai_messages
 
         # Call Azure OpenAI
-        response = self.client.chat.completions.create(
-            model=self.model_deployment,
-            messages=all_messages,
-        )
+        response = self._create_completion(all_messages)
 
         # Extract response text
         response_text = response.choices[0].message.content or "I couldn't generate a response."
+        if self.redactor is not None:
+            response_text = self.redactor.redact(response_text)
 
         # Build reply
         reply = ChatMessage(role=Role.ASSISTANT, contents=[TextContent(text=response_text)])
@@ -109,7 +416,7 @@ class ChatbotAgent(BaseAgent):
 
         return AgentRunResponse(messages=[reply])
 
-    async def run_stream(
+    async def _run_stream(
         self,
         messages: str | ChatMessage | list[str] | list[ChatMessage] | None = None,
         *,
@@ -124,24 +431,32 @@ class ChatbotAgent(BaseAgent):
         all_messages = [system_message] + openai_messages
 
         # Call Azure OpenAI with streaming
-        stream = self.client.chat.completions.create(
-            model=self.model_deployment,
-            messages=all_messages,
-            stream=True,
-        )
+        stream = self._create_completion(all_messages, stream=True)
 
         # Collect full response for thread notification
         full_response = ""
 
+        # Redaction holds back a short tail of text so PII split across chunks is caught
+        redacting = self.redactor.stream() if self.redactor is not None else None
+
         # Stream the response
         for chunk in stream:
             if chunk.choices and chunk.choices[0].delta.content:
                 content = chunk.choices[0].delta.content
+                if redacting is not None:
+                    content = redacting.feed(content)
+                    if not content:
+                        continue
                 full_response += content
                 yield AgentRunResponseUpdate(
                     contents=[TextContent(text=content)],
                     role=Role.ASSISTANT
                 )
+        if redacting is not None:
+            tail = redacting.flush()
+            if tail:
+                full_response += tail
+                yield AgentRunResponseUpdate(contents=[TextContent(text=tail)], role=Role.ASSISTANT)
 
         # Notify thread of input and the complete response once streaming ends
         if thread is not None:
@@ -153,4 +468,29 @@ class ChatbotAgent(BaseAgent):
 if __name__ == "__main__":
     print("Starting chatbot agent...")
     agent = ChatbotAgent(name="chatbot-agent", description="Chatbot powered by gpt-5-nano")
-    from_agent_framework(agent).run()
+
+    # Warm up while the hosting adapter imports. The server only starts listening (and the
+    # platform only sees the agent as ready) after both are done.
+    warm: dict[str, float] = {}
+    warmer = None
+    if os.environ.get("WARMUP", "1") == "1":
+        warmer = threading.Thread(target=lambda: warm.update(agent.warmup()), name="warmup", daemon=True)
+        warmer.start()
+
+    from azure.ai.agentserver.agentframework import from_agent_framework
+
+    server = from_agent_framework(agent)
+    # On-demand profiling: SIGUSR1, or the admin endpoint when PROFILE_ADMIN_PORT is set
+    import profiler
+
+    profiler.install_signal_handler()
+    if os.environ.get("PROFILE_ADMIN_PORT"):
+        profiler.serve_admin(int(os.environ["PROFILE_ADMIN_PORT"]))
+
+    if redaction_enabled():
+        # The adapter only creates its tracer provider inside server.run()
+        install_redacted_tracing(server, agent.redactor)
+    if warmer is not None:
+        warmer.join()
+        print("Warmup done: " + ", ".join(f"{k}={v:.2f}s" for k, v in warm.items()))
+    server.run()
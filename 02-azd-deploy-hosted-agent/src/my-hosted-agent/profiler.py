@@ -0,0 +1,374 @@
+"""
+On-demand sampling profiler for the hosted agent.
+
+Nothing runs while idle: no sampler thread, and the per-request hook (track_request)
+is a single attribute check. A profile is started by
+
+- SIGUSR1 (a second SIGUSR1 stops it early), configured by PROFILE_DURATION_S,
+  PROFILE_INTERVAL_MS, PROFILE_FILTER and PROFILE_FORMAT, or
+- the admin endpoint (PROFILE_ADMIN_PORT, bound to 127.0.0.1 by default):
+
+    curl -X POST 'localhost:8089/profile?duration=20&interval_ms=5&format=collapsed&wait=1' -o agent.collapsed
+    curl -X POST 'localhost:8089/profile?duration=60&filter=invoice'   # only matching requests
+    curl localhost:8089/profile                                        # status
+    curl localhost:8089/profile/result -o agent.pstats                 # last finished profile
+
+While a profile runs, a sampler thread reads every thread's stack with
+sys._current_frames() each interval. With a filter (a regex over the request's user
+text), only the event-loop thread is sampled, and only while the asyncio task serving a
+matching request is the one running on it.
+
+Results are written to PROFILE_DIR (default /tmp/profiles):
+- collapsed: one "thread;outer;...;inner count" line per stack, for flamegraph.pl / speedscope
+- pstats:    a marshal dump readable with `python -m pstats file` or snakeviz
+"""
+
+import asyncio
+import marshal
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable
+
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "/tmp/profiles"))
+MAX_DURATION_S = float(os.environ.get("PROFILE_MAX_DURATION_S", "300"))
+
+FrameKey = tuple[str, int, str]  # (filename, first line, function) - the pstats key
+
+_lock = threading.Lock()
+_active: "SamplingProfiler | None" = None
+_last: "SamplingProfiler | None" = None
+
+
+class SamplingProfiler:
+    """Time-bounded stack sampler. Use start_profile() rather than constructing directly."""
+
+    def __init__(
+        self,
+        duration_s: float = 30.0,
+        interval_s: float = 0.01,
+        request_filter: str | None = None,
+        fmt: str = "collapsed",
+        out_dir: str | os.PathLike | None = None,
+    ):
+        if fmt not in ("collapsed", "pstats"):
+            raise ValueError(f"Unknown profile format {fmt!r} (collapsed or pstats)")
+        self.duration_s = min(duration_s, MAX_DURATION_S)
+        self.interval_s = max(interval_s, 0.001)
+        self.request_filter = re.compile(request_filter) if request_filter else None
+        self.fmt = fmt
+        self.out_dir = Path(out_dir or PROFILE_DIR)
+        self.output: Path | None = None
+        self.samples = 0
+        self.sampler_cpu_s = 0.0
+        self.started_at: float | None = None
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._stacks: Counter[tuple[str, tuple[FrameKey, ...]]] = Counter()
+        # task -> (thread ident, loop) for requests that matched the filter
+        self._tracked: dict[Any, tuple[int, Any]] = {}
+        self._thread: threading.Thread | None = None
+
+    # ----- request filter -----------------------------------------------------
+
+    def matches(self, text: str) -> bool:
+        return self.request_filter is None or bool(self.request_filter.search(text or ""))
+
+    def track(self, task: Any, loop: Any) -> None:
+        self._tracked[task] = (threading.get_ident(), loop)
+
+    def untrack(self, task: Any) -> None:
+        self._tracked.pop(task, None)
+
+    # ----- sampling -----------------------------------------------------------
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _targets(self) -> dict[int, Any] | None:
+        """Thread idents to sample now, or None for all threads."""
+        if self.request_filter is None:
+            return None
+        targets = {}
+        for task, (ident, loop) in list(self._tracked.items()):
+            # Only while this request's task is the one running on its loop
+            if asyncio.current_task(loop) is task:
+                targets[ident] = task
+        return targets
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        targets = self._targets()
+        if targets is not None and not targets:
+            return
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (targets is not None and ident not in targets):
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            stack.reverse()
+            self._stacks[(names.get(ident, str(ident)), tuple(stack))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        cpu_started = time.thread_time()
+        deadline = time.monotonic() + self.duration_s
+        next_tick = time.monotonic()
+        # The sampler only runs when it gets the GIL. With the default 5 ms switch interval
+        # it would mostly wake while the loop thread sits in select() (no task running),
+        # so short CPU bursts would never be sampled. Switch faster while profiling only.
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, self.interval_s / 4))
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                self._sample()
+                # Fixed-rate schedule; if sampling fell behind, skip ahead instead of bursting
+                next_tick = max(next_tick + self.interval_s, time.monotonic())
+                self._stop.wait(max(0.0, next_tick - time.monotonic()))
+            self.sampler_cpu_s = time.thread_time() - cpu_started
+            self.output = self.write()
+        finally:
+            sys.setswitchinterval(switch_interval)
+            _finish(self)
+
+    # ----- output -------------------------------------------------------------
+
+    @staticmethod
+    def _label(key: FrameKey) -> str:
+        filename, line, name = key
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def collapsed(self) -> str:
+        lines = []
+        for (thread, stack), count in self._stacks.most_common():
+            lines.append(";".join([thread] + [self._label(k) for k in stack]) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def pstats_dict(self) -> dict[FrameKey, tuple]:
+        """Samples converted to the dict pstats.Stats loads (one sample = interval_s)."""
+        dt = self.interval_s
+        stats: dict[FrameKey, list] = {}
+        for (_, stack), n in self._stacks.items():
+            seen = set()
+            last = len(stack) - 1
+            for i, key in enumerate(stack):
+                entry = stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+                if i == last:
+                    entry[2] += n * dt
+                if key not in seen:  # recursion: count inclusive time once per stack
+                    seen.add(key)
+                    entry[0] += n
+                    entry[1] += n
+                    entry[3] += n * dt
+                if i > 0:
+                    caller = entry[4].setdefault(stack[i - 1], [0, 0, 0.0, 0.0])
+                    caller[0] += n
+                    caller[1] += n
+                    caller[3] += n * dt
+                    if i == last:
+                        caller[2] += n * dt
+        return {
+            key: (cc, nc, tt, ct, {k: tuple(v) for k, v in callers.items()})
+            for key, (cc, nc, tt, ct, callers) in stats.items()
+        }
+
+    def write(self) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        path = self.out_dir / f"profile-{stamp}-{os.getpid()}.{self.fmt}"
+        if self.fmt == "pstats":
+            with open(path, "wb") as f:
+                marshal.dump(self.pstats_dict(), f)
+        else:
+            path.write_text(self.collapsed())
+        return path
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "running": not self.finished.is_set(),
+            "started_at": self.started_at,
+            "duration_s": self.duration_s,
+            "interval_ms": self.interval_s * 1000,
+            "filter": self.request_filter.pattern if self.request_filter else None,
+            "format": self.fmt,
+            "samples": self.samples,
+            "distinct_stacks": len(self._stacks),
+            "sampler_cpu_s": round(self.sampler_cpu_s, 3),
+            "output": str(self.output) if self.output else None,
+        }
+
+
+def _finish(profiler: SamplingProfiler) -> None:
+    global _active, _last
+    with _lock:
+        if _active is profiler:
+            _active = None
+        _last = profiler
+    profiler.finished.set()
+    print(f"Profile done: {profiler.samples} samples -> {profiler.output}")
+
+
+def start_profile(
+    duration_s: float | None = None,
+    interval_s: float | None = None,
+    request_filter: str | None = None,
+    fmt: str | None = None,
+) -> SamplingProfiler:
+    """Start a profile (env defaults for anything not given). Raises if one is running."""
+    global _active
+    with _lock:
+        if _active is not None:
+            raise RuntimeError("A profile is already running")
+        _active = SamplingProfiler(
+            duration_s=duration_s if duration_s is not None else float(os.environ.get("PROFILE_DURATION_S", "30")),
+            interval_s=interval_s if interval_s is not None else float(os.environ.get("PROFILE_INTERVAL_MS", "10")) / 1000,
+            request_filter=request_filter if request_filter is not None else os.environ.get("PROFILE_FILTER") or None,
+            fmt=fmt or os.environ.get("PROFILE_FORMAT", "collapsed"),
+        )
+        return _active.start()
+
+
+def active_profiler() -> SamplingProfiler | None:
+    return _active
+
+
+def last_profile() -> SamplingProfiler | None:
+    return _last
+
+
+@contextmanager
+def track_request(text: str | Callable[[], str]):
+    """Mark the current asyncio task as a request to profile if it matches the filter.
+
+    `text` may be a callable returning the request text, so callers only build it
+    when a filtered profile is actually running.
+    """
+    profiler = _active
+    if profiler is None or profiler.request_filter is None:
+        yield
+        return
+    if callable(text):
+        text = text()
+    if not profiler.matches(text):
+        yield
+        return
+    try:
+        task, loop = asyncio.current_task(), asyncio.get_running_loop()
+    except RuntimeError:
+        yield
+        return
+    profiler.track(task, loop)
+    try:
+        yield
+    finally:
+        profiler.untrack(task)
+
+
+# ----- triggers ----------------------------------------------------------------
+
+
+def install_signal_handler(signum: int | None = None) -> bool:
+    """SIGUSR1 starts a profile with env defaults; a second one stops it early."""
+    signum = signum or getattr(signal, "SIGUSR1", None)
+    if signum is None:
+        return False
+
+    def handler(_signum, _frame):
+        profiler = _active
+        if profiler is not None:
+            profiler.stop()
+            return
+        try:
+            started = start_profile()
+        except Exception as exc:
+            print(f"Could not start profile: {exc}")
+            return
+        print(f"Profiling for {started.duration_s:.0f}s: {started.status()}")
+
+    signal.signal(signum, handler)
+    return True
+
+
+def serve_admin(port: int, host: str | None = None):
+    """Start the admin HTTP endpoint in a daemon thread. Returns the server."""
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: bytes, content_type: str = "application/json") -> None:
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, code: int, payload: Any) -> None:
+            self._send(code, json.dumps(payload).encode())
+
+        def _file(self, profiler: SamplingProfiler | None) -> None:
+            if profiler is None or profiler.output is None or not profiler.output.exists():
+                self._json(404, {"error": "no finished profile"})
+                return
+            self._send(200, profiler.output.read_bytes(), "application/octet-stream")
+
+        def do_GET(self):
+            path = urlparse(self.path).path.rstrip("/")
+            if path == "/profile":
+                profiler = _active or _last
+                self._json(200, profiler.status() if profiler else {"running": False})
+            elif path == "/profile/result":
+                self._file(_last)
+            else:
+                self._json(404, {"error": "not found"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path.rstrip("/") != "/profile":
+                self._json(404, {"error": "not found"})
+                return
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                profiler = start_profile(
+                    duration_s=float(query["duration"]) if "duration" in query else None,
+                    interval_s=float(query["interval_ms"]) / 1000 if "interval_ms" in query else None,
+                    request_filter=query.get("filter"),
+                    fmt=query.get("format"),
+                )
+            except RuntimeError as exc:
+                self._json(409, {"error": str(exc)})
+                return
+            except (ValueError, re.error) as exc:
+                self._json(400, {"error": str(exc)})
+                return
+            if query.get("wait") == "1":
+                profiler.finished.wait(profiler.duration_s + 30)
+                self._file(profiler)
+            else:
+                self._json(202, profiler.status())
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host or os.environ.get("PROFILE_ADMIN_HOST", "127.0.0.1"), port), Handler)
+    threading.Thread(target=server.serve_forever, name="profile-admin", daemon=True).start()
+    return server
@@ -0,0 +1,424 @@
+"""
+Streaming PII redaction for agent output and recorded trace content.
+
+Two matchers run in one pass over the text:
+- precompiled regexes for bounded-length PII classes (email, card, SSN, IBAN, phone,
+  IPv4); every class has a fixed maximum match length and a trigger character ('@' for
+  email, a digit for the rest), and only runs in a small window around its triggers
+- an Aho-Corasick automaton over literal terms (customer names, project code names,
+  ...) from REDACT_TERMS / REDACT_TERMS_FILE, case-insensitive
+
+StreamRedactor applies them incrementally to stream chunks. It holds back the last
+K characters (K = longest possible match + 1), so a match that straddles a chunk
+boundary is still seen whole, and rescans only the new chunk plus that holdback:
+per-chunk cost is O(len(chunk) + K), never O(transcript). The streamed output is
+identical to redacting the whole text at once.
+
+RedactingSpanExporter wraps an OpenTelemetry exporter so recorded span content
+(AZURE_TRACING_GEN_AI_CONTENT_RECORDING_ENABLED) is scrubbed before it leaves the process.
+redacting_tracer_provider() builds a provider whose every exporter is wrapped that way.
+
+Benchmark: python redaction.py
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Sequence
+
+# Characters of already-emitted text kept in front of the scan window so lookbehind
+# assertions at the window start see the same context as a whole-text scan.
+_CONTEXT = 8
+# Smallest window a class regex is searched in once a trigger is found. Larger windows
+# skip past runs of triggers (digits inside other classes' matches) in one search.
+_MIN_WINDOW = 64
+
+
+def _luhn(text: str) -> bool:
+    digits = [int(c) for c in text if c.isdigit()]
+    checksum = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2:
+            d = d * 2 - 9 if d > 4 else d * 2
+        checksum += d
+    return checksum % 10 == 0
+
+
+@dataclass(frozen=True)
+class PiiClass:
+    """One regex class. `max_len` must bound every match of `pattern`, and every match
+    must contain a `trigger` character (default: the Redactor's) within its first
+    `lead` + 1 characters."""
+
+    label: str
+    pattern: str
+    max_len: int
+    validate: Callable[[str], bool] | None = None
+    lead: int = 0
+    trigger: str | None = None
+
+
+DEFAULT_CLASSES: tuple[PiiClass, ...] = (
+    PiiClass(
+        "EMAIL",
+        r"(?<![\w.%+-])[A-Za-z0-9._%+-]{1,32}@[A-Za-z0-9-]{1,24}(?:\.[A-Za-z0-9-]{1,24}){1,3}(?![\w-])",
+        32 + 1 + 24 + 3 * 25,
+        lead=32,
+        trigger="@",
+    ),
+    PiiClass("IBAN", r"(?<![A-Z0-9])[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?(?![A-Z0-9])", 4 + 7 * 5 + 4, lead=2),
+    PiiClass("CARD", r"(?<![\d-])(?:\d[ -]?){12,18}\d(?!\d)", 19 + 18, _luhn),
+    PiiClass("SSN", r"(?<![\d-])\d{3}-\d{2}-\d{4}(?![\d-])", 11),
+    # A leading "+" (separators optional), or phone-style grouping: "(425) 555-0100",
+    # "425-555-0100". Bare digit runs (order numbers, timestamps) are not phones.
+    PiiClass(
+        "PHONE",
+        r"(?<![\w+])(?:\+\d{1,3}[ .-]?\(?\d{2,4}\)?[ .-]?\d{3,4}[ .-]?|(?:\(\d{2,4}\) ?|\d{2,4}[ .-])\d{3,4}[ .-])\d{3,4}(?!\d)",
+        5 + 6 + 1 + 4 + 1 + 4,
+        lead=1,
+    ),
+    PiiClass(
+        "IPV4",
+        r"(?<![\d.])(?:(?:25[0-5]|2[0-4]\d|1?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|1?\d?\d)(?!\.?\d)",
+        15,
+    ),
+)
+
+
+class AhoCorasick:
+    """Case-insensitive multi-literal matcher; transitions are memoized into a DFA."""
+
+    def __init__(self, terms: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        terms = {t.strip().lower() for t in terms if t.strip()}
+        for term in terms:
+            state = 0
+            for ch in term:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] += (len(term),)
+        self.max_len = max((len(t) for t in terms), default=0)
+
+        # Breadth-first failure links; outputs inherit those of their failure state
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+        # Full transition table, filled in lazily (the alphabet is open-ended Unicode)
+        self._delta: list[dict[str, int]] = [dict(g) for g in self._goto]
+
+    def _step(self, state: int, ch: str) -> int:
+        origin = state
+        while state and ch not in self._goto[state]:
+            state = self._fail[state]
+        target = self._goto[state].get(ch, 0)
+        self._delta[origin][ch] = target
+        return target
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
+
+    def finditer(self, text: str, pos: int = 0, endpos: int | None = None) -> Iterable[tuple[int, int]]:
+        """(start, end) of every term occurrence inside text[pos:endpos]."""
+        delta, out, step = self._delta, self._out, self._step
+        state = 0
+        segment = text[pos:endpos]
+        lowered = segment.lower()
+        if len(lowered) != len(segment):
+            # A few characters lower-case to two ("İ"); keep offsets aligned with `text`
+            lowered = "".join(c if len(c.lower()) != 1 else c.lower() for c in segment)
+        for i, ch in enumerate(lowered, pos + 1):
+            nxt = delta[state].get(ch)
+            state = step(state, ch) if nxt is None else nxt
+            for length in out[state]:
+                yield i - length, i
+
+
+class Redactor:
+    """Precompiled PII matchers. Use redact() for whole strings, stream() for chunks."""
+
+    def __init__(
+        self,
+        classes: Sequence[PiiClass] = DEFAULT_CLASSES,
+        terms: Iterable[str] = (),
+        trigger: str = r"\d",
+    ):
+        self.classes = list(classes)
+        # Each class only runs in a small window around its own trigger characters, so
+        # plain prose costs one trigger scan per class instead of a regex try per offset
+        self._regexes = [re.compile(c.pattern) for c in self.classes]
+        self._triggers = [re.compile(c.trigger or trigger) for c in self.classes]
+        self._terms = AhoCorasick(list(terms))
+        self.max_match_len = max([c.max_len for c in self.classes] + [self._terms.max_len])
+
+    @classmethod
+    def from_env(cls) -> "Redactor":
+        terms = [t for t in os.environ.get("REDACT_TERMS", "").split(",") if t.strip()]
+        path = os.environ.get("REDACT_TERMS_FILE")
+        if path:
+            with open(path, encoding="utf-8") as f:
+                terms += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        return cls(terms=terms)
+
+    @staticmethod
+    def replacement(label: str) -> str:
+        return f"[{label}]"
+
+    def _next_class_match(self, i: int, text: str, pos: int, stop: int) -> tuple[int, int] | None:
+        """Leftmost match of class i starting in [pos, stop)."""
+        c, regex, trigger_re = self.classes[i], self._regexes[i], self._triggers[i]
+        window = max(c.lead + c.max_len + 2, _MIN_WINDOW)
+        # Triggers at or past stop + lead can only start matches at or past `stop`
+        trigger_end = min(len(text), stop + c.lead)
+        while True:
+            hit = trigger_re.search(text, pos, trigger_end)
+            if hit is None:
+                return None
+            # Any match has a trigger within `lead` chars of its start, so none starts before
+            # hit - lead. Inside the window, a match starting at or before `exact` (it and
+            # its one character of lookahead fit) is found exactly as in a whole-text scan.
+            start = max(pos, hit.start() - c.lead)
+            end = min(len(text), start + window)
+            exact = end if end == len(text) else end - c.max_len - 1
+            m = regex.search(text, start, end)
+            if m is not None and m.start() <= exact:
+                return (m.start(), m.end()) if m.start() < stop else None
+            pos = exact + 1
+
+    def _regex_scanner(self, text: str, stop: int) -> Callable[[int], tuple[int, int, str] | None]:
+        """next(pos): the leftmost accepted class match starting in [pos, stop).
+
+        Ties go to the earlier class, as in a regex alternation. Each class's next match
+        is kept until `pos` passes it, so every class scans each trigger once.
+        """
+        pending: list[tuple[int, int] | None] = [(-1, -1)] * len(self.classes)
+
+        def next_match(pos: int) -> tuple[int, int, str] | None:
+            while True:
+                best = None
+                for i, match in enumerate(pending):
+                    if match is not None and match[0] < pos:
+                        match = pending[i] = self._next_class_match(i, text, pos, stop)
+                    if match is not None and (best is None or match[0] < best[0]):
+                        best = (match[0], match[1], i)
+                if best is None:
+                    return None
+                start, end, i = best
+                validate = self.classes[i].validate
+                if validate is None or validate(text[start:end]):
+                    return start, end, self.classes[i].label
+                # A rejected candidate consumes nothing: resume right after its start
+                pos = start + 1
+
+        return next_match
+
+    def spans(self, text: str, pos: int = 0, stop: int | None = None) -> list[tuple[int, int, str]]:
+        """Non-overlapping (start, end, label) matches starting in [pos, stop), leftmost first.
+
+        Regex and term matches are merged sequentially (after each accepted match both
+        resume at its end), so scanning from any match boundary gives the same result
+        as scanning the whole text. StreamRedactor relies on that, and on `stop` to
+        scan only the text it is about to emit.
+        """
+        if stop is None:
+            stop = len(text)
+        terms = []
+        if self._terms:
+            for start, end in self._terms.finditer(text, pos, stop + self._terms.max_len):
+                # Whole words only: "Ann" must not redact "Annual"
+                if start < stop and (start == 0 or not text[start - 1].isalnum()) and (
+                    end == len(text) or not text[end].isalnum()
+                ):
+                    terms.append((start, end, "TERM"))
+            terms.sort(key=lambda s: (s[0], -s[1]))
+
+        next_regex = self._regex_scanner(text, stop)
+        spans, ti = [], 0
+        regex = next_regex(pos)
+        while True:
+            while ti < len(terms) and terms[ti][0] < pos:
+                ti += 1
+            if regex is not None and regex[0] < pos:
+                regex = next_regex(pos)
+            term = terms[ti] if ti < len(terms) else None
+            if regex is None and term is None:
+                return spans
+            if term is None or (regex is not None and (regex[0], -regex[1]) <= (term[0], -term[1])):
+                best = regex
+            else:
+                best = term
+            spans.append(best)
+            pos = best[1]
+
+    def redact(self, text: str) -> str:
+        out, cut = [], 0
+        for start, end, label in self.spans(text):
+            out.append(text[cut:start])
+            out.append(self.replacement(label))
+            cut = end
+        out.append(text[cut:])
+        return "".join(out)
+
+    def redact_value(self, value: Any) -> Any:
+        """Redact a span attribute value (str, or a sequence of str)."""
+        if isinstance(value, str):
+            return self.redact(value)
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.redact(v) if isinstance(v, str) else v for v in value)
+        return value
+
+    def stream(self) -> "StreamRedactor":
+        return StreamRedactor(self)
+
+
+class StreamRedactor:
+    """Incremental redaction over a sequence of chunks: feed() each chunk, then flush()."""
+
+    def __init__(self, redactor: Redactor):
+        self.redactor = redactor
+        self.holdback = redactor.max_match_len + 1
+        self._buf = ""
+        self._pos = 0  # start of the not-yet-emitted text in _buf
+
+    def _emit(self, buf: str, safe: int) -> str:
+        """Emit buf[_pos:] up to `safe`, redacting every match that starts before it."""
+        out, cut = [], self._pos
+        for start, end, label in self.redactor.spans(buf, self._pos, safe):
+            out.append(buf[cut:start])
+            out.append(self.redactor.replacement(label))
+            cut = end
+        end = max(cut, safe)
+        out.append(buf[cut:end])
+        keep_from = max(0, end - _CONTEXT)
+        self._buf, self._pos = buf[keep_from:], end - keep_from
+        return "".join(out)
+
+    def feed(self, chunk: str) -> str:
+        """Redacted text that is now final (may be empty while text is held back)."""
+        buf = self._buf + chunk
+        # A match starting before `safe` is at most max_match_len long, so it (and the
+        # one character of lookahead after it) is already complete in `buf`.
+        safe = len(buf) - self.holdback
+        if safe <= self._pos:
+            self._buf = buf
+            return ""
+        return self._emit(buf, safe)
+
+    def flush(self) -> str:
+        """End of stream: redact and return whatever is still held back."""
+        text = self._emit(self._buf, len(self._buf))
+        self._buf, self._pos = "", 0
+        return text
+
+
+# ----- OpenTelemetry -----------------------------------------------------------
+
+
+class RedactingSpanExporter:
+    """Wraps a SpanExporter; string attributes of spans and span events are redacted."""
+
+    def __init__(self, exporter: Any, redactor: Redactor | None = None):
+        self.exporter = exporter
+        self.redactor = redactor or Redactor.from_env()
+
+    def _redact_attributes(self, attributes: Any) -> dict[str, Any]:
+        return {k: self.redactor.redact_value(v) for k, v in (attributes or {}).items()}
+
+    def _redact_span(self, span: Any) -> Any:
+        from opentelemetry.sdk.trace import Event, ReadableSpan
+
+        return ReadableSpan(
+            name=span.name,
+            context=span.context,
+            parent=span.parent,
+            resource=span.resource,
+            attributes=self._redact_attributes(span.attributes),
+            events=[Event(e.name, self._redact_attributes(e.attributes), e.timestamp) for e in span.events],
+            links=span.links,
+            kind=span.kind,
+            status=span.status,
+            start_time=span.start_time,
+            end_time=span.end_time,
+            instrumentation_scope=span.instrumentation_scope,
+        )
+
+    def export(self, spans: Sequence[Any]) -> Any:
+        return self.exporter.export([self._redact_span(s) for s in spans])
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.exporter.force_flush(timeout_millis)
+
+
+def redacting_tracer_provider(exporters: Iterable[Any], redactor: Redactor | None = None, resource: Any = None) -> Any:
+    """A TracerProvider that exports every span through a RedactingSpanExporter.
+
+    Redaction is part of the provider from the moment it exists, so no span can leave
+    unredacted and nothing has to be patched into someone else's pipeline later.
+    """
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    redactor = redactor or Redactor.from_env()
+    provider = TracerProvider(resource=resource) if resource is not None else TracerProvider()
+    for exporter in exporters:
+        provider.add_span_processor(BatchSpanProcessor(RedactingSpanExporter(exporter, redactor)))
+    return provider
+
+
+# Env switches for recording prompt/completion text on spans: the hosting adapter's and
+# agent_framework's (read once into OBSERVABILITY_SETTINGS at import)
+CONTENT_RECORDING_ENV = ("AZURE_TRACING_GEN_AI_CONTENT_RECORDING_ENABLED", "ENABLE_SENSITIVE_DATA")
+
+
+def content_recording_enabled() -> bool:
+    return any(os.environ.get(name, "").lower() in ("1", "true", "yes", "on") for name in CONTENT_RECORDING_ENV)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    rng = random.Random(7)
+    samples = [
+        "jane.doe@contoso.com", "4111 1111 1111 1111", "123-45-6789", "+1 425-555-0100",
+        "10.0.12.7", "GB82 WEST 1234 5698 7654 32", "Project Falcon",
+    ]
+    words = "the agent replied with a summary of the incident and next steps for the team".split()
+    parts, size = [], 0
+    while size < 8_000_000:
+        parts.append(rng.choice(samples) if rng.random() < 0.02 else rng.choice(words))
+        size += len(parts[-1]) + 1
+    text = " ".join(parts)
+    mb = len(text.encode("utf-8")) / 1e6
+    terms = ["Project Falcon"] + [f"customer-{i}" for i in range(500)]
+
+    for name, redactor in (("regex classes", Redactor()), ("regex + 501 terms", Redactor(terms=terms))):
+        started = time.perf_counter()
+        expected = redactor.redact(text)
+        whole = time.perf_counter() - started
+        print(f"{name}: whole text {mb / whole:6.1f} MB/s")
+        for chunk_size in (16, 256, 4096):
+            stream = redactor.stream()
+            started = time.perf_counter()
+            out = [stream.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+            out.append(stream.flush())
+            elapsed = time.perf_counter() - started
+            assert "".join(out) == expected, "streamed output differs from whole-text redaction"
+            print(f"  stream, {chunk_size:>5}-char chunks {mb / elapsed:6.1f} MB/s  (holdback {stream.holdback} chars)")
@@ -0,0 +1,485 @@
+"""
+Append-only on-disk thread store for local and self-hosted runs.
+
+Without it, AgentThread keeps every message of every conversation in an in-memory
+ChatMessageStore: memory grows with each turn and history is gone after a restart.
+With THREAD_STORE_DIR set, the chatbot agent's threads use ThreadStoreMessageStore.
+
+Layout: THREAD_STORE_DIR/seg-00000001.log, seg-00000002.log, ... Each record holds one
+message of one thread plus a pointer to that thread's previous record, so:
+
+- append is one write to the active segment (O(1), no read-modify-write)
+- the in-memory index is one int per thread (location of its newest record + depth)
+- reading the last N messages follows N back-pointers through mmapped segments;
+  older history is never touched
+- restart rebuilds the index by scanning record headers; a torn tail is truncated
+
+Segments roll over at THREAD_STORE_SEGMENT_MB. A background compactor picks sealed
+segments that are mostly dead (messages beyond THREAD_STORE_MAX_MESSAGES per thread,
+threads idle longer than THREAD_STORE_TTL_S, deleted threads), re-appends the records
+that are still live, and deletes the segment.
+
+Benchmark / self-check: python thread_store.py
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, MutableMapping, Sequence
+
+from agent_framework import AgentThread, ChatMessage
+
+# body_len, crc32, prev location, timestamp, depth, kind, thread-id length
+_HEADER = struct.Struct("<IIQdIBH")
+_CRC_FROM = 8  # the CRC covers everything after the length and CRC fields
+_MESSAGE, _TOMBSTONE = 0, 1
+_OFFSET_BITS = 40  # location = segment number << 40 | byte offset; 0 means "none"
+_DEPTH_BITS = 32  # index value = location << 32 | depth
+
+
+def _segment_name(number: int) -> str:
+    return f"seg-{number:08d}.log"
+
+
+class ThreadStore:
+    """Segmented append-only log of thread messages. Thread-safe; payloads are bytes."""
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        segment_bytes: int | None = None,
+        max_messages: int | None = None,
+        ttl_s: float | None = None,
+        fsync: bool | None = None,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        env = os.environ.get
+        self.segment_bytes = segment_bytes or int(float(env("THREAD_STORE_SEGMENT_MB", "64")) * 1024 * 1024)
+        self.max_messages = max_messages or int(env("THREAD_STORE_MAX_MESSAGES", "1000"))
+        self.ttl_s = ttl_s if ttl_s is not None else float(env("THREAD_STORE_TTL_S", "0"))  # 0 = keep forever
+        self.fsync = fsync if fsync is not None else env("THREAD_STORE_FSYNC", "0") == "1"
+
+        self._lock = threading.RLock()
+        self._index: dict[str, int] = {}
+        self._maps: dict[int, mmap.mmap] = {}
+        self._compactor: threading.Thread | None = None
+        self._stop = threading.Event()
+
+        self._segments = sorted(int(p.name[4:12]) for p in self.directory.glob("seg-*.log"))
+        for number in self._segments:
+            self._load_segment(number, last=number == self._segments[-1])
+        if not self._segments:
+            self._segments.append(1)
+        self._active = self._segments[-1]
+        self._fd = os.open(self._path(self._active), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._size = os.fstat(self._fd).st_size
+
+    # ----- files -------------------------------------------------------------
+
+    def _path(self, number: int) -> Path:
+        return self.directory / _segment_name(number)
+
+    def _map(self, number: int, needed: int = 0) -> mmap.mmap | None:
+        """Read-only map of a segment, re-mapped if the active segment grew past it."""
+        mapped = self._maps.get(number)
+        if mapped is not None and len(mapped) >= needed:
+            return mapped
+        if mapped is not None:
+            mapped.close()
+        try:
+            with open(self._path(number), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except FileNotFoundError:
+            mapped = None
+        if mapped is None:
+            self._maps.pop(number, None)
+            return None
+        self._maps[number] = mapped
+        return mapped
+
+    def _records(self, data: mmap.mmap | None):
+        """(offset, size, depth, kind, thread id) of each valid record; stops at the first bad one."""
+        offset, end = 0, len(data) if data is not None else 0
+        while offset + _HEADER.size <= end:
+            body_len, crc, _, _, depth, kind, tid_len = _HEADER.unpack_from(data, offset)
+            size = _HEADER.size + tid_len + body_len
+            if offset + size > end or zlib.crc32(data[offset + _CRC_FROM:offset + size]) != crc:
+                break
+            yield offset, size, depth, kind, data[offset + _HEADER.size:offset + _HEADER.size + tid_len].decode()
+            offset += size
+
+    def _load_segment(self, number: int, last: bool) -> None:
+        base = number << _OFFSET_BITS
+        valid = 0
+        for offset, size, depth, kind, tid in self._records(self._map(number)):
+            if kind == _TOMBSTONE:
+                self._index.pop(tid, None)
+            else:
+                self._index[tid] = (base | offset) << _DEPTH_BITS | depth
+            valid = offset + size
+        if valid < self._path(number).stat().st_size:
+            if last:
+                # A crash mid-append leaves a partial record at the end: drop it
+                print(f"thread_store: truncating torn tail of {_segment_name(number)} at byte {valid}")
+                self._maps.pop(number).close()
+                os.truncate(self._path(number), valid)
+            else:
+                print(f"thread_store: {_segment_name(number)} is damaged after byte {valid}")
+
+    def _record_bytes(self, tid: bytes, payload: bytes, prev: int, ts: float, depth: int, kind: int) -> bytes:
+        rest = _HEADER.pack(len(payload), 0, prev, ts, depth, kind, len(tid))[_CRC_FROM:] + tid + payload
+        return struct.pack("<II", len(payload), zlib.crc32(rest)) + rest
+
+    def _write(self, data: bytes) -> None:
+        os.write(self._fd, data)
+        if self.fsync:
+            os.fsync(self._fd)
+        self._size += len(data)
+
+    def _append_chain(self, thread_id: str, items: Sequence[tuple[bytes, float, int]], prev: int) -> int:
+        """Write (payload, ts, depth) records linked after `prev` in one write; returns the new head."""
+        if self._size >= self.segment_bytes:
+            self._roll()
+        tid = thread_id.encode()
+        base, offset, records = self._active << _OFFSET_BITS, self._size, []
+        for payload, ts, depth in items:
+            record = self._record_bytes(tid, payload, prev, ts, depth, _MESSAGE)
+            prev = base | offset
+            offset += len(record)
+            records.append(record)
+        self._write(b"".join(records))
+        return prev
+
+    def _roll(self) -> None:
+        os.close(self._fd)
+        # Its map may predate the last appends; sealed segments are re-mapped whole
+        mapped = self._maps.pop(self._active, None)
+        if mapped is not None:
+            mapped.close()
+        self._active += 1
+        self._segments.append(self._active)
+        self._fd = os.open(self._path(self._active), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._size = 0
+
+    def _read(self, location: int) -> tuple[tuple[int, float, int, int], bytes] | None:
+        number, offset = location >> _OFFSET_BITS, location & ((1 << _OFFSET_BITS) - 1)
+        data = self._map(number, offset + _HEADER.size)
+        if data is None or offset + _HEADER.size > len(data):
+            return None  # segment compacted away: the chain ends here
+        body_len, _, prev, ts, depth, kind, tid_len = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size + tid_len
+        if start + body_len > len(data):
+            data = self._map(number, start + body_len)
+        return (prev, ts, depth, kind), data[start:start + body_len]
+
+    # ----- API ---------------------------------------------------------------
+
+    def append(self, thread_id: str, payloads: Sequence[bytes], ts: float | None = None) -> None:
+        """Append messages to a thread (creating it if needed)."""
+        if not payloads:
+            return
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            head = self._index.get(thread_id, 0)
+            depth = head & ((1 << _DEPTH_BITS) - 1)
+            items = [(payload, ts, depth + i) for i, payload in enumerate(payloads, 1)]
+            head = self._append_chain(thread_id, items, head >> _DEPTH_BITS)
+            self._index[thread_id] = head << _DEPTH_BITS | depth + len(payloads)
+
+    def read(self, thread_id: str, last: int | None = None) -> list[bytes]:
+        """The thread's newest `last` payloads (all retained ones if None), oldest first."""
+        limit = min(last or self.max_messages, self.max_messages)
+        out: list[bytes] = []
+        with self._lock:
+            location = self._index.get(thread_id, 0) >> _DEPTH_BITS
+            while location and len(out) < limit:
+                record = self._read(location)
+                if record is None:
+                    break
+                (location, *_), payload = record
+                out.append(payload)
+        out.reverse()
+        return out
+
+    def count(self, thread_id: str) -> int:
+        """Messages ever appended to the thread (including ones compacted away)."""
+        return self._index.get(thread_id, 0) & ((1 << _DEPTH_BITS) - 1)
+
+    def __contains__(self, thread_id: str) -> bool:
+        return thread_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def delete(self, thread_id: str) -> None:
+        with self._lock:
+            if self._index.pop(thread_id, None) is not None:
+                self._write(self._record_bytes(thread_id.encode(), b"", 0, time.time(), 0, _TOMBSTONE))
+
+    # ----- compaction --------------------------------------------------------
+
+    def _live_chain(self, thread_id: str, now: float, limit: int | None = None) -> list[int] | None:
+        """Locations of the thread's retained records, newest first; None if it expired."""
+        chain: list[int] = []
+        location = self._index.get(thread_id, 0) >> _DEPTH_BITS
+        while location and len(chain) < (limit or self.max_messages):
+            record = self._read(location)
+            if record is None:
+                break
+            (prev, ts, _, _), _ = record
+            if not chain and self.ttl_s and now - ts > self.ttl_s:
+                return None
+            chain.append(location)
+            location = prev
+        return chain
+
+    def compact(self, live_ratio: float | None = None) -> dict[str, int]:
+        """Rewrite sealed segments whose live bytes are below `live_ratio` of their size.
+
+        Appends keep going while this runs; the store lock is only held per thread.
+        """
+        if live_ratio is None:
+            live_ratio = float(os.environ.get("THREAD_STORE_COMPACT_LIVE_RATIO", "0.5"))
+        stats = {"segments": 0, "threads_moved": 0, "threads_expired": 0, "bytes_freed": 0}
+        depth_mask = (1 << _DEPTH_BITS) - 1
+        for number in [n for n in self._segments if n != self._active]:
+            with self._lock:
+                data = self._map(number)
+            # Sealed segments never change, so the header scan needs no lock. A record is
+            # retained iff its depth is within max_messages of its thread's newest one.
+            newest: dict[str, int] = {}
+            tombstones: set[str] = set()
+            live = 0
+            for _, size, depth, kind, tid in self._records(data):
+                if kind == _TOMBSTONE:
+                    tombstones.add(tid)
+                    continue
+                newest[tid] = max(depth, newest.get(tid, 0))
+                if depth > (self._index.get(tid, 0) & depth_mask) - self.max_messages and tid in self._index:
+                    live += size
+            total = self._path(number).stat().st_size
+            expired = set()
+            if self.ttl_s:
+                now = time.time()
+                for tid in newest:
+                    with self._lock:
+                        if tid in self._index and self._live_chain(tid, now, limit=1) is None:
+                            expired.add(tid)
+            if total and live / total >= live_ratio and not expired:
+                continue
+
+            older_exist = number != self._segments[0]
+            for tid in newest.keys() | tombstones:
+                with self._lock:
+                    head = self._index.get(tid)
+                    if head is None:
+                        # Still deleted: keep the tombstone while older records could resurrect it
+                        if tid in tombstones and older_exist:
+                            self._write(self._record_bytes(tid.encode(), b"", 0, time.time(), 0, _TOMBSTONE))
+                        continue
+                    if tid in expired:
+                        self.delete(tid)
+                        stats["threads_expired"] += 1
+                        continue
+                    if newest.get(tid, 0) <= (head & depth_mask) - self.max_messages:
+                        continue  # everything it has here is past retention
+                    chain = self._live_chain(tid, time.time()) or []
+                    if not any(loc >> _OFFSET_BITS == number for loc in chain):
+                        continue
+                    # Re-append the retained chain as a fresh one, keeping timestamps and depths
+                    items = [(payload, ts, depth) for (_, ts, depth, _), payload in map(self._read, reversed(chain))]
+                    head = self._append_chain(tid, items, 0)
+                    self._index[tid] = head << _DEPTH_BITS | self.count(tid)
+                    stats["threads_moved"] += 1
+
+            with self._lock:
+                # The moved records and kept tombstones must be on disk before their only
+                # other copy goes, or a crash here loses or resurrects threads
+                os.fsync(self._fd)
+                self._segments.remove(number)
+                mapped = self._maps.pop(number, None)
+                if mapped is not None:
+                    mapped.close()
+                stats["bytes_freed"] += total
+                self._path(number).unlink()
+            stats["segments"] += 1
+        return stats
+
+    def start_compactor(self, interval_s: float | None = None) -> None:
+        """Run compact() every interval on a daemon thread."""
+        if interval_s is None:
+            interval_s = float(os.environ.get("THREAD_STORE_COMPACT_INTERVAL_S", "300"))
+        if self._compactor is not None or interval_s <= 0:
+            return
+
+        def loop():
+            while not self._stop.wait(interval_s):
+                try:
+                    stats = self.compact()
+                except Exception as exc:
+                    print(f"thread_store: compaction failed: {exc}")
+                    continue
+                if stats["segments"]:
+                    print(f"thread_store: compacted {stats}")
+
+        self._compactor = threading.Thread(target=loop, name="thread-store-compactor", daemon=True)
+        self._compactor.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            os.close(self._fd)
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+
+# ----- Agent Framework adapter -------------------------------------------------
+
+_shared_lock = threading.Lock()
+_shared: ThreadStore | None = None
+
+
+def get_store() -> ThreadStore:
+    """Process-wide store in THREAD_STORE_DIR, with the background compactor running."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ThreadStore(os.environ["THREAD_STORE_DIR"])
+            _shared.start_compactor()
+        return _shared
+
+
+class ThreadStoreMessageStore:
+    """ChatMessageStoreProtocol backed by a ThreadStore.
+
+    Serialized state is just the thread id, so (de)serializing an AgentThread no longer
+    copies its history. list_messages() returns the newest THREAD_STORE_HISTORY_MESSAGES.
+    """
+
+    def __init__(self, thread_id: str | None = None, store: ThreadStore | None = None, last: int | None = None):
+        self.thread_id = thread_id or uuid.uuid4().hex
+        self.store = store if store is not None else get_store()
+        self.last = last or int(os.environ.get("THREAD_STORE_HISTORY_MESSAGES", "100"))
+
+    async def add_messages(self, messages: Sequence[ChatMessage], **kwargs: Any) -> None:
+        payloads = [json.dumps(m.to_dict(), separators=(",", ":")).encode() for m in messages]
+        self.store.append(self.thread_id, payloads)
+
+    async def list_messages(self) -> list[ChatMessage]:
+        return [ChatMessage.from_dict(json.loads(p)) for p in self.store.read(self.thread_id, self.last)]
+
+    async def serialize(self, **kwargs: Any) -> dict[str, Any]:
+        # "messages" keeps the state valid wherever a ChatMessageStoreState is expected
+        return {"thread_id": self.thread_id, "messages": []}
+
+    @classmethod
+    async def deserialize(cls, serialized_store_state: MutableMapping[str, Any], **kwargs: Any) -> "ThreadStoreMessageStore":
+        store = cls(store=kwargs.get("store"))
+        await store.update_from_state(serialized_store_state)
+        return store
+
+    async def update_from_state(self, serialized_store_state: MutableMapping[str, Any], **kwargs: Any) -> None:
+        if not serialized_store_state:
+            return
+        if serialized_store_state.get("thread_id"):
+            self.thread_id = serialized_store_state["thread_id"]
+        elif serialized_store_state.get("messages"):
+            # State from the default in-memory store: import its history into this thread
+            messages = [m if isinstance(m, ChatMessage) else ChatMessage.from_dict(m) for m in serialized_store_state["messages"]]
+            await self.add_messages(messages)
+
+
+class StoredAgentThread(AgentThread):
+    """AgentThread whose serialized form points at its history in the store.
+
+    AgentThreadState only keeps a store's `messages`, which would drop the thread id;
+    this keeps the store's own state and hands it back on deserialize() and
+    update_from_thread_state().
+    """
+
+    @classmethod
+    async def deserialize(
+        cls,
+        serialized_thread_state: MutableMapping[str, Any],
+        *,
+        message_store: Any = None,
+        **kwargs: Any,
+    ) -> "StoredAgentThread":
+        store_state = (serialized_thread_state or {}).get("chat_message_store_state") or {}
+        if not store_state.get("thread_id") or not (message_store is None or isinstance(message_store, ThreadStoreMessageStore)):
+            return await super().deserialize(serialized_thread_state, message_store=message_store, **kwargs)
+        if message_store is None:
+            message_store = await ThreadStoreMessageStore.deserialize(store_state, store=kwargs.get("store"))
+        else:
+            await message_store.update_from_state(store_state)
+        return cls(message_store=message_store)
+
+    async def serialize(self, **kwargs: Any) -> dict[str, Any]:
+        state = await super().serialize(**kwargs)
+        if isinstance(self.message_store, ThreadStoreMessageStore):
+            state["chat_message_store_state"] = await self.message_store.serialize()
+        return state
+
+    async def update_from_thread_state(self, serialized_thread_state: MutableMapping[str, Any], **kwargs: Any) -> None:
+        store_state = (serialized_thread_state or {}).get("chat_message_store_state") or {}
+        if isinstance(self.message_store, ThreadStoreMessageStore) and store_state:
+            await self.message_store.update_from_state(store_state)
+            return
+        await super().update_from_thread_state(serialized_thread_state, **kwargs)
+
+
+if __name__ == "__main__":
+    import random
+    import shutil
+    import sys
+    import tempfile
+
+    directory = Path(tempfile.mkdtemp(prefix="thread-store-"))
+    threads, turns = 100_000, 10
+    rng = random.Random(3)
+    payload = json.dumps({"type": "chat_message", "role": {"type": "role", "value": "user"},
+                          "contents": [{"type": "text", "text": "how do I rotate the storage key? " * 3}]}).encode()
+    try:
+        store = ThreadStore(directory, segment_bytes=32 * 1024 * 1024, max_messages=8)
+        started = time.perf_counter()
+        for turn in range(turns):
+            for t in range(threads):
+                store.append(f"t{t}", [payload, payload])
+        elapsed = time.perf_counter() - started
+        index_mb = (sys.getsizeof(store._index) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in store._index.items())) / 1e6
+        messages = threads * turns * 2
+        print(f"append: {messages / elapsed:,.0f} messages/s; {threads:,} threads, index {index_mb:.1f} MB")
+
+        sample = [f"t{rng.randrange(threads)}" for _ in range(20_000)]
+        started = time.perf_counter()
+        for tid in sample:
+            assert len(store.read(tid, last=6)) == 6
+        print(f"read last 6: {(time.perf_counter() - started) / len(sample) * 1e6:.1f} us per thread")
+
+        size = sum(p.stat().st_size for p in directory.glob("seg-*.log"))
+        started = time.perf_counter()
+        stats = store.compact()
+        after = sum(p.stat().st_size for p in directory.glob("seg-*.log"))
+        print(f"compact: {size / 1e6:.0f} MB -> {after / 1e6:.0f} MB in {time.perf_counter() - started:.1f}s {stats}")
+        assert store.read("t42") == [payload] * 8
+
+        store.delete("t7")
+        store.close()
+        started = time.perf_counter()
+        store = ThreadStore(directory, max_messages=8)
+        print(f"reopen (index rebuild): {time.perf_counter() - started:.1f}s for {len(store):,} threads")
+        assert "t7" not in store and store.read("t42") == [payload] * 8 and store.count("t42") == turns * 2
+        store.close()
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,214 @@
+"""
+Wait for a hosted agent version to reach Running, then warm it up.
+
+Replaces wait_for_agent.sh: status is polled with exponential backoff + jitter against the
+version that was actually created. Each poll is one GET of the version's container
+(/agents/<name>/versions/<version>/containers/default) sent through the AIProjectClient
+pipeline, so it reuses the client's credential and pooled connection. The typed
+AgentVersionDetails model has no status or container field. The waiter never starts the agent.
+As in the script, a container error message fails the wait.
+
+Usage:
+  python wait_for_agent.py --agent my-hosted-agent --version 9
+  python wait_for_agent.py --agent my-hosted-agent            # latest version
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from azure.ai.projects import AIProjectClient
+from azure.core.rest import HttpRequest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root: foundry_clients
+from foundry_clients import get_project_client
+
+PROJECT_ENDPOINT = os.getenv(
+    "AZURE_AI_PROJECT_ENDPOINT",
+    "https://ozgurguler-7212-resource.services.ai.azure.com/api/projects/ozgurguler-7212",
+)
+
+_FAILED = {"Failed", "Canceled", "Cancelled"}
+
+
+def _field(obj: Any, name: str) -> Any:
+    """Read a field from an SDK model or plain dict (preview models differ by version)."""
+    if obj is None:
+        return None
+    value = getattr(obj, name, None)
+    if value is None and hasattr(obj, "get"):
+        value = obj.get(name)
+    return value
+
+
+@dataclass
+class ReadinessTimings:
+    """Seconds from `deployed_at` to each milestone."""
+
+    running_s: float | None = None
+    first_response_s: float | None = None
+    warmup_s: float | None = None
+    polls: int = 0
+    warmup_latencies_s: list[float] = field(default_factory=list)
+
+    def report(self) -> str:
+        def fmt(value: float | None) -> str:
+            return f"{value:7.2f}s" if value is not None else "      -"
+
+        lines = [
+            f"  deploy -> running         {fmt(self.running_s)}  ({self.polls} status polls)",
+            f"  deploy -> first response  {fmt(self.first_response_s)}",
+            f"  deploy -> warm            {fmt(self.warmup_s)}",
+        ]
+        if self.warmup_latencies_s:
+            lines.append("  warmup latencies          " + ", ".join(f"{s:.2f}s" for s in self.warmup_latencies_s))
+        return "\n".join(lines)
+
+
+def latest_version(client: AIProjectClient, agent_name: str) -> str:
+    agent = client.agents.get(agent_name=agent_name)
+    return str(_field(_field(_field(agent, "versions"), "latest"), "version"))
+
+
+def _container(client: AIProjectClient, agent_name: str, agent_version: str) -> dict:
+    """The version's container, read in-process; {} while the service has none to report yet."""
+    api_version = getattr(getattr(client, "_config", None), "api_version", None) or "2025-11-15-preview"
+    request = HttpRequest(
+        "GET",
+        f"{{endpoint}}/agents/{agent_name}/versions/{agent_version}/containers/default",
+        params={"api-version": api_version},
+        headers={"Accept": "application/json"},
+    )
+    response = client.send_request(request)
+    if response.status_code == 404 or response.status_code >= 500:
+        return {}  # like the script: an unreadable status is "not running yet", keep polling
+    response.raise_for_status()
+    payload = response.json() or {}
+    # Some previews wrap it in the version payload
+    return payload["container"] if isinstance(payload.get("container"), dict) else payload
+
+
+def get_status(client: AIProjectClient, agent_name: str, agent_version: str) -> tuple[str | None, str | None]:
+    """Return (container status, container error message)."""
+    container = _container(client, agent_name, agent_version)
+    return container.get("status"), container.get("error_message")
+
+
+def backoff_delays(initial: float = 0.5, factor: float = 1.7, maximum: float = 10.0):
+    """Exponential backoff with jitter: early polls are fast, later ones back off."""
+    delay = initial
+    while True:
+        yield random.uniform(delay / 2, delay)
+        delay = min(maximum, delay * factor)
+
+
+def wait_until_running(
+    client: AIProjectClient,
+    agent_name: str,
+    agent_version: str,
+    timeout_s: float = 300,
+    timings: ReadinessTimings | None = None,
+    deployed_at: float | None = None,
+) -> ReadinessTimings:
+    timings = timings or ReadinessTimings()
+    deployed_at = deployed_at or time.monotonic()
+    deadline = time.monotonic() + timeout_s
+    last = None
+
+    for delay in backoff_delays():
+        container_status, error_msg = get_status(client, agent_name, agent_version)
+        timings.polls += 1
+
+        if container_status == "Running":
+            timings.running_s = time.monotonic() - deployed_at
+            return timings
+        if container_status in _FAILED:
+            raise RuntimeError(f"Agent {agent_name} v{agent_version} failed to start: {error_msg or container_status}")
+        if error_msg and error_msg.strip() and error_msg != "null":
+            raise RuntimeError(f"Agent {agent_name} v{agent_version} container error: {error_msg}")
+
+        if container_status != last:
+            print(f"Waiting... container={container_status}")
+            last = container_status
+        if time.monotonic() + delay > deadline:
+            break
+        time.sleep(delay)
+
+    raise TimeoutError(f"Timed out after {timeout_s}s waiting for {agent_name} v{agent_version} to reach Running")
+
+
+def warm_up(
+    client: AIProjectClient,
+    agent_name: str,
+    agent_version: str,
+    requests: int = 2,
+    timeout_s: float = 120,
+    timings: ReadinessTimings | None = None,
+    deployed_at: float | None = None,
+) -> ReadinessTimings:
+    """Send small requests until one succeeds, then `requests - 1` more to fill caches/pools."""
+    timings = timings or ReadinessTimings()
+    deployed_at = deployed_at or time.monotonic()
+    openai_client = client.get_openai_client()
+    agent_ref = {"name": agent_name, "version": str(agent_version), "type": "agent_reference"}
+    deadline = time.monotonic() + timeout_s
+    delays = backoff_delays(initial=0.25, maximum=5.0)
+
+    while len(timings.warmup_latencies_s) < requests:
+        started = time.monotonic()
+        try:
+            openai_client.responses.create(input=[{"role": "user", "content": "ping"}], extra_body={"agent": agent_ref})
+        except Exception as exc:
+            # Running but not serving yet (container still importing) - retry with backoff
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No successful response from {agent_name} v{agent_version}: {exc}") from exc
+            time.sleep(next(delays))
+            continue
+        timings.warmup_latencies_s.append(time.monotonic() - started)
+        if timings.first_response_s is None:
+            timings.first_response_s = time.monotonic() - deployed_at
+
+    timings.warmup_s = time.monotonic() - deployed_at
+    return timings
+
+
+def wait_for_agent(
+    client: AIProjectClient,
+    agent_name: str,
+    agent_version: str,
+    deployed_at: float | None = None,
+    timeout_s: float = 300,
+    warmup_requests: int = 2,
+) -> ReadinessTimings:
+    """Running → first successful response → warm. `deployed_at` is a time.monotonic() value."""
+    deployed_at = deployed_at or time.monotonic()
+    timings = wait_until_running(client, agent_name, agent_version, timeout_s, deployed_at=deployed_at)
+    if warmup_requests > 0:
+        warm_up(client, agent_name, agent_version, warmup_requests, timings=timings, deployed_at=deployed_at)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agent", default=os.getenv("HOSTED_AGENT_NAME", "my-hosted-agent"))
+    parser.add_argument("--version", help="agent version to wait for (default: latest)")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--warmup", type=int, default=2, help="warmup requests after Running (0 to skip)")
+    args = parser.parse_args()
+
+    client = get_project_client(PROJECT_ENDPOINT)
+    version = args.version or latest_version(client, args.agent)
+    print(f"Waiting for {args.agent} v{version} to start...")
+
+    timings = wait_for_agent(client, args.agent, version, timeout_s=args.timeout, warmup_requests=args.warmup)
+    print("\nAgent is running!")
+    print(timings.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Local indexed mirror of the API Center tool catalog.
+
+Key point:
+- Agent builds resolve MCP servers from an in-memory index (name, tag, capability)
+  instead of listing API Center every time: a lookup is a dict access.
+- The index is persisted to a JSON file, so a new process starts warm.
+- ApiCenterSync refreshes it incrementally: one paged `apis` listing, then per-API
+  details (deployments) only for entries whose ETag / lastModifiedAt changed, fetched
+  concurrently. Removed APIs are dropped. Within `min_interval_s` of the last sync no
+  network call is made at all.
+- An API whose deployments could not be fetched is not upserted: it keeps its old entry
+  and change token, so the next sync fetches it again.
+
+Where tags and capabilities come from (API Center custom properties on the API):
+- tags:         customProperties.tags (list) + kind + lifecycle stage
+- capabilities: customProperties.capabilities (list) + customProperties.tools (tool names)
+- server URL:   customProperties.mcpEndpoint, else the first deployment runtimeUri
+
+Usage:
+    catalog = ToolCatalog()
+    ApiCenterSync(catalog, SUBSCRIPTION_ID, RESOURCE_GROUP, API_CENTER_NAME).refresh()
+    tool = catalog.mcp_tool(capability="incident-management")
+"""
+
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root: foundry_mgmt
+from foundry_mgmt import ARM, arm_get, arm_get_many
+
+API_CENTER_API_VERSION = "2024-03-01"
+# Lifecycle stages, most preferred first, when several servers match a lookup
+_LIFECYCLE_ORDER = ["production", "preview", "testing", "development", "design"]
+
+
+def _norm(term: str) -> str:
+    return term.strip().lower()
+
+
+@dataclass
+class CatalogEntry:
+    """One API Center API (MCP server) as seen by agent builds."""
+
+    name: str
+    title: str = ""
+    kind: str = ""
+    description: str = ""
+    url: str | None = None
+    lifecycle_stage: str = ""
+    tags: list[str] = field(default_factory=list)
+    capabilities: list[str] = field(default_factory=list)
+    change_token: str = ""
+
+    @property
+    def server_label(self) -> str:
+        return self.name.replace("-", "_")
+
+    def to_mcp_tool(self, allowed_tools: list[str] | None = None):
+        from azure.ai.agents.models import McpTool
+
+        if not self.url:
+            raise ValueError(f"Catalog entry {self.name!r} has no MCP endpoint")
+        return McpTool(server_label=self.server_label, server_url=self.url, allowed_tools=allowed_tools or [])
+
+
+class ToolCatalog:
+    """In-memory indexes over the mirrored catalog, persisted to a JSON file."""
+
+    def __init__(self, path: str | os.PathLike | None = None):
+        self.path = Path(path or os.getenv("TOOL_CATALOG_PATH", ".tool-catalog.json"))
+        state = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self.synced_at: float = state.get("synced_at", 0.0)
+        self._entries: dict[str, CatalogEntry] = {}
+        self._by_tag: dict[str, set[str]] = {}
+        self._by_capability: dict[str, set[str]] = {}
+        for raw in state.get("entries", []):
+            self._index(CatalogEntry(**raw))
+
+    # ----- index maintenance --------------------------------------------------
+
+    def _index(self, entry: CatalogEntry) -> None:
+        self._unindex(entry.name)
+        self._entries[entry.name] = entry
+        for tag in entry.tags:
+            self._by_tag.setdefault(_norm(tag), set()).add(entry.name)
+        for capability in entry.capabilities:
+            self._by_capability.setdefault(_norm(capability), set()).add(entry.name)
+
+    def _unindex(self, name: str) -> None:
+        old = self._entries.pop(name, None)
+        if old is None:
+            return
+        for index, terms in ((self._by_tag, old.tags), (self._by_capability, old.capabilities)):
+            for term in terms:
+                names = index.get(_norm(term))
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del index[_norm(term)]
+
+    def upsert(self, entries: list[CatalogEntry]) -> None:
+        for entry in entries:
+            self._index(entry)
+
+    def remove(self, names: list[str]) -> None:
+        for name in names:
+            self._unindex(name)
+
+    def save(self, synced_at: float | None = None) -> None:
+        if synced_at is not None:
+            self.synced_at = synced_at
+        state = {"synced_at": self.synced_at, "entries": [asdict(e) for e in self._entries.values()]}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(state, indent=2))
+        tmp.replace(self.path)
+
+    # ----- lookups ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def change_tokens(self) -> dict[str, str]:
+        return {name: entry.change_token for name, entry in self._entries.items()}
+
+    def get(self, name: str) -> CatalogEntry | None:
+        return self._entries.get(name)
+
+    def find(self, capability: str | None = None, tag: str | None = None, kind: str | None = "mcp") -> list[CatalogEntry]:
+        """Entries matching every given filter, best lifecycle stage first."""
+        names: set[str] | None = None
+        if capability is not None:
+            names = set(self._by_capability.get(_norm(capability), ()))
+        if tag is not None:
+            tagged = self._by_tag.get(_norm(tag), set())
+            names = tagged if names is None else names & tagged
+        candidates = [self._entries[n] for n in names] if names is not None else list(self._entries.values())
+        if kind is not None:
+            candidates = [e for e in candidates if e.kind == kind]
+
+        def rank(entry: CatalogEntry) -> tuple[int, str]:
+            stage = entry.lifecycle_stage.lower()
+            order = _LIFECYCLE_ORDER.index(stage) if stage in _LIFECYCLE_ORDER else len(_LIFECYCLE_ORDER)
+            return order, entry.name
+
+        return sorted(candidates, key=rank)
+
+    def resolve(self, name: str | None = None, capability: str | None = None, tag: str | None = None) -> CatalogEntry:
+        if name is not None:
+            entry = self.get(name)
+            if entry is None:
+                raise KeyError(f"No catalog entry named {name!r}")
+            return entry
+        matches = [e for e in self.find(capability=capability, tag=tag) if e.url]
+        if not matches:
+            raise KeyError(f"No MCP server in the catalog for capability={capability!r} tag={tag!r}")
+        return matches[0]
+
+    def mcp_tool(
+        self,
+        name: str | None = None,
+        capability: str | None = None,
+        tag: str | None = None,
+        allowed_tools: list[str] | None = None,
+    ):
+        """McpTool for the best matching catalog entry."""
+        return self.resolve(name=name, capability=capability, tag=tag).to_mcp_tool(allowed_tools)
+
+
+@dataclass
+class SyncStats:
+    listed: int = 0
+    fetched: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    skipped: bool = False
+    seconds: float = 0.0
+
+
+class ApiCenterSync:
+    """Mirrors one API Center workspace into a ToolCatalog."""
+
+    def __init__(
+        self,
+        catalog: ToolCatalog,
+        subscription_id: str,
+        resource_group: str,
+        service_name: str,
+        workspace: str = "default",
+    ):
+        self.catalog = catalog
+        self.apis_url = (
+            f"{ARM}/subscriptions/{subscription_id}/resourceGroups/{resource_group}"
+            f"/providers/Microsoft.ApiCenter/services/{service_name}/workspaces/{workspace}/apis"
+        )
+
+    @staticmethod
+    def change_token(api: dict[str, Any]) -> str:
+        return api.get("etag") or (api.get("systemData") or {}).get("lastModifiedAt") or ""
+
+    def _entry(self, api: dict[str, Any], deployments: dict[str, Any] | None) -> CatalogEntry:
+        props = api.get("properties", {})
+        custom = props.get("customProperties") or {}
+        url = custom.get("mcpEndpoint")
+        if not url and isinstance(deployments, dict):
+            for deployment in deployments.get("value", []):
+                runtime = (deployment.get("properties", {}).get("server") or {}).get("runtimeUri") or []
+                if runtime:
+                    url = runtime[0]
+                    break
+
+        tools = [t["name"] if isinstance(t, dict) else t for t in custom.get("tools", [])]
+        tags = list(custom.get("tags", []))
+        tags += [t for t in (props.get("kind"), props.get("lifecycleStage")) if t]
+        return CatalogEntry(
+            name=api["name"],
+            title=props.get("title", ""),
+            kind=props.get("kind", ""),
+            description=props.get("description") or props.get("summary") or "",
+            url=url,
+            lifecycle_stage=props.get("lifecycleStage", ""),
+            tags=tags,
+            capabilities=list(custom.get("capabilities", [])) + tools,
+            change_token=self.change_token(api),
+        )
+
+    def refresh(self, force: bool = False, min_interval_s: float | None = None) -> SyncStats:
+        """Bring the catalog up to date; only changed APIs are fetched in detail."""
+        started = time.perf_counter()
+        min_interval_s = float(os.getenv("TOOL_CATALOG_MIN_REFRESH_S", "60")) if min_interval_s is None else min_interval_s
+        if not force and len(self.catalog) and time.time() - self.catalog.synced_at < min_interval_s:
+            return SyncStats(listed=len(self.catalog), unchanged=len(self.catalog), skipped=True)
+
+        apis = arm_get(self.apis_url, API_CENTER_API_VERSION).get("value", [])
+        known = self.catalog.change_tokens()
+        # An entry without any change token can't be compared, so it is always re-fetched
+        changed = [a for a in apis if force or not known.get(a["name"]) or known[a["name"]] != self.change_token(a)]
+
+        # Deployments are only needed for the URL fallback; skip them when mcpEndpoint is set
+        needs_deployments = {
+            a["name"]: (f"{self.apis_url}/{a['name']}/deployments", API_CENTER_API_VERSION)
+            for a in changed
+            if not (a.get("properties", {}).get("customProperties") or {}).get("mcpEndpoint")
+        }
+        deployments = arm_get_many(needs_deployments)
+        failed = [a for a in changed if isinstance(deployments.get(a["name"]), Exception)]
+        for api in failed:
+            print(f"tool_catalog: deployments of {api['name']} not fetched, retrying next sync: {deployments[api['name']]}")
+        self.catalog.upsert([self._entry(a, deployments.get(a["name"])) for a in changed if a not in failed])
+
+        listed = {a["name"] for a in apis}
+        removed = [name for name in known if name not in listed]
+        self.catalog.remove(removed)
+        self.catalog.save(synced_at=time.time())
+        return SyncStats(
+            listed=len(apis),
+            fetched=len(changed) - len(failed),
+            removed=len(removed),
+            unchanged=len(apis) - len(changed),
+            failed=len(failed),
+            seconds=time.perf_counter() - started,
+        )
+
+
+if __name__ == "__main__":
+    # Quick lookup benchmark against a synthetic catalog (no Azure calls)
+    import tempfile
+    import timeit
+
+    catalog = ToolCatalog(path=Path(tempfile.mkdtemp()) / "tool-catalog.json")
+    catalog.upsert([
+        CatalogEntry(
+            name=f"server-{i}",
+            kind="mcp",
+            url=f"https://example.invalid/{i}/mcp",
+            lifecycle_stage="production" if i % 3 else "preview",
+            tags=[f"team-{i % 10}"],
+            capabilities=[f"cap-{i % 50}", f"tool-{i}"],
+        )
+        for i in range(1000)
+    ])
+    runs = 100_000
+    per_call = timeit.timeit(lambda: catalog.resolve(capability="cap-7", tag="team-7"), number=runs) / runs
+    print(f"{len(catalog)} entries: resolve(capability, tag) {per_call * 1e6:.1f} µs")
@@ -0,0 +1,569 @@
+"""
+Record/replay cassettes for offline, deterministic runs of the workshop code.
+
+A cassette file holds request/response pairs, including every streamed chunk and its
+arrival time, so SSE streams (chat completions, agent run events) replay chunk for chunk.
+It plugs in below the SDKs, at the HTTP layer:
+
+- OpenAI SDK (httpx):     httpx.Client(transport=CassetteTransport(cassette))
+                          httpx.AsyncClient(transport=AsyncCassetteTransport(cassette))
+- Azure SDK (azure-core): session.mount("https://", CassetteAdapter(cassette)) on the
+                          requests.Session behind RequestsTransport
+
+foundry_clients.py does both automatically when CASSETTE=<path> is set, and in replay
+mode hands out ReplayCredential instead of DefaultAzureCredential, so a replayed run
+needs no Azure sign-in. The hosted ChatbotAgent (02-.../src/my-hosted-agent/main.py)
+does the same for its own httpx client when run from the repo.
+
+Modes (CASSETTE_MODE):
+- replay: never touch the network; an unrecorded request raises CassetteMiss
+- record: always call the live service and (re)write the cassette
+- auto:   replay what is recorded, record the rest (default)
+
+Timing (CASSETTE_TIMING): "fast" replays with no delays, "real" with the recorded
+time-to-headers and inter-chunk gaps, a number scales them (0.5 = twice as fast).
+
+Requests match on method, path, query and body (JSON bodies canonicalized), not host,
+so a cassette recorded against one endpoint replays against another. Repeated identical
+requests (status polling) replay in recorded order; once they are exhausted, replay mode
+repeats the last one and auto mode goes live.
+Authorization, api-key and cookie headers are never written.
+"""
+
+import asyncio
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+
+CASSETTE_VERSION = 1
+MODES = ("replay", "record", "auto")
+# Never persisted
+_SECRET_HEADERS = {
+    "authorization",
+    "api-key",
+    "ocp-apim-subscription-key",
+    "x-ms-authorization-auxiliary",
+    "cookie",
+    "set-cookie",
+}
+# Describe the original wire encoding, not the stored (decoded, unframed) body
+_HOP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive"}
+
+
+class CassetteMiss(KeyError):
+    """Replay mode and no recorded interaction matches the request."""
+
+
+def request_key(method: str, url: str, body: bytes | None) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    body = body or b""
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        pass
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    return f"{method.upper()} {parts.path}?{query} {digest}"
+
+
+def _kept_headers(headers: Any) -> dict[str, str]:
+    return {k.lower(): v for k, v in headers.items() if k.lower() not in _SECRET_HEADERS | _HOP_HEADERS}
+
+
+@dataclass
+class Interaction:
+    key: str
+    method: str
+    url: str
+    status: int = 0
+    headers: dict[str, str] = field(default_factory=dict)
+    wait_ms: float = 0.0  # request sent -> response headers
+    chunks: list[tuple[float, bytes]] = field(default_factory=list)  # (ms since previous, bytes)
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(chunk for _, chunk in self.chunks)
+
+    def to_json(self) -> dict[str, Any]:
+        chunks = []
+        for ms, chunk in self.chunks:
+            try:
+                chunks.append([ms, chunk.decode("utf-8")])
+            except UnicodeDecodeError:  # binary, or a chunk split inside a character
+                chunks.append([ms, {"b64": base64.b64encode(chunk).decode()}])
+        return {
+            "key": self.key,
+            "request": {"method": self.method, "url": self.url},
+            "response": {"status": self.status, "headers": self.headers, "wait_ms": self.wait_ms, "chunks": chunks},
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "Interaction":
+        response = data["response"]
+        chunks = [
+            (ms, base64.b64decode(c["b64"]) if isinstance(c, dict) else c.encode("utf-8"))
+            for ms, c in response["chunks"]
+        ]
+        return cls(
+            key=data["key"],
+            method=data["request"]["method"],
+            url=data["request"]["url"],
+            status=response["status"],
+            headers=response["headers"],
+            wait_ms=response.get("wait_ms", 0.0),
+            chunks=chunks,
+        )
+
+
+class _Recorder:
+    """Collects one live response's chunks with their timing; hands it to the cassette when done."""
+
+    def __init__(self, cassette: "Cassette", interaction: Interaction, headers_at: float):
+        self.cassette = cassette
+        self.interaction = interaction
+        self._last = headers_at
+        self._done = False
+
+    def chunk(self, data: bytes) -> None:
+        if data:
+            now = time.perf_counter()
+            self.interaction.chunks.append((round((now - self._last) * 1000, 1), bytes(data)))
+            self._last = now
+
+    def done(self) -> None:
+        if not self._done:
+            self._done = True
+            self.cassette.add(self.interaction)
+
+
+class Cassette:
+    """A cassette file plus the record/replay policy. Thread-safe."""
+
+    def __init__(self, path: str | os.PathLike, mode: str | None = None, timing: str | float | None = None):
+        self.path = Path(path)
+        self.mode = mode or os.getenv("CASSETTE_MODE", "auto")
+        if self.mode not in MODES:
+            raise ValueError(f"CASSETTE_MODE must be one of {MODES}, not {self.mode!r}")
+        timing = timing if timing is not None else os.getenv("CASSETTE_TIMING", "fast")
+        self.speed = {"fast": 0.0, "real": 1.0}[timing] if timing in ("fast", "real") else float(timing)
+        self._lock = threading.Lock()
+        self._recorded: list[Interaction] = []
+        self._by_key: dict[str, list[Interaction]] = {}
+        self._cursor: dict[str, int] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.mode != "record" and self.path.exists():
+            for raw in self._read().get("interactions", []):
+                interaction = Interaction.from_json(raw)
+                self._recorded.append(interaction)
+                self._by_key.setdefault(interaction.key, []).append(interaction)
+
+    def _read(self) -> dict[str, Any]:
+        data = self.path.read_bytes()
+        if self.path.suffix == ".gz":
+            data = gzip.decompress(data)
+        return json.loads(data)
+
+    # ----- lookup / record ----------------------------------------------------
+
+    def lookup(self, key: str) -> Interaction | None:
+        """Next recorded interaction for `key`, or None if it must go to the network."""
+        with self._lock:
+            if self.mode == "record":
+                return None
+            recorded = self._by_key.get(key)
+            if not recorded:
+                self.misses += 1
+                if self.mode == "replay":
+                    raise CassetteMiss(f"No recorded interaction for {key} in {self.path}")
+                return None
+            index = self._cursor.get(key, 0)
+            if index >= len(recorded) and self.mode == "auto":
+                # More identical calls than recorded (e.g. polling until done): go live
+                self.misses += 1
+                return None
+            self._cursor[key] = index + 1
+            self.hits += 1
+            return recorded[min(index, len(recorded) - 1)]
+
+    def start_recording(self, key: str, method: str, url: str, status: int, headers: Any, sent_at: float) -> _Recorder:
+        headers_at = time.perf_counter()
+        interaction = Interaction(
+            key=key,
+            method=method,
+            url=url,
+            status=status,
+            headers=_kept_headers(headers),
+            wait_ms=round((headers_at - sent_at) * 1000, 1),
+        )
+        return _Recorder(self, interaction, headers_at)
+
+    def add(self, interaction: Interaction) -> None:
+        with self._lock:
+            self._recorded.append(interaction)
+            self._by_key.setdefault(interaction.key, []).append(interaction)
+            # Served live, so it counts as consumed for this session
+            self._cursor[interaction.key] = len(self._by_key[interaction.key])
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(
+                {"version": CASSETTE_VERSION, "interactions": [i.to_json() for i in self._recorded]},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            if self.path.suffix == ".gz":
+                data = gzip.compress(data)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(self.path)
+            self._dirty = False
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.save()
+
+    # ----- replay pacing ------------------------------------------------------
+
+    def delay_s(self, ms: float) -> float:
+        return ms * self.speed / 1000
+
+    def replay_chunks(self, interaction: Interaction) -> Iterator[bytes]:
+        for ms, chunk in interaction.chunks:
+            if self.speed:
+                time.sleep(self.delay_s(ms))
+            yield chunk
+
+    async def areplay_chunks(self, interaction: Interaction):
+        for ms, chunk in interaction.chunks:
+            if self.speed:
+                await asyncio.sleep(self.delay_s(ms))
+            yield chunk
+
+
+_env_cassette: Cassette | None = None
+
+
+def from_env() -> Cassette | None:
+    """The process-wide cassette named by CASSETTE (saved at exit), or None."""
+    global _env_cassette
+    path = os.getenv("CASSETTE")
+    if not path:
+        return None
+    if _env_cassette is None or _env_cassette.path != Path(path):
+        _env_cassette = Cassette(path)
+        atexit.register(_env_cassette.save)
+    return _env_cassette
+
+
+def replaying() -> bool:
+    """True when CASSETTE is set and CASSETTE_MODE is replay."""
+    cassette = from_env()
+    return cassette is not None and cassette.mode == "replay"
+
+
+# ----- credentials ---------------------------------------------------------------
+
+
+def _static_token(scopes: tuple[str, ...]) -> Any:
+    from azure.core.credentials import AccessToken
+
+    return AccessToken("replay", int(time.time()) + 3600)
+
+
+class ReplayCredential:
+    """Token credential for replay runs: recorded requests are matched without their
+    Authorization header, so no real token (credential chain, az CLI, IMDS) is needed."""
+
+    def get_token(self, *scopes: str, **kwargs: Any) -> Any:
+        return _static_token(scopes)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ReplayCredential":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+class AsyncReplayCredential:
+    """ReplayCredential for azure.identity.aio callers."""
+
+    async def get_token(self, *scopes: str, **kwargs: Any) -> Any:
+        return _static_token(scopes)
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "AsyncReplayCredential":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+
+# ----- httpx (OpenAI SDK) --------------------------------------------------------
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    def __init__(self, cassette: Cassette, interaction: Interaction):
+        self._chunks = cassette.replay_chunks(interaction)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._chunks
+
+
+class _AsyncReplayStream(httpx.AsyncByteStream):
+    def __init__(self, cassette: Cassette, interaction: Interaction):
+        self._chunks = cassette.areplay_chunks(interaction)
+
+    async def __aiter__(self):
+        async for chunk in self._chunks:
+            yield chunk
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    def __init__(self, inner: Any, recorder: _Recorder):
+        self._inner = inner
+        self._recorder = recorder
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._inner:
+            self._recorder.chunk(chunk)
+            yield chunk
+        self._recorder.done()
+
+    def close(self) -> None:
+        # Closed before the end (stream abandoned): keep what was received
+        self._recorder.done()
+        self._inner.close()
+
+
+class _AsyncRecordingStream(httpx.AsyncByteStream):
+    def __init__(self, inner: Any, recorder: _Recorder):
+        self._inner = inner
+        self._recorder = recorder
+
+    async def __aiter__(self):
+        async for chunk in self._inner:
+            self._recorder.chunk(chunk)
+            yield chunk
+        self._recorder.done()
+
+    async def aclose(self) -> None:
+        self._recorder.done()
+        await self._inner.aclose()
+
+
+def _replayed_response(interaction: Interaction, request: httpx.Request, stream: Any) -> httpx.Response:
+    return httpx.Response(interaction.status, headers=interaction.headers, stream=stream, request=request)
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """httpx transport that replays from / records to a cassette."""
+
+    def __init__(self, cassette: Cassette, transport: httpx.BaseTransport | None = None):
+        self.cassette = cassette
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request.method, str(request.url), request.read())
+        hit = self.cassette.lookup(key)
+        if hit is not None:
+            if self.cassette.speed:
+                time.sleep(self.cassette.delay_s(hit.wait_ms))
+            return _replayed_response(hit, request, _ReplayStream(self.cassette, hit))
+
+        # Uncompressed bodies, so the cassette stores readable, re-servable bytes
+        request.headers["accept-encoding"] = "identity"
+        sent_at = time.perf_counter()
+        response = self.transport.handle_request(request)
+        recorder = self.cassette.start_recording(
+            key, request.method, str(request.url), response.status_code, response.headers, sent_at
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, recorder),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    def close(self) -> None:
+        self.transport.close()
+        self.cassette.save()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """httpx async transport (AsyncOpenAI / AsyncAzureOpenAI) over a cassette."""
+
+    def __init__(self, cassette: Cassette, transport: httpx.AsyncBaseTransport | None = None):
+        self.cassette = cassette
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request.method, str(request.url), await request.aread())
+        hit = self.cassette.lookup(key)
+        if hit is not None:
+            if self.cassette.speed:
+                await asyncio.sleep(self.cassette.delay_s(hit.wait_ms))
+            return _replayed_response(hit, request, _AsyncReplayStream(self.cassette, hit))
+
+        request.headers["accept-encoding"] = "identity"
+        sent_at = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        recorder = self.cassette.start_recording(
+            key, request.method, str(request.url), response.status_code, response.headers, sent_at
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_AsyncRecordingStream(response.stream, recorder),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+        self.cassette.save()
+
+
+# ----- requests (azure-core RequestsTransport) -----------------------------------
+
+
+class _ReplayRaw:
+    """Stands in for urllib3's HTTPResponse as `requests.Response.raw`."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+        self.closed = False
+
+    def stream(self, amt: int | None = None, decode_content: bool | None = None) -> Iterator[bytes]:
+        if self._pending:
+            chunk, self._pending = self._pending, b""
+            yield chunk
+        for chunk in self._chunks:
+            yield chunk
+        self.closed = True
+
+    def read(self, amt: int | None = None, decode_content: bool | None = None, **kwargs: Any) -> bytes:
+        data = self._pending
+        while amt is None or len(data) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.closed = True
+                break
+            data += chunk
+        if amt is not None:
+            data, self._pending = data[:amt], data[amt:]
+        else:
+            self._pending = b""
+        return data
+
+    def close(self) -> None:
+        self.closed = True
+
+    def release_conn(self) -> None:
+        pass
+
+
+class _RecordingRaw:
+    """Wraps urllib3's HTTPResponse; every decoded chunk read is recorded."""
+
+    def __init__(self, raw: Any, recorder: _Recorder):
+        self._raw = raw
+        self._recorder = recorder
+
+    def stream(self, amt: int | None = None, decode_content: bool | None = None) -> Iterator[bytes]:
+        for chunk in self._raw.stream(amt, decode_content=True):
+            self._recorder.chunk(chunk)
+            yield chunk
+        self._recorder.done()
+
+    def read(self, amt: int | None = None, decode_content: bool | None = None, **kwargs: Any) -> bytes:
+        data = self._raw.read(amt, decode_content=True)
+        self._recorder.chunk(data)
+        if not data or amt is None:
+            self._recorder.done()
+        return data
+
+    def close(self) -> None:
+        self._recorder.done()
+        self._raw.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._raw, name)
+
+
+class CassetteAdapter:
+    """requests transport adapter over a cassette; mount it on the session azure-core uses."""
+
+    def __init__(self, cassette: Cassette, adapter: Any = None):
+        if adapter is None:
+            from requests.adapters import HTTPAdapter
+
+            adapter = HTTPAdapter()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request: Any, stream: bool = False, **kwargs: Any) -> Any:
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        if body is not None and not isinstance(body, bytes):
+            body = b"".join(body)  # generator / file-like upload bodies: buffer once
+            request.body = body
+        key = request_key(request.method, request.url, body)
+        hit = self.cassette.lookup(key)
+        if hit is not None:
+            if self.cassette.speed:
+                time.sleep(self.cassette.delay_s(hit.wait_ms))
+            response = requests.Response()
+            response.status_code = hit.status
+            response.headers = CaseInsensitiveDict(hit.headers)
+            response.raw = _ReplayRaw(self.cassette.replay_chunks(hit))
+            response.url = request.url
+            response.request = request
+            response.reason = ""
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            if not stream:
+                response.content  # noqa: B018 - read now, like HTTPAdapter does for stream=False
+            return response
+
+        request.headers["Accept-Encoding"] = "identity"
+        sent_at = time.perf_counter()
+        # Always stream from the network so chunks can be recorded as they arrive
+        response = self.adapter.send(request, stream=True, **kwargs)
+        recorder = self.cassette.start_recording(
+            key, request.method, request.url, response.status_code, response.headers, sent_at
+        )
+        response.raw = _RecordingRaw(response.raw, recorder)
+        if not stream:
+            response.content  # noqa: B018
+        return response
+
+    def close(self) -> None:
+        self.adapter.close()
+        self.cassette.save()
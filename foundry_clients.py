@@ -0,0 +1,342 @@
+"""
+Process-wide client factory for the workshop scripts and notebooks.
+
+Every entry point used to build its own DefaultAzureCredential plus AIProjectClient /
+AgentsClient / AzureOpenAI, each with a default transport, so long-running services and
+batch jobs redid credential-chain walks and TLS handshakes. This module hands out one
+client per (kind, endpoint), all sharing:
+
+- one credential (sync and async) and one per-scope token cache
+- one tuned HTTP transport per stack: requests (sync Azure SDK), aiohttp (async Azure
+  SDK, per event loop) and httpx (OpenAI, HTTP/2 when `h2` is installed)
+
+Scripts live in numbered subfolders, so they add the repo root to sys.path first:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from foundry_clients import get_project_client
+
+Clients handed out here are shared: do not use them as context managers (`with client:`
+closes the singleton for every other caller). close_all() / aclose_all() close them once.
+
+Not converted: 01-walkthrough.ipynb keeps self-contained copies of the original scripts
+for teaching, and code written into container images (hosted agent main.py) cannot
+import this module.
+
+Tuning (env): HTTP_POOL_SIZE (default 20), HTTP_KEEPALIVE_EXPIRY_S (default 120).
+
+Offline runs: with CASSETTE=<file> the shared requests session and httpx client go
+through cassettes.py (record/replay; see CASSETTE_MODE and CASSETTE_TIMING there), and
+CASSETTE_MODE=replay swaps the credential for a static one. Not covered: the async
+clients (aiohttp transport), and the Agent Framework clients in
+01-agent-framework-foundry-hosted-agents, which build their own HTTP clients.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from typing import Any
+
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+KEEPALIVE_EXPIRY_S = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "120"))
+COGNITIVE_SCOPE = "https://cognitiveservices.azure.com/.default"
+# Refresh cached tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN_S = 300
+
+_lock = threading.RLock()
+_clients: dict[tuple, Any] = {}
+_shared: dict[str, Any] = {}
+_tokens: dict[str, Any] = {}
+_request_counts: dict[str, int] = {"requests": 0, "httpx": 0, "aiohttp": 0}
+
+
+def _env_endpoint(endpoint: str | None) -> str:
+    endpoint = endpoint or os.getenv("PROJECT_ENDPOINT") or os.getenv("AZURE_AI_PROJECT_ENDPOINT")
+    if not endpoint:
+        raise ValueError("Missing PROJECT_ENDPOINT (or AZURE_AI_PROJECT_ENDPOINT).")
+    return endpoint
+
+
+# ----- credentials and tokens -------------------------------------------------
+
+
+def get_credential():
+    """The process-wide sync DefaultAzureCredential (a static one when replaying a cassette)."""
+    with _lock:
+        if "credential" not in _shared:
+            from cassettes import ReplayCredential, replaying
+
+            if replaying():
+                _shared["credential"] = ReplayCredential()
+            else:
+                from azure.identity import DefaultAzureCredential
+
+                _shared["credential"] = DefaultAzureCredential()
+        return _shared["credential"]
+
+
+def get_async_credential():
+    """The process-wide async DefaultAzureCredential (azure.identity.aio; static when replaying)."""
+    with _lock:
+        if "async_credential" not in _shared:
+            from cassettes import AsyncReplayCredential, replaying
+
+            if replaying():
+                _shared["async_credential"] = AsyncReplayCredential()
+            else:
+                from azure.identity.aio import DefaultAzureCredential
+
+                _shared["async_credential"] = DefaultAzureCredential()
+        return _shared["async_credential"]
+
+
+def get_token(scope: str = COGNITIVE_SCOPE) -> str:
+    """Bearer token for `scope`, cached until shortly before it expires."""
+    token = _tokens.get(scope)
+    if token is not None and token.expires_on - time.time() > TOKEN_REFRESH_MARGIN_S:
+        return token.token
+    with _lock:
+        token = _tokens.get(scope)
+        if token is None or token.expires_on - time.time() <= TOKEN_REFRESH_MARGIN_S:
+            token = get_credential().get_token(scope)
+            _tokens[scope] = token
+        return token.token
+
+
+def token_provider(scope: str = COGNITIVE_SCOPE):
+    """Callable for AzureOpenAI(azure_ad_token_provider=...) backed by the shared cache."""
+    return lambda: get_token(scope)
+
+
+# ----- transports -------------------------------------------------------------
+
+
+def get_requests_session():
+    """The shared, pooled requests.Session (cassette-aware) behind every sync Azure SDK client."""
+    with _lock:
+        if "requests_session" not in _shared:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            def count(response, *args, **kwargs):
+                _request_counts["requests"] += 1
+
+            session.hooks["response"].append(count)
+
+            from cassettes import CassetteAdapter, from_env
+
+            cassette = from_env()
+            if cassette is not None:
+                session.mount("https://", CassetteAdapter(cassette, adapter))
+                session.mount("http://", CassetteAdapter(cassette, adapter))
+            _shared["requests_session"] = session
+            _shared["requests_adapter"] = adapter
+        return _shared["requests_session"]
+
+
+def get_transport():
+    """Shared azure-core sync transport (pooled requests.Session, kept open across clients)."""
+    from azure.core.pipeline.transport import RequestsTransport
+
+    return RequestsTransport(session=get_requests_session(), session_owner=False)
+
+
+def _aiohttp_session():
+    # aiohttp sessions are bound to the loop that created them: one per running loop
+    loop = asyncio.get_running_loop()
+    key = ("aiohttp_session", id(loop))
+    with _lock:
+        session = _shared.get(key)
+        if session is None or session.closed:
+            import aiohttp
+
+            async def count(session, ctx, params):
+                _request_counts["aiohttp"] += 1
+
+            trace = aiohttp.TraceConfig()
+            trace.on_request_start.append(count)
+            connector = aiohttp.TCPConnector(limit=POOL_SIZE, keepalive_timeout=KEEPALIVE_EXPIRY_S)
+            session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+            _shared[key] = session
+        return session
+
+
+def get_async_transport():
+    """Shared azure-core async transport for the running event loop."""
+    from azure.core.pipeline.transport import AioHttpTransport
+
+    return AioHttpTransport(session=_aiohttp_session(), session_owner=False)
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_httpx_client():
+    """Shared httpx.Client for OpenAI SDK clients (HTTP/2 when `h2` is installed)."""
+    with _lock:
+        if "httpx" not in _shared:
+            import httpx
+
+            def count(request):
+                _request_counts["httpx"] += 1
+
+            from cassettes import CassetteTransport, from_env
+
+            limits = httpx.Limits(
+                max_connections=POOL_SIZE,
+                max_keepalive_connections=POOL_SIZE,
+                keepalive_expiry=KEEPALIVE_EXPIRY_S,
+            )
+            cassette = from_env()
+            transport = None
+            if cassette is not None:
+                # httpx ignores `limits` once a transport is given, so the pool goes on the inner one.
+                transport = CassetteTransport(cassette, httpx.HTTPTransport(http2=_h2_available(), limits=limits))
+            _shared["httpx"] = httpx.Client(
+                transport=transport,
+                http2=_h2_available(),
+                limits=limits,
+                event_hooks={"request": [count]},
+            )
+        return _shared["httpx"]
+
+
+# ----- clients ----------------------------------------------------------------
+
+
+def _singleton(key: tuple, build):
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = build()
+            _clients[key] = client
+        return client
+
+
+def get_project_client(endpoint: str | None = None):
+    """Shared sync AIProjectClient for the Foundry project endpoint."""
+    from azure.ai.projects import AIProjectClient
+
+    endpoint = _env_endpoint(endpoint)
+    return _singleton(
+        ("project", endpoint),
+        lambda: AIProjectClient(endpoint=endpoint, credential=get_credential(), transport=get_transport()),
+    )
+
+
+def get_agents_client(endpoint: str | None = None):
+    """Shared sync AgentsClient (Foundry Agent Service classic)."""
+    from azure.ai.agents import AgentsClient
+
+    endpoint = _env_endpoint(endpoint)
+    return _singleton(
+        ("agents", endpoint),
+        lambda: AgentsClient(endpoint=endpoint, credential=get_credential(), transport=get_transport()),
+    )
+
+
+def get_async_agents_client(endpoint: str | None = None):
+    """Shared async AgentsClient for the running event loop."""
+    from azure.ai.agents.aio import AgentsClient
+
+    endpoint = _env_endpoint(endpoint)
+    loop_id = id(asyncio.get_running_loop())
+    return _singleton(
+        ("agents-aio", endpoint, loop_id),
+        lambda: AgentsClient(endpoint=endpoint, credential=get_async_credential(), transport=get_async_transport()),
+    )
+
+
+def get_azure_openai(endpoint: str | None = None, api_version: str | None = None, api_key: str | None = None):
+    """Shared AzureOpenAI client on the pooled httpx transport (Entra ID unless api_key is given)."""
+    from openai import AzureOpenAI
+
+    endpoint = endpoint or os.environ["AZURE_OPENAI_ENDPOINT"]
+    api_version = api_version or os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
+    auth = {"api_key": api_key} if api_key else {"azure_ad_token_provider": token_provider()}
+    # One client per key (a rotated or second key must not reuse the first one's client);
+    # the cache key holds a digest, not the secret
+    key_id = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+    return _singleton(
+        ("openai", endpoint, api_version, key_id),
+        lambda: AzureOpenAI(azure_endpoint=endpoint, api_version=api_version, http_client=get_httpx_client(), **auth),
+    )
+
+
+# ----- stats and shutdown -----------------------------------------------------
+
+
+def pool_stats() -> dict[str, Any]:
+    """Best-effort connection-pool utilization for each shared transport."""
+    stats: dict[str, Any] = {"pool_size": POOL_SIZE, "clients": len(_clients), "cached_tokens": len(_tokens)}
+
+    adapter = _shared.get("requests_adapter")
+    if adapter is not None:
+        pools = list(adapter.poolmanager.pools._container.values())
+        stats["requests"] = {
+            "requests": _request_counts["requests"],
+            "hosts": len(pools),
+            "connections_opened": sum(p.num_connections for p in pools),
+            "idle": sum(p.pool.qsize() for p in pools if p.pool is not None),
+        }
+
+    client = _shared.get("httpx")
+    if client is not None:
+        connections = getattr(getattr(client._transport, "_pool", None), "connections", [])
+        stats["httpx"] = {
+            "requests": _request_counts["httpx"],
+            "http2": _h2_available(),
+            "open": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+        }
+
+    sessions = [v for k, v in _shared.items() if isinstance(k, tuple) and k[0] == "aiohttp_session"]
+    if sessions:
+        stats["aiohttp"] = {
+            "requests": _request_counts["aiohttp"],
+            "loops": len(sessions),
+            "idle": sum(sum(len(v) for v in getattr(s.connector, "_conns", {}).values()) for s in sessions if s.connector),
+            "in_use": sum(len(getattr(s.connector, "_acquired", ())) for s in sessions if s.connector),
+        }
+    return stats
+
+
+def close_all() -> None:
+    """Close every shared sync client and transport (async ones: see aclose_all)."""
+    with _lock:
+        for key, client in list(_clients.items()):
+            if not key[0].endswith("-aio"):
+                client.close()
+                del _clients[key]
+        for name in ("httpx", "requests_session", "credential"):
+            resource = _shared.pop(name, None)
+            if resource is not None:
+                resource.close()
+        _shared.pop("requests_adapter", None)  # closed with its session; pool_stats() must not report it
+        _tokens.clear()
+
+
+async def aclose_all() -> None:
+    """Close the async clients, aiohttp session and credential for the running loop."""
+    loop_id = id(asyncio.get_running_loop())
+    for key, client in list(_clients.items()):
+        if key[0].endswith("-aio") and key[-1] == loop_id:
+            await client.close()
+            del _clients[key]
+    session = _shared.pop(("aiohttp_session", loop_id), None)
+    if session is not None:
+        await session.close()
+    credential = _shared.pop("async_credential", None)
+    if credential is not None:
+        await credential.close()
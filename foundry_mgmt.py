@@ -0,0 +1,240 @@
+"""
+In-process management-plane lookups (ARM + Microsoft Graph) for the notebooks.
+
+The 03/04 notebooks used `az rest`, `az ad sp show`, `az account get-access-token`,
+`az role assignment list` and `az cognitiveservices account deployment list` through
+subprocess.run: about a second of CLI startup per call, one call after another. Here:
+
+- tokens come from the shared credential/token cache in foundry_clients.py
+- HTTP goes over its pooled keep-alive requests.Session
+- independent ARM lookups run concurrently (arm_get_many)
+- Graph reads are combined into $batch requests (graph_batch, up to 20 per request)
+
+Notebooks add the repo root to sys.path first:
+
+    import sys; sys.path.insert(0, "..")
+    from foundry_mgmt import FoundryProject, arm_get_many, graph_batch
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from foundry_clients import get_requests_session, get_token
+
+ARM = "https://management.azure.com"
+ARM_SCOPE = "https://management.azure.com/.default"
+GRAPH = "https://graph.microsoft.com/v1.0"
+GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+GRAPH_BATCH_LIMIT = 20
+MAX_CONCURRENCY = 8
+
+
+class ManagementError(RuntimeError):
+    """A management-plane call returned a non-success status."""
+
+    def __init__(self, status: int, url: str, body: str):
+        super().__init__(f"{status} from {url}: {body[:300]}")
+        self.status = status
+        self.url = url
+        self.body = body
+
+
+def _absolute(url: str, base: str) -> str:
+    return url if url.startswith("https://") else base + url
+
+
+# ----- ARM --------------------------------------------------------------------
+
+
+def arm_get(url: str, api_version: str | None = None, follow_next: bool = True) -> dict[str, Any]:
+    """GET an ARM resource or collection; collections follow nextLink into one "value" list."""
+    session = get_requests_session()
+    url = _absolute(url, ARM)
+    params = {"api-version": api_version} if api_version else None
+    headers = {"Authorization": f"Bearer {get_token(ARM_SCOPE)}"}
+
+    resp = session.get(url, params=params, headers=headers)
+    if resp.status_code >= 400:
+        raise ManagementError(resp.status_code, url, resp.text)
+    body = resp.json()
+    while follow_next and body.get("nextLink"):
+        resp = session.get(body["nextLink"], headers=headers)
+        if resp.status_code >= 400:
+            raise ManagementError(resp.status_code, body["nextLink"], resp.text)
+        page = resp.json()
+        body["value"] = body.get("value", []) + page.get("value", [])
+        body["nextLink"] = page.get("nextLink")
+    return body
+
+
+def arm_get_many(requests: dict[str, str | tuple[str, str]]) -> dict[str, Any]:
+    """Run independent ARM GETs concurrently.
+
+    `requests` maps a name to a URL (api-version already in the query) or a
+    (url, api_version) tuple. Each result is the parsed body, or the exception raised.
+    """
+
+    def run(item):
+        name, spec = item
+        url, api_version = spec if isinstance(spec, tuple) else (spec, None)
+        try:
+            return name, arm_get(url, api_version)
+        except Exception as exc:
+            return name, exc
+
+    if not requests:
+        return {}
+    get_token(ARM_SCOPE)  # fetch once up front, not once per worker
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENCY, len(requests))) as pool:
+        return dict(pool.map(run, requests.items()))
+
+
+def default_subscription_id() -> str:
+    """AZURE_SUBSCRIPTION_ID, else the az CLI default subscription (what `az account show` prints).
+
+    The CLI default is read from its profile file (AZURE_CONFIG_DIR, default ~/.azure)
+    rather than by running `az`.
+    """
+    if os.getenv("AZURE_SUBSCRIPTION_ID"):
+        return os.environ["AZURE_SUBSCRIPTION_ID"]
+    profile_path = Path(os.getenv("AZURE_CONFIG_DIR") or Path.home() / ".azure") / "azureProfile.json"
+    try:
+        profile = json.loads(profile_path.read_text(encoding="utf-8-sig"))  # the CLI writes a BOM
+    except (OSError, ValueError):
+        profile = {}
+    for sub in profile.get("subscriptions", []):
+        if sub.get("isDefault"):
+            return sub["id"]
+    raise ValueError("Missing AZURE_SUBSCRIPTION_ID and no az CLI default subscription (run `az account set`).")
+
+
+# ----- Microsoft Graph --------------------------------------------------------
+
+
+def graph_batch(requests: dict[str, str]) -> dict[str, tuple[int, Any]]:
+    """Combine Graph GETs into $batch calls.
+
+    `requests` maps an id to a path relative to /v1.0 (e.g. "/servicePrincipals/{id}").
+    Returns {id: (status, body)} for every request, in as few round trips as possible.
+    """
+    session = get_requests_session()
+    headers = {"Authorization": f"Bearer {get_token(GRAPH_SCOPE)}", "Content-Type": "application/json"}
+    items = list(requests.items())
+    results: dict[str, tuple[int, Any]] = {}
+
+    for start in range(0, len(items), GRAPH_BATCH_LIMIT):
+        chunk = items[start:start + GRAPH_BATCH_LIMIT]
+        payload = {"requests": [{"id": rid, "method": "GET", "url": path} for rid, path in chunk]}
+        resp = session.post(f"{GRAPH}/$batch", json=payload, headers=headers)
+        if resp.status_code >= 400:
+            raise ManagementError(resp.status_code, f"{GRAPH}/$batch", resp.text)
+        for item in resp.json().get("responses", []):
+            results[item["id"]] = (item.get("status", 0), item.get("body"))
+    return results
+
+
+def graph_request(method: str, path: str, json: Any = None, params: dict | None = None):
+    """Single Graph call (writes, or reads with query options) on the shared session. Returns the Response."""
+    headers = {"Authorization": f"Bearer {get_token(GRAPH_SCOPE)}"}
+    return get_requests_session().request(method, _absolute(path, GRAPH), json=json, params=params, headers=headers)
+
+
+def service_principal_reads(ids: list[str]) -> dict[str, str]:
+    """graph_batch requests that find the service principal for each id.
+
+    Foundry reports agent identities by client (app) id, while ARM role assignments and
+    sign-in logs want the service principal's object id. Each id is looked up both ways;
+    merge these into a larger batch and pass the results to service_principals_from().
+    """
+    reads = {}
+    for pid in ids:
+        reads[f"app:{pid}"] = f"/servicePrincipals(appId='{pid}')"
+        reads[f"obj:{pid}"] = f"/servicePrincipals/{pid}"
+    return reads
+
+
+def service_principals_from(results: dict[str, tuple[int, Any]], ids: list[str]) -> dict[str, dict | None]:
+    """{id: service principal body (its "id" is the object id), or None if neither lookup found it}."""
+    found: dict[str, dict | None] = {}
+    for pid in ids:
+        found[pid] = None
+        for kind in ("app", "obj"):
+            status, body = results.get(f"{kind}:{pid}", (0, None))
+            if status == 200:
+                found[pid] = body
+                break
+    return found
+
+
+def service_principals(ids: list[str]) -> dict[str, dict | None]:
+    """Resolve app or object ids to service principals in one Graph $batch round."""
+    return service_principals_from(graph_batch(service_principal_reads(ids)), ids)
+
+
+# ----- Foundry resources ------------------------------------------------------
+
+
+@dataclass
+class FoundryAccount:
+    """ARM coordinates of a Foundry (AI Services) account, with the account-level URLs."""
+
+    subscription_id: str
+    resource_group: str
+    account: str
+
+    @property
+    def account_url(self) -> str:
+        return (
+            f"{ARM}/subscriptions/{self.subscription_id}/resourceGroups/{self.resource_group}"
+            f"/providers/Microsoft.CognitiveServices/accounts/{self.account}"
+        )
+
+    def deployments(self):
+        return f"{self.account_url}/deployments", "2024-10-01"
+
+    def role_assignments(self, principal_object_id: str):
+        """All role assignments for a principal in the subscription (like `az role assignment list --all`).
+
+        ARM filters on the service principal's object id, not its client (app) id:
+        resolve app ids with service_principals() first.
+        """
+        return (
+            f"{ARM}/subscriptions/{self.subscription_id}/providers/Microsoft.Authorization/roleAssignments"
+            f"?$filter=assignedTo('{principal_object_id}')",
+            "2022-04-01",
+        )
+
+
+@dataclass
+class FoundryProject(FoundryAccount):
+    """A project under a Foundry account, with the URLs the notebooks query."""
+
+    project: str
+
+    @property
+    def project_url(self) -> str:
+        return f"{self.account_url}/projects/{self.project}"
+
+    def project_info(self):
+        return self.project_url, "2025-04-01-preview"
+
+    def applications(self):
+        return f"{self.project_url}/applications", "2025-10-01-preview"
+
+    def capability_hosts(self):
+        return f"{self.project_url}/capabilityHosts", "2025-04-01-preview"
+
+
+_role_names: dict[str, str] = {}
+
+
+def role_definition_names(role_definition_ids: list[str]) -> dict[str, str]:
+    """Resolve roleDefinitionId → roleName (cached; unknown ids resolved concurrently)."""
+    missing = sorted({rid for rid in role_definition_ids if rid not in _role_names})
+    for rid, body in arm_get_many({rid: (rid, "2022-04-01") for rid in missing}).items():
+        _role_names[rid] = body.get("properties", {}).get("roleName", rid) if isinstance(body, dict) else rid
+    return {rid: _role_names[rid] for rid in role_definition_ids}
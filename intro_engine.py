@@ -0,0 +1,376 @@
+"""
+Timeline render engine for the narrated terminal intros (shadow_agents.py, demo-intro.py).
+
+An intro is a list of Scenes, each a list of Steps:
+
+    show(*lines, hold=0)      print lines (like print()), then hold for `hold` seconds
+    clear()                   clear the screen (ANSI codes, no `clear`/`cls` subprocess)
+    pause(seconds)            hold without output
+    type_fast(text, color)    type text out one character every `char_s` seconds
+
+play(scenes) renders them:
+- Output is buffered until a step holds. Everything shown since the last hold becomes one
+  frame, written to the terminal in one write() call.
+- Holds are scheduled on an absolute timeline from a monotonic clock, so a slow write or an
+  oversleep is taken out of the next hold instead of adding up. When rendering falls behind,
+  holds are shortened until it catches up.
+- type_fast writes at most one batch of characters per FRAME_S (default 1/60 s) instead of one
+  flush per character, with the color codes applied once per batch.
+
+INTRO_SPEED scales every hold and typing delay (2 = twice as fast, handy while editing).
+
+Headless rendering runs the same scenes on a VirtualClock: nothing sleeps, frames are kept with
+their timestamps and saved as an asciicast v2 file (asciinema play, agg for GIF/video), and a
+per-scene report compares each scene's duration with its narration budget (Scene.budget_s).
+
+  python shadow_agents.py                         # play live
+  python shadow_agents.py --report                # timing report only, in milliseconds
+  python shadow_agents.py --cast intro.cast       # asciicast + report
+  python intro_engine.py shadow_agents.py demo-intro.py --speed 0.9 1 1.1 --out casts/   # batch
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# ANSI colors
+RED = "\033[91m"
+YELLOW = "\033[93m"
+GREEN = "\033[92m"
+CYAN = "\033[96m"
+WHITE = "\033[97m"
+DIM = "\033[2m"
+BOLD = "\033[1m"
+RESET = "\033[0m"
+BG_RED = "\033[41m"
+
+CLEAR_SCREEN = "\033[H\033[2J\033[3J"
+HIDE_CURSOR = "\033[?25l"
+SHOW_CURSOR = "\033[?25h"
+
+FRAME_S = float(os.getenv("INTRO_FRAME_S", str(1 / 60)))
+SPEED = float(os.getenv("INTRO_SPEED", "1"))
+BUDGET_TOLERANCE_S = float(os.getenv("INTRO_BUDGET_TOLERANCE_S", "0.1"))
+CAST_COLS = int(os.getenv("INTRO_CAST_COLS", "80"))
+CAST_ROWS = int(os.getenv("INTRO_CAST_ROWS", "32"))
+
+
+# ----- schedule --------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Step:
+    text: str = ""
+    hold: float = 0.0
+    clear: bool = False
+    char_s: float = 0.0  # > 0: type `text` out character by character
+    color: str = ""
+
+
+@dataclass
+class Scene:
+    name: str
+    steps: list[Step] = field(default_factory=list)
+    budget_s: float | None = None  # narration time for the scene, checked by the timing report
+
+
+@dataclass(frozen=True)
+class SceneTiming:
+    name: str
+    start_s: float
+    end_s: float
+    budget_s: float | None
+
+    @property
+    def duration_s(self) -> float:
+        return self.end_s - self.start_s
+
+
+def show(*lines: str, hold: float = 0.0) -> Step:
+    """Print `lines` (one per line, like print(); show() prints an empty line)."""
+    return Step(text="\n".join(lines) + "\n", hold=hold)
+
+
+def clear(hold: float = 0.0) -> Step:
+    return Step(clear=True, hold=hold)
+
+
+def pause(seconds: float) -> Step:
+    return Step(hold=seconds)
+
+
+def type_fast(text: str, color: str = "", hold: float = 0.0, char_s: float = 0.015) -> Step:
+    return Step(text=text, hold=hold, char_s=char_s, color=color)
+
+
+# ----- output and clock ------------------------------------------------------------
+
+
+class Terminal:
+    """Writes each frame with a single write() on the stream's file descriptor."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.stream.flush()
+        self._encoding = getattr(self.stream, "encoding", None) or "utf-8"
+        self._fd = None
+        if os.name == "nt":
+            _enable_vt_mode()  # the console stream handles Unicode itself
+        else:
+            try:
+                self._fd = self.stream.fileno()
+            except (AttributeError, OSError, ValueError):
+                pass  # not a real file (captured output): fall back to stream writes
+
+    def write(self, data: str) -> None:
+        if not data:
+            return
+        if self._fd is None:
+            self.stream.write(data)
+            self.stream.flush()
+            return
+        view = memoryview(data.encode(self._encoding, "replace"))
+        while view:
+            view = view[os.write(self._fd, view):]
+
+
+def _enable_vt_mode() -> None:
+    """Let the Windows console interpret ANSI escapes (what `os.system('cls')` did as a side effect)."""
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (AttributeError, OSError):
+        pass
+
+
+class MonotonicClock:
+    def __init__(self):
+        self._start = time.monotonic()
+
+    def now(self) -> float:
+        return time.monotonic() - self._start
+
+    def sleep_until(self, t: float) -> None:
+        # time.sleep can wake early on some platforms; loop until the deadline has passed
+        while (remaining := t - self.now()) > 0:
+            time.sleep(remaining)
+
+
+class VirtualClock:
+    """Headless clock: sleeping only moves the time forward."""
+
+    def __init__(self):
+        self.t = 0.0
+
+    def now(self) -> float:
+        return self.t
+
+    def sleep_until(self, t: float) -> None:
+        self.t = max(self.t, t)
+
+
+class CastRecorder:
+    """Stands in for the Terminal and keeps every frame with its time on the clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.events: list[tuple[float, str]] = []
+
+    def write(self, data: str) -> None:
+        if data:
+            # A real tty turns "\n" into "\r\n" on output (onlcr); cast players replay the raw bytes
+            self.events.append((self.clock.now(), data.replace("\r\n", "\n").replace("\n", "\r\n")))
+
+    def save(self, path: str | Path, title: str = "", cols: int = CAST_COLS, rows: int = CAST_ROWS) -> Path:
+        """Write an asciicast v2 file: a header line, then one [time, "o", data] line per frame."""
+        header = {"version": 2, "width": cols, "height": rows, "env": {"TERM": "xterm-256color"}}
+        if title:
+            header["title"] = title
+        lines = [json.dumps(header)]
+        lines += [json.dumps([round(t, 6), "o", data], ensure_ascii=False) for t, data in self.events]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+
+# ----- player ----------------------------------------------------------------------
+
+
+class Player:
+    def __init__(self, terminal: Terminal | None = None, clock: MonotonicClock | None = None, speed: float = SPEED):
+        self.terminal = terminal or Terminal()
+        self.clock = clock or MonotonicClock()
+        self.speed = speed
+        self._frame: list[str] = []
+        self._due = 0.0  # scheduled time of the current step, on the clock's timeline
+
+    def play(self, scenes: list[Scene]) -> list[SceneTiming]:
+        timings = []
+        self._due = self.clock.now()
+        self._frame.append(HIDE_CURSOR)
+        try:
+            for scene in scenes:
+                start = self.clock.now()
+                for step in scene.steps:
+                    self._step(step)
+                timings.append(SceneTiming(scene.name, start, self.clock.now(), scene.budget_s))
+        finally:
+            self._frame.append(RESET + SHOW_CURSOR)
+            self._flush()
+        return timings
+
+    def _step(self, step: Step) -> None:
+        if step.clear:
+            self._frame.append(CLEAR_SCREEN)
+        if step.char_s > 0:
+            self._type(step.text, step.color, step.char_s / self.speed)
+        else:
+            self._frame.append(step.text)
+        if step.hold > 0:
+            self._flush()
+            self._due += step.hold / self.speed
+            self.clock.sleep_until(self._due)
+
+    def _type(self, text: str, color: str, char_s: float) -> None:
+        start, i = self._due, 0
+        while i < len(text):
+            now = self.clock.now()
+            # Everything due by now (at least one character), in one write
+            j = min(len(text), max(i + 1, int((now - start) / char_s) + 1))
+            self._frame.append(f"{color}{text[i:j]}{RESET}" if color else text[i:j])
+            self._flush()
+            i = j
+            if i < len(text):
+                self.clock.sleep_until(max(start + i * char_s, now + FRAME_S))
+        self._frame.append("\n")
+        self._due = start + len(text) * char_s
+        self.clock.sleep_until(self._due)
+
+    def _flush(self) -> None:
+        if self._frame:
+            self.terminal.write("".join(self._frame))
+            self._frame.clear()
+
+
+def play(scenes: list[Scene], **kwargs) -> list[SceneTiming]:
+    return Player(**kwargs).play(scenes)
+
+
+def render(scenes: list[Scene], speed: float = SPEED) -> tuple[list[SceneTiming], CastRecorder]:
+    """Play `scenes` headlessly on a VirtualClock; returns the timings and the recorded frames."""
+    clock = VirtualClock()
+    recorder = CastRecorder(clock)
+    timings = Player(terminal=recorder, clock=clock, speed=speed).play(scenes)
+    return timings, recorder
+
+
+# ----- timing report ---------------------------------------------------------------
+
+
+def format_report(timings: list[SceneTiming], title: str = "", tolerance_s: float = BUDGET_TOLERANCE_S) -> str:
+    lines = [title] if title else []
+    lines.append(f"  {'scene':<20} {'start':>6} {'actual':>7} {'budget':>7} {'delta':>7}")
+    for t in timings:
+        if t.budget_s is None:
+            lines.append(f"  {t.name:<20} {t.start_s:6.2f} {t.duration_s:6.2f}s {'-':>7} {'':>7}")
+            continue
+        delta = round(t.duration_s - t.budget_s, 6) + 0.0  # no -0.00 from float sums of holds
+        flag = "  OVER" if delta > tolerance_s else "  UNDER" if delta < -tolerance_s else ""
+        lines.append(
+            f"  {t.name:<20} {t.start_s:6.2f} {t.duration_s:6.2f}s {t.budget_s:6.2f}s {delta:+6.2f}s{flag}"
+        )
+    budgeted = [t for t in timings if t.budget_s is not None]
+    total = timings[-1].end_s - timings[0].start_s if timings else 0.0
+    budget = sum(t.budget_s for t in budgeted)
+    lines.append(
+        f"  {'total':<20} {'':>6} {total:6.2f}s {budget:6.2f}s "
+        f"(budgeted scenes {sum(t.duration_s for t in budgeted):.2f}s)"
+    )
+    return "\n".join(lines)
+
+
+def over_budget(timings: list[SceneTiming], tolerance_s: float = BUDGET_TOLERANCE_S) -> list[SceneTiming]:
+    return [t for t in timings if t.budget_s is not None and abs(t.duration_s - t.budget_s) > tolerance_s]
+
+
+# ----- command line ----------------------------------------------------------------
+
+
+def run(scenes: list[Scene], title: str = "", argv: list[str] | None = None) -> None:
+    """Command line for an intro script: play live, or render headlessly with --cast/--report."""
+    parser = argparse.ArgumentParser(description=title)
+    parser.add_argument("--cast", help="render headlessly to this asciicast v2 file instead of playing")
+    parser.add_argument("--report", action="store_true", help="render headlessly and print the timing report")
+    parser.add_argument("--speed", type=float, default=SPEED)
+    args = parser.parse_args(argv)
+
+    if not (args.cast or args.report):
+        play(scenes, speed=args.speed)
+        return
+
+    started = time.perf_counter()
+    timings, recorder = render(scenes, speed=args.speed)
+    if args.cast:
+        recorder.save(args.cast, title=title)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(format_report(timings, f"{title} (speed {args.speed:g}, rendered in {elapsed_ms:.1f} ms)"))
+    if args.cast:
+        print(f"  wrote {args.cast} ({len(recorder.events)} frames)")
+
+
+def load_scenes(path: str | Path) -> list[Scene]:
+    """Import an intro script by path (demo-intro.py is not a valid module name) and return its SCENES."""
+    path = Path(path).resolve()
+    sys.path.insert(0, str(path.parent))
+    try:
+        spec = importlib.util.spec_from_file_location(f"intro_{path.stem.replace('-', '_')}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(str(path.parent))
+    return module.SCENES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Render intro scripts headlessly in a batch: one asciicast and timing report per script and speed.",
+    )
+    parser.add_argument("scripts", nargs="+", help="intro scripts that define SCENES")
+    parser.add_argument("--speed", type=float, nargs="+", default=[SPEED], help="one variant per speed factor")
+    parser.add_argument("--out", help="directory for <script>-x<speed>.cast files (default: report only)")
+    parser.add_argument("--cols", type=int, default=CAST_COLS)
+    parser.add_argument("--rows", type=int, default=CAST_ROWS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    variants = off_budget = 0
+    for script in args.scripts:
+        scenes = load_scenes(script)
+        for speed in args.speed:
+            timings, recorder = render(scenes, speed=speed)
+            name = f"{Path(script).stem}-x{speed:g}"
+            print(format_report(timings, f"{name}:"))
+            if args.out:
+                path = recorder.save(Path(args.out) / f"{name}.cast", title=name, cols=args.cols, rows=args.rows)
+                print(f"  wrote {path}")
+            print()
+            variants += 1
+            off_budget += bool(over_budget(timings))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{variants} variants rendered in {elapsed_ms:.1f} ms; {off_budget} with scenes off budget "
+          f"by more than {BUDGET_TOLERANCE_S:g}s")
+
+
+if __name__ == "__main__":
+    main()
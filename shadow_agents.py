@@ -10,32 +10,34 @@ SCRIPT:
   3s - helpful output (works/useful)
   2s - "touching systems"
   2s - risk stamps → INCIDENT PRONE
-"""
-
-import time
-import sys
-import os
 
-# Colors
-RED = "\033[91m"
-YELLOW = "\033[93m"
-GREEN = "\033[92m"
-CYAN = "\033[96m"
-WHITE = "\033[97m"
-DIM = "\033[2m"
-BOLD = "\033[1m"
-RESET = "\033[0m"
-BG_RED = "\033[41m"
+Rendered by intro_engine.py (one write per frame, drift-corrected holds).
+"""
 
-def clear():
-    os.system('cls' if os.name == 'nt' else 'clear')
+from intro_engine import (
+    BG_RED,
+    BOLD,
+    CYAN,
+    DIM,
+    GREEN,
+    RED,
+    RESET,
+    WHITE,
+    YELLOW,
+    Scene,
+    clear,
+    pause,
+    run,
+    show,
+)
 
 # ═══════════════════════════════════════════════════════════════════
 # 2s - ORG CONTEXT (blurred portal/Teams vibe)
 # Narration: "Shadow agents are already live..."
 # ═══════════════════════════════════════════════════════════════════
-def org_context():
-    print(f"""
+ORG_CONTEXT = Scene("org context", [
+    clear(),
+    show(f"""
 {DIM}
     ┌────────────────────────────────────────────────────────────┐
     │  ▓▓▓▓▓▓▓▓▓▓  │  ████████  │  ▒▒▒▒▒▒▒▒  │  ░░░░░░░░░░░░░  │
@@ -48,129 +50,129 @@ def org_context():
     │    ▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒     ▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓     ████████████ │
     │                                                            │
     └────────────────────────────────────────────────────────────┘
-{RESET}""")
-    print(f"  {DIM}Somewhere in your organization...{RESET}")
-    time.sleep(2)
+{RESET}"""),
+    show(f"  {DIM}Somewhere in your organization...{RESET}", hold=2),
+], budget_s=2)
 
 # ═══════════════════════════════════════════════════════════════════
 # 3s - TERMINAL RUN (shadow agent starting)
 # Narration: "...an agent is already running outside governance."
 # ═══════════════════════════════════════════════════════════════════
-def terminal_run():
-    clear()
-    print(f"\n{DIM}  $ python agent.py{RESET}\n")
-    time.sleep(0.4)
-
-    steps = [
-        "Initializing agent...",
-        "Connected to gpt-4o",
-        "Tools loaded: [email, calendar, database]",
-        "Agent ready.",
-    ]
-
-    for step in steps:
-        print(f"  {GREEN}✓{RESET} {step}")
-        time.sleep(0.5)
-
-    time.sleep(0.4)
+TERMINAL_RUN = Scene("terminal run", [
+    clear(),
+    show(f"\n{DIM}  $ python agent.py{RESET}\n", hold=0.4),
+    *(
+        show(f"  {GREEN}✓{RESET} {step}", hold=0.5)
+        for step in [
+            "Initializing agent...",
+            "Connected to gpt-4o",
+            "Tools loaded: [email, calendar, database]",
+            "Agent ready.",
+        ]
+    ),
+    pause(0.4),
+], budget_s=3)
 
 # ═══════════════════════════════════════════════════════════════════
 # 3s - HELPFUL OUTPUT (it works, it's useful)
 # Narration: "It works. It's useful."
 # ═══════════════════════════════════════════════════════════════════
-def helpful_output():
-    print(f"\n{DIM}  ─────────────────────────────────────────────────────{RESET}")
-    print(f"  {CYAN}USER:{RESET} Summarize my emails and schedule follow-ups")
-    print(f"{DIM}  ─────────────────────────────────────────────────────{RESET}\n")
-    time.sleep(0.5)
-
-    print(f"  {DIM}Reading inbox...{RESET}")
-    time.sleep(0.5)
-    print(f"  {DIM}Processing 14 messages...{RESET}")
-    time.sleep(0.5)
-
-    print(f"\n  {GREEN}AGENT:{RESET} Done. 3 follow-ups scheduled:")
-    print(f"  {WHITE}  • Q3 review → tomorrow 2pm{RESET}")
-    print(f"  {WHITE}  • Client call → Thursday{RESET}")
-    print(f"  {WHITE}  • Team sync → Friday{RESET}")
-    time.sleep(0.8)
-
-    print(f"\n  {GREEN}{BOLD}It works. It's useful.{RESET}")
-    time.sleep(0.5)
+HELPFUL_OUTPUT = Scene("helpful output", [
+    show(
+        f"\n{DIM}  ─────────────────────────────────────────────────────{RESET}",
+        f"  {CYAN}USER:{RESET} Summarize my emails and schedule follow-ups",
+        f"{DIM}  ─────────────────────────────────────────────────────{RESET}\n",
+        hold=0.5,
+    ),
+    show(f"  {DIM}Reading inbox...{RESET}", hold=0.5),
+    show(f"  {DIM}Processing 14 messages...{RESET}", hold=0.5),
+    show(
+        f"\n  {GREEN}AGENT:{RESET} Done. 3 follow-ups scheduled:",
+        f"  {WHITE}  • Q3 review → tomorrow 2pm{RESET}",
+        f"  {WHITE}  • Client call → Thursday{RESET}",
+        f"  {WHITE}  • Team sync → Friday{RESET}",
+        hold=0.8,
+    ),
+    show(f"\n  {GREEN}{BOLD}It works. It's useful.{RESET}", hold=0.5),
+], budget_s=3)
 
 # ═══════════════════════════════════════════════════════════════════
 # 2s - TOUCHING SYSTEMS (the turn)
 # Narration: "And the moment it touches real systems..."
 # ═══════════════════════════════════════════════════════════════════
-def touching_systems():
-    print(f"\n{DIM}  ─────────────────────────────────────────────────────{RESET}")
-    print(f"  {YELLOW}And the moment it touches real systems...{RESET}\n")
-    time.sleep(0.4)
-
+TOUCHING_SYSTEMS = Scene("touching systems", [
+    show(
+        f"\n{DIM}  ─────────────────────────────────────────────────────{RESET}",
+        f"  {YELLOW}And the moment it touches real systems...{RESET}\n",
+        hold=0.4,
+    ),
     # Split screen effect
-    print(f"  ┌─────────────────────────┬─────────────────────────┐")
-    print(f"  │ {GREEN}AGENT OUTPUT{RESET}            │ {RED}OBSERVABILITY{RESET}           │")
-    print(f"  ├─────────────────────────┼─────────────────────────┤")
-    print(f"  │ {GREEN}✓{RESET} Task completed        │ {RED}No trace ID{RESET}             │")
-    print(f"  │ {GREEN}✓{RESET} Emails accessed       │ {RED}No agent identity{RESET}       │")
-    print(f"  │ {GREEN}✓{RESET} Calendar modified     │ {RED}No audit log{RESET}            │")
-    print(f"  │ {GREEN}✓{RESET} External email sent   │ {RED}No policy check{RESET}         │")
-    print(f"  └─────────────────────────┴─────────────────────────┘")
-    time.sleep(1.2)
-
-    print(f"\n  {RED}{BOLD}...it becomes a risk.{RESET}")
-    time.sleep(0.4)
+    show(
+        f"  ┌─────────────────────────┬─────────────────────────┐",
+        f"  │ {GREEN}AGENT OUTPUT{RESET}            │ {RED}OBSERVABILITY{RESET}           │",
+        f"  ├─────────────────────────┼─────────────────────────┤",
+        f"  │ {GREEN}✓{RESET} Task completed        │ {RED}No trace ID{RESET}             │",
+        f"  │ {GREEN}✓{RESET} Emails accessed       │ {RED}No agent identity{RESET}       │",
+        f"  │ {GREEN}✓{RESET} Calendar modified     │ {RED}No audit log{RESET}            │",
+        f"  │ {GREEN}✓{RESET} External email sent   │ {RED}No policy check{RESET}         │",
+        f"  └─────────────────────────┴─────────────────────────┘",
+        hold=1.2,
+    ),
+    show(f"\n  {RED}{BOLD}...it becomes a risk.{RESET}", hold=0.4),
+], budget_s=2)
 
 # ═══════════════════════════════════════════════════════════════════
 # 2s - RISK STAMPS (rapid fire → final stamp)
 # Goal: dread + inevitability
 # ═══════════════════════════════════════════════════════════════════
-def risk_stamps():
-    print()
-
-    stamps = [
-        " ██ NO IDENTITY ██ ",
-        " ██ NO POLICY GATE ██ ",
-        " ██ NO AUDIT TRAIL ██ ",
-    ]
-
-    for stamp in stamps:
-        print(f"  {BG_RED}{WHITE}{BOLD}{stamp}{RESET}")
-        time.sleep(0.3)
-
-    time.sleep(0.2)
-
+RISK_STAMPS = Scene("risk stamps", [
+    show(),
+    *(
+        show(f"  {BG_RED}{WHITE}{BOLD}{stamp}{RESET}", hold=0.3)
+        for stamp in [
+            " ██ NO IDENTITY ██ ",
+            " ██ NO POLICY GATE ██ ",
+            " ██ NO AUDIT TRAIL ██ ",
+        ]
+    ),
+    pause(0.2),
     # Final stamp
-    print(f"""
+    show(f"""
   {BG_RED}{WHITE}{BOLD}
   ╔═══════════════════════════════════════╗
   ║                                       ║
   ║       ⚠️  INCIDENT PRONE  ⚠️           ║
   ║                                       ║
   ╚═══════════════════════════════════════╝
-  {RESET}""")
-    time.sleep(0.8)
+  {RESET}""", hold=0.8),
+], budget_s=2)
 
 # ═══════════════════════════════════════════════════════════════════
 # TRANSITION
 # ═══════════════════════════════════════════════════════════════════
-def transition():
-    print(f"\n{CYAN}{BOLD}  ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{RESET}")
-    print(f"\n  {GREEN}{BOLD}Let's fix that.{RESET}")
-    print(f"  {GREEN}Azure AI Foundry — Enterprise Agent Governance{RESET}\n")
+TRANSITION = Scene("transition", [
+    show(
+        f"\n{CYAN}{BOLD}  ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{RESET}",
+        f"\n  {GREEN}{BOLD}Let's fix that.{RESET}",
+        f"  {GREEN}Azure AI Foundry — Enterprise Agent Governance{RESET}\n",
+    ),
+])
 
 # ═══════════════════════════════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════════════════════════════
-def main():
-    clear()
+SCENES = [
+    ORG_CONTEXT,        # 2s - blurred org context
+    TERMINAL_RUN,       # 3s - shadow agent starts
+    HELPFUL_OUTPUT,     # 3s - works/useful
+    TOUCHING_SYSTEMS,   # 2s - split screen + "becomes a risk"
+    RISK_STAMPS,        # 2s - stamps → INCIDENT PRONE
+    TRANSITION,         # transition out
+]
 
-    org_context()        # 2s - blurred org context
-    terminal_run()       # 3s - shadow agent starts
-    helpful_output()     # 3s - works/useful
-    touching_systems()   # 2s - split screen + "becomes a risk"
-    risk_stamps()        # 2s - stamps → INCIDENT PRONE
-    transition()         # transition out
+
+def main():
+    run(SCENES, title="Shadow Agents - Intro Sequence")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,163 @@
+import asyncio
+import itertools
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "01-agent-framework-foundry-hosted-agents"))
+import pytest  # noqa: E402
+from agent_registry import AgentRegistry, definition_hash  # noqa: E402
+
+
+class _AgentsClient:
+    def __init__(self):
+        self.agents = []
+        self.created = 0
+        thread_ids = itertools.count(1)
+        self.threads = SimpleNamespace(create=lambda: SimpleNamespace(id=f"thread_{next(thread_ids)}"))
+
+    def list_agents(self):
+        return list(self.agents)
+
+    def create_agent(self, **kwargs):
+        self.created += 1
+        agent = SimpleNamespace(id=f"asst_{self.created}", **kwargs)
+        self.agents.append(agent)
+        return agent
+
+
+def _define(registry, **overrides):
+    definition = {
+        "model": "gpt-4o",
+        "name": "helper",
+        "instructions": "be brief",
+        "tools": [{"type": "file_search"}],
+        "tool_resources": {"file_search": {"vector_store_ids": ["vs_1"]}},
+    }
+    definition.update(overrides)
+    return registry.get_or_create_agent(**definition)
+
+
+def test_hash_covers_every_definition_field():
+    base = definition_hash("gpt-4o", "helper", "be brief", [{"type": "file_search"}], {"file_search": {"vector_store_ids": ["vs_1"]}})
+    assert base != definition_hash("gpt-4o", "other", "be brief", [{"type": "file_search"}], {"file_search": {"vector_store_ids": ["vs_1"]}})
+    assert base != definition_hash("gpt-4o", "helper", "be brief", [{"type": "file_search"}], {"file_search": {"vector_store_ids": ["vs_2"]}})
+    assert base == definition_hash("gpt-4o", "helper", "be brief", [{"type": "file_search"}], {"file_search": {"vector_store_ids": ["vs_1"]}})
+
+
+def test_agent_reused_until_its_tool_resources_change(tmp_path):
+    client = _AgentsClient()
+    registry = AgentRegistry(client, endpoint="https://example", path=tmp_path / "registry.json")
+
+    first = _define(registry)
+    assert _define(registry) == first
+    assert client.created == 1
+
+    # New vector store: a new agent, not the one still pointing at vs_1
+    assert _define(registry, tool_resources={"file_search": {"vector_store_ids": ["vs_2"]}}) != first
+    assert client.created == 2
+
+    # A fresh machine finds both through the service-side metadata
+    fresh = AgentRegistry(client, endpoint="https://example", path=tmp_path / "other.json")
+    assert _define(fresh) == first
+    assert client.created == 2
+
+
+def test_thread_pool(tmp_path):
+    client = _AgentsClient()
+    registry = AgentRegistry(client, endpoint="https://example", path=tmp_path / "registry.json")
+    assert len(registry.prefetch_threads(3)) == 3
+    registry.acquire_thread()
+    assert registry.spare_threads() == 2
+    registry.top_up_threads(4)
+    assert registry.spare_threads() == 4
+
+
+async def _aiter(items):
+    for item in list(items):
+        yield item
+
+
+async def _async(value):
+    return value
+
+
+class _NotFound(Exception):
+    status_code = 404
+
+
+def _run_until_deleted(client, deleted):
+    def run(agent_id):
+        if agent_id in deleted:
+            try:
+                raise _NotFound(f"no assistant {agent_id}")
+            except _NotFound as exc:
+                raise RuntimeError("run failed") from exc  # wrapped, as Agent Framework does
+        return f"ran {agent_id}"
+
+    return run
+
+
+def test_deleted_agent_is_resolved_again(tmp_path):
+    client = _AgentsClient()
+    registry = AgentRegistry(client, endpoint="https://example", path=tmp_path / "registry.json")
+    stale = _define(registry)
+    client.agents.clear()  # deleted in the service; the local registry still has the id
+    definition = {
+        "model": "gpt-4o",
+        "name": "helper",
+        "instructions": "be brief",
+        "tools": [{"type": "file_search"}],
+        "tool_resources": {"file_search": {"vector_store_ids": ["vs_1"]}},
+    }
+
+    assert registry.run_with_agent(_run_until_deleted(client, {stale}), **definition) == "ran asst_2"
+    fresh = AgentRegistry(client, endpoint="https://example", path=tmp_path / "registry.json")
+    assert _define(fresh) == "asst_2"
+
+    async def arun(agent_id):
+        return _run_until_deleted(client, {"asst_2"})(agent_id)
+
+    client.agents.clear()
+    fresh.agents_client = SimpleNamespace(
+        list_agents=lambda: _aiter(client.agents),
+        create_agent=lambda **kwargs: _async(client.create_agent(**kwargs)),
+    )
+    assert asyncio.run(fresh.arun_with_agent(arun, **definition)) == "ran asst_3"
+
+
+def test_other_errors_are_not_retried(tmp_path):
+    client = _AgentsClient()
+    registry = AgentRegistry(client, endpoint="https://example", path=tmp_path / "registry.json")
+
+    def run(agent_id):
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        registry.run_with_agent(run, model="gpt-4o", name="helper", instructions="be brief")
+    assert client.created == 1
+
+
+def test_jobs_sharing_a_registry_never_claim_the_same_thread(tmp_path):
+    client = _AgentsClient()
+    path = tmp_path / "registry.json"
+    AgentRegistry(client, endpoint="https://example", path=path).prefetch_threads(40)
+    # Each "job" opened the registry before the others claimed anything
+    jobs = [AgentRegistry(client, endpoint="https://example", path=path) for _ in range(8)]
+    claimed = []
+
+    def job(registry):
+        for _ in range(5):
+            claimed.append(registry.acquire_thread())
+
+    workers = [threading.Thread(target=job, args=(registry,)) for registry in jobs]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    # Every pre-created thread claimed exactly once, none created inline
+    assert sorted(claimed) == sorted(f"thread_{i}" for i in range(1, 41))
+    assert AgentRegistry(client, endpoint="https://example", path=path).spare_threads() == 0
+    assert not path.with_suffix(".json.lock").exists()
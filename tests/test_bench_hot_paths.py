@@ -0,0 +1,278 @@
+"""
+Micro-benchmarks for the hosted agent's per-request hot paths.
+
+Each case is timed in BENCH_ROUNDS rounds of at least BENCH_MIN_TIME_S, each paired with
+a round of a pure-Python calibration loop; the median case/calibration ratio is what is
+stored, so a baseline recorded on one machine (or on a busy CI runner) still means
+something on another. Peak allocation for one call is measured with tracemalloc.
+
+The test fails when a case is slower than the baseline by more than BENCH_MAX_SLOWDOWN
+(default 0.35) or allocates more than BENCH_MAX_ALLOC_GROWTH (default 0.25) plus
+BENCH_ALLOC_SLACK_BYTES (default 1024, so near-zero peaks are not flaky) above it.
+
+  python -m pytest -q tests/test_bench_hot_paths.py            # check against the baseline
+  BENCH_UPDATE=1 python -m pytest -q tests/test_bench_hot_paths.py   # record a new baseline
+
+Baselines are only written with BENCH_UPDATE=1; a case without one fails.
+
+hosted_agent_app/main.py imports agent_framework.models and the hosting adapter, which the
+published agent-framework-core releases do not ship. Where they are missing, the fixture
+loads it against minimal stand-ins for those imports (plain classes with the same
+constructor keywords), so MyHostedAgent.run_stream itself is what gets measured.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+pytest.importorskip("agent_framework")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+AGENT_DIR = REPO_ROOT / "02-azd-deploy-hosted-agent"
+BASELINE_PATH = Path(__file__).with_name("bench_baseline.json")
+
+MIN_TIME_S = float(os.getenv("BENCH_MIN_TIME_S", "0.2"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "5"))
+MAX_SLOWDOWN = float(os.getenv("BENCH_MAX_SLOWDOWN", "0.35"))
+MAX_ALLOC_GROWTH = float(os.getenv("BENCH_MAX_ALLOC_GROWTH", "0.25"))
+ALLOC_SLACK_BYTES = int(os.getenv("BENCH_ALLOC_SLACK_BYTES", "1024"))
+UPDATE = os.getenv("BENCH_UPDATE", "0") == "1"
+
+STREAM_CHUNKS = 500
+
+
+def _load(name: str, path: Path):
+    """Import a main.py under a unique module name (both agents ship a `main.py`).
+
+    Its folder stays on sys.path for the lazy sibling imports (redaction, hedging, ...).
+    """
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _ops_per_s(fn, min_time_s: float) -> float:
+    calls = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time_s:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - started
+    return calls / elapsed
+
+
+def _relative_throughput(fn) -> tuple[float, float]:
+    """(ops/s, median ops/s relative to the calibration loop run just before it)."""
+    fn()  # warm caches and lazy imports
+    ratios, ops = [], []
+    for _ in range(ROUNDS):
+        calibration = _ops_per_s(_calibrate, MIN_TIME_S / 2)
+        ops.append(_ops_per_s(fn, MIN_TIME_S))
+        ratios.append(ops[-1] / calibration)
+    return statistics.median(ops), statistics.median(ratios)
+
+
+def _peak_bytes(fn) -> int:
+    fn()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _calibrate() -> None:
+    total = 0
+    for i in range(2000):
+        total += len(str(i * i))
+
+
+# ----- fixtures ----------------------------------------------------------------
+
+
+@pytest.fixture(scope="session")
+def baseline():
+    data = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    yield data
+    if UPDATE:
+        BASELINE_PATH.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="session")
+def chatbot():
+    for name in ("AZURE_TRACING_GEN_AI_CONTENT_RECORDING_ENABLED", "REDACT_PII", "HEDGE_BACKUP_DEPLOYMENT"):
+        os.environ.pop(name, None)
+    return _load("chatbot_main", AGENT_DIR / "src" / "my-hosted-agent" / "main.py")
+
+
+class _Model:
+    """Stand-in for the agent_framework.models types: keeps its constructor keywords."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def _hosted_app_stubs() -> dict[str, ModuleType]:
+    """Stand-ins for whichever of the hosted app's imports are not installed."""
+    stubs = {}
+    try:
+        import agent_framework.models  # noqa: F401
+    except ImportError:
+        import agent_framework
+
+        models = ModuleType("agent_framework.models")
+        for name in ("AgentRunRequest", "AgentRunResponse", "AgentRunResponseUpdate", "Message", "MessageDelta"):
+            setattr(models, name, type(name, (_Model,), {}))
+        models.Role = agent_framework.Role
+        stubs["agent_framework.models"] = models
+    try:
+        import azure.ai.agentserver.agentframework  # noqa: F401
+    except ImportError:
+        for name in ("azure.ai.agentserver", "azure.ai.agentserver.agentframework"):
+            stubs[name] = ModuleType(name)
+        stubs["azure.ai.agentserver.agentframework"].from_agent_framework = lambda agent: agent
+    return stubs
+
+
+@pytest.fixture(scope="session")
+def hosted_main():
+    stubs = _hosted_app_stubs()
+    saved = {name: sys.modules.get(name) for name in stubs}
+    sys.modules.update(stubs)
+    try:
+        return _load("hosted_agent_main", AGENT_DIR / "hosted_agent_app" / "main.py")
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+@pytest.fixture
+def check(baseline):
+    """Record or compare one benchmark case."""
+
+    def _check(name: str, fn, items: int = 1):
+        ops, relative = _relative_throughput(fn)
+        result = {
+            "relative_throughput": round(relative * items, 4),
+            "peak_bytes": _peak_bytes(fn),
+        }
+        print(f"\n{name}: {ops * items:,.0f} items/s, peak {result['peak_bytes'] / 1024:,.1f} KiB")
+        if UPDATE:
+            baseline[name] = result
+            return
+        if name not in baseline:
+            pytest.fail(f"no baseline for {name}; run with BENCH_UPDATE=1 to record one")
+
+        expected = baseline[name]
+        floor = expected["relative_throughput"] * (1 - MAX_SLOWDOWN)
+        assert result["relative_throughput"] >= floor, (
+            f"{name} throughput regressed: {result['relative_throughput']} < {floor:.4f} "
+            f"(baseline {expected['relative_throughput']})"
+        )
+        ceiling = expected["peak_bytes"] * (1 + MAX_ALLOC_GROWTH) + ALLOC_SLACK_BYTES
+        assert result["peak_bytes"] <= ceiling, (
+            f"{name} allocations regressed: {result['peak_bytes']} B > {ceiling:.0f} B "
+            f"(baseline {expected['peak_bytes']} B)"
+        )
+
+    return _check
+
+
+def _thread(chatbot, n: int) -> list:
+    ChatMessage, Role, TextContent = chatbot.ChatMessage, chatbot.Role, chatbot.TextContent
+    return [
+        ChatMessage(
+            role=Role.USER if i % 2 == 0 else Role.ASSISTANT,
+            contents=[TextContent(text=f"turn {i}: "), TextContent(text="how do I rotate the storage key?")],
+        )
+        for i in range(n)
+    ]
+
+
+def _synthetic_stream(n: int = STREAM_CHUNKS) -> list:
+    chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=f"word{i} "))]) for i in range(n)]
+    # Role-only first chunk and a usage-only last chunk, as the service sends them
+    chunks.insert(0, SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None))]))
+    chunks.append(SimpleNamespace(choices=[]))
+    return chunks
+
+
+def _drain(agen) -> int:
+    async def consume():
+        count = 0
+        async for _ in agen:
+            count += 1
+        return count
+
+    return asyncio.run(consume())
+
+
+# ----- cases -------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("n", [10, 100, 1_000, 10_000])
+def test_extract_text(chatbot, check, n):
+    agent = chatbot.ChatbotAgent()
+    messages = _thread(chatbot, n)
+    assert len(agent._extract_text(messages)) == n
+    check(f"extract_text[{n}]", lambda: agent._extract_text(messages), items=n)
+
+
+@pytest.mark.parametrize("redact", [False, True], ids=["plain", "redacted"])
+def test_run_stream_chunks(chatbot, check, redact):
+    agent = chatbot.ChatbotAgent()
+    agent._redactor_built = True
+    if redact:
+        from redaction import Redactor
+
+        agent._redactor = Redactor()
+    chunks = _synthetic_stream()
+    agent._create_completion = lambda messages, stream=False: iter(chunks)
+
+    assert _drain(agent.run_stream("hi")) >= 1
+    check(f"run_stream[{'redacted' if redact else 'plain'}]", lambda: _drain(agent.run_stream("hi")), items=STREAM_CHUNKS)
+
+
+def test_token_cached(chatbot, check):
+    agent = chatbot.ChatbotAgent()
+    token = SimpleNamespace(token="t", expires_on=time.time() + 3600)
+    agent._credential = SimpleNamespace(get_token=lambda scope: token)
+    assert agent._get_token() == "t"
+    check("get_token[cached]", agent._get_token)
+
+
+def test_token_refresh(chatbot, check):
+    agent = chatbot.ChatbotAgent()
+    # Always inside the refresh margin, so every call takes the lock and re-fetches
+    token = SimpleNamespace(token="t", expires_on=time.time() + chatbot.TOKEN_REFRESH_MARGIN_S / 2)
+    agent._credential = SimpleNamespace(get_token=lambda scope: token)
+    check("get_token[refresh]", agent._get_token)
+
+
+def test_hosted_run_stream_unpaced(hosted_main, check):
+    agent = hosted_main.MyHostedAgent(stream_delay_s=0)
+    request = SimpleNamespace(
+        input=SimpleNamespace(messages=[SimpleNamespace(role=hosted_main.Role.USER, content="hello " * 50)]),
+        thread=None,
+    )
+    words = len(agent._generate_response("hello " * 50).split())
+    assert _drain(agent.run_stream(request)) == words
+    check("hosted_run_stream[unpaced]", lambda: _drain(agent.run_stream(request)), items=words)
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from cassettes import AsyncCassetteTransport, Cassette, CassetteAdapter, CassetteMiss, CassetteTransport  # noqa: E402
+
+SSE_CHUNKS = [b'data: {"delta": "Hel"}\n\n', b'data: {"delta": "lo"}\n\n', b"data: [DONE]\n\n"]
+CHUNK_GAP_S = 0.05
+
+
+class _SlowStream(httpx.SyncByteStream):
+    def __iter__(self):
+        for chunk in SSE_CHUNKS:
+            time.sleep(CHUNK_GAP_S)
+            yield chunk
+
+
+class _AsyncSlowStream(httpx.AsyncByteStream):
+    async def __aiter__(self):
+        for chunk in SSE_CHUNKS:
+            await asyncio.sleep(CHUNK_GAP_S)
+            yield chunk
+
+
+class _Live:
+    """Counts calls to the fake live service."""
+
+    def __init__(self, stream_cls=_SlowStream):
+        self.calls = 0
+        self.stream_cls = stream_cls
+
+    def __call__(self, request):
+        self.calls += 1
+        if request.url.path.endswith("/status"):
+            return httpx.Response(200, json={"status": "done", "call": self.calls})
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream", "x-request-id": "abc"},
+            stream=self.stream_cls(),
+        )
+
+
+def _stream_body(client, payload):
+    with client.stream("POST", "https://one.example/openai/chat", json=payload, headers={"Authorization": "Bearer s3cret"}) as r:
+        return r.status_code, r.headers.get("content-type"), list(r.iter_raw())
+
+
+def test_httpx_record_then_replay(tmp_path):
+    path = tmp_path / "chat.json"
+    live = _Live()
+    with Cassette(path, mode="record") as cassette:
+        client = httpx.Client(transport=CassetteTransport(cassette, httpx.MockTransport(live)))
+        recorded = _stream_body(client, {"messages": [{"role": "user", "content": "hi"}], "stream": True})
+    assert live.calls == 1
+    assert recorded[2] == SSE_CHUNKS
+
+    cassette = Cassette(path, mode="replay")
+    client = httpx.Client(transport=CassetteTransport(cassette, httpx.MockTransport(live)))
+    # Same body with different key order and a different host still matches
+    replayed = _stream_body(client, {"stream": True, "messages": [{"content": "hi", "role": "user"}]})
+    assert replayed == recorded
+    assert live.calls == 1
+
+
+def test_secrets_are_not_written(tmp_path):
+    path = tmp_path / "chat.json"
+    with Cassette(path, mode="record") as cassette:
+        client = httpx.Client(transport=CassetteTransport(cassette, httpx.MockTransport(_Live())))
+        _stream_body(client, {"q": 1})
+    text = path.read_text()
+    assert "s3cret" not in text
+    assert "authorization" not in text.lower()
+
+
+def test_replay_timing_fast_and_real(tmp_path):
+    path = tmp_path / "chat.json.gz"
+    with Cassette(path, mode="record") as cassette:
+        client = httpx.Client(transport=CassetteTransport(cassette, httpx.MockTransport(_Live())))
+        _stream_body(client, {"q": 1})
+
+    timings = {}
+    for timing in ("fast", "real"):
+        client = httpx.Client(transport=CassetteTransport(Cassette(path, mode="replay", timing=timing)))
+        started = time.perf_counter()
+        _stream_body(client, {"q": 1})
+        timings[timing] = time.perf_counter() - started
+
+    recorded_s = CHUNK_GAP_S * len(SSE_CHUNKS)
+    assert timings["fast"] < recorded_s / 2
+    assert timings["real"] >= recorded_s * 0.8
+
+
+def test_replay_miss_raises(tmp_path):
+    cassette = Cassette(tmp_path / "empty.json", mode="replay")
+    client = httpx.Client(transport=CassetteTransport(cassette))
+    with pytest.raises(CassetteMiss):
+        client.get("https://one.example/not-recorded")
+
+
+def test_repeated_requests_replay_in_order_then_auto_goes_live(tmp_path):
+    path = tmp_path / "poll.json"
+    live = _Live()
+    with Cassette(path, mode="record") as cassette:
+        client = httpx.Client(transport=CassetteTransport(cassette, httpx.MockTransport(live)))
+        recorded = [client.get("https://one.example/runs/1/status").json()["call"] for _ in range(2)]
+
+    replay = httpx.Client(transport=CassetteTransport(Cassette(path, mode="replay")))
+    assert [replay.get("https://one.example/runs/1/status").json()["call"] for _ in range(3)] == recorded + recorded[-1:]
+
+    auto = httpx.Client(transport=CassetteTransport(Cassette(path, mode="auto"), httpx.MockTransport(live)))
+    calls = [auto.get("https://one.example/runs/1/status").json()["call"] for _ in range(3)]
+    assert calls[:2] == recorded and calls[2] == 3
+
+
+def test_async_transport_replay(tmp_path):
+    path = tmp_path / "chat.json"
+    live = _Live(_AsyncSlowStream)
+
+    async def fetch(cassette, inner=None):
+        async with httpx.AsyncClient(transport=AsyncCassetteTransport(cassette, inner)) as client:
+            async with client.stream("POST", "https://one.example/openai/chat", json={"q": 1}) as r:
+                return [chunk async for chunk in r.aiter_raw()]
+
+    with Cassette(path, mode="record") as cassette:
+        recorded = asyncio.run(fetch(cassette, httpx.MockTransport(live)))
+    replayed = asyncio.run(fetch(Cassette(path, mode="replay")))
+    assert recorded == replayed == SSE_CHUNKS
+    assert live.calls == 1
+
+
+@pytest.fixture
+def chunked_server():
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            calls.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in SSE_CHUNKS:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+                time.sleep(CHUNK_GAP_S)
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", calls
+    server.shutdown()
+
+
+def test_requests_adapter_record_then_replay(tmp_path, chunked_server):
+    requests = pytest.importorskip("requests")
+    url, calls = chunked_server
+    path = tmp_path / "agents.json"
+
+    def run_stream(cassette):
+        session = requests.Session()
+        session.mount("http://", CassetteAdapter(cassette))
+        with session.post(f"{url}/threads/runs", json={"stream": True}, stream=True) as r:
+            return r.status_code, b"".join(r.iter_content(None))
+
+    with Cassette(path, mode="record") as cassette:
+        recorded = run_stream(cassette)
+    assert recorded == (200, b"".join(SSE_CHUNKS))
+
+    replay = Cassette(path, mode="replay", timing="real")
+    started = time.perf_counter()
+    assert run_stream(replay) == recorded
+    assert time.perf_counter() - started >= CHUNK_GAP_S * (len(SSE_CHUNKS) - 1) * 0.8
+    assert len(calls) == 1
+
+    # Non-streaming reads (what most azure-core calls do) replay too
+    session = requests.Session()
+    session.mount("http://", CassetteAdapter(Cassette(path, mode="replay")))
+    assert session.post(f"{url}/threads/runs", json={"stream": True}).content == recorded[1]
+
+
+# ----- replay without Azure sign-in ---------------------------------------------
+
+
+@pytest.fixture
+def replay_env(monkeypatch, tmp_path):
+    import cassettes
+
+    path = tmp_path / "run.json"
+    monkeypatch.setenv("CASSETTE", str(path))
+    monkeypatch.setenv("CASSETTE_MODE", "replay")
+    monkeypatch.setattr(cassettes, "_env_cassette", None)
+
+    def no_sign_in(*args, **kwargs):
+        raise AssertionError("DefaultAzureCredential built during a replay")
+
+    identity = pytest.importorskip("azure.identity")
+    monkeypatch.setattr(identity, "DefaultAzureCredential", no_sign_in)
+    return path
+
+
+def test_factory_credential_is_static_when_replaying(replay_env, monkeypatch):
+    import foundry_clients
+
+    monkeypatch.setattr(foundry_clients, "_shared", {})
+    monkeypatch.setattr(foundry_clients, "_tokens", {})
+    assert foundry_clients.get_token() == "replay"
+
+
+def test_chatbot_agent_replays_without_credentials(replay_env, monkeypatch):
+    pytest.importorskip("agent_framework")
+    openai = pytest.importorskip("openai")
+    import importlib.util
+
+    completion = {
+        "id": "c1", "object": "chat.completion", "created": 0, "model": "gpt-5-nano",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "recorded reply"}}],
+    }
+    messages = [{"role": "system", "content": "You are a helpful AI assistant."}, {"role": "user", "content": "hi"}]
+    with Cassette(replay_env, mode="record") as cassette:
+        transport = CassetteTransport(cassette, httpx.MockTransport(lambda request: httpx.Response(200, json=completion)))
+        client = openai.AzureOpenAI(
+            azure_endpoint="https://recorded.example", api_version="2024-12-01-preview", api_key="k",
+            http_client=httpx.Client(transport=transport),
+        )
+        client.chat.completions.create(model="gpt-5-nano", messages=messages, stream=False)
+
+    monkeypatch.setenv("AZURE_AI_PROJECT_ENDPOINT", "https://replayed.example/api/projects/p")
+    agent_dir = Path(__file__).resolve().parents[1] / "02-azd-deploy-hosted-agent" / "src" / "my-hosted-agent"
+    sys.path.insert(0, str(agent_dir))
+    spec = importlib.util.spec_from_file_location("chatbot_main_replay", agent_dir / "main.py")
+    main = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(main)
+
+    agent = main.ChatbotAgent()
+    agent._redactor_built = True
+    response = asyncio.run(agent.run("hi"))
+    assert response.text == "recorded reply"
@@ -0,0 +1,117 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "02-azd-deploy-hosted-agent"))
+try:
+    import deploy_pipeline  # noqa: E402
+except ImportError as exc:  # hosted agent models ship in the azure-ai-projects 2.0 previews
+    pytest.skip(f"deploy_pipeline imports unavailable: {exc}", allow_module_level=True)
+
+
+def _rules(*patterns):
+    return [(deploy_pipeline._glob_regex(p.lstrip("!")), p.startswith("!")) for p in patterns]
+
+
+@pytest.mark.parametrize(
+    "pattern, path, ignored",
+    [
+        ("__pycache__", "__pycache__/main.cpython-311.pyc", True),
+        ("*.pyc", "main.pyc", True),
+        ("*.pyc", "pkg/main.pyc", False),  # like docker: no implicit **
+        ("**/*.pyc", "pkg/sub/main.pyc", True),
+        ("**/*.pyc", "main.pyc", True),
+        ("docs/**", "docs/a/b.md", True),
+        ("a?c", "abc", True),
+        ("[ab]x", "cx", False),
+        ("*.md", "main.py", False),
+    ],
+)
+def test_dockerignore_patterns(pattern, path, ignored):
+    assert deploy_pipeline.is_ignored(path, _rules(pattern)) is ignored
+
+
+def test_last_matching_rule_wins():
+    rules = _rules("*.md", "!README.md")
+    assert deploy_pipeline.is_ignored("notes.md", rules)
+    assert not deploy_pipeline.is_ignored("README.md", rules)
+
+
+def test_content_tag_follows_dockerignore(tmp_path):
+    (tmp_path / "Dockerfile").write_text("FROM python:3.11-slim\n")
+    (tmp_path / "main.py").write_text("print('hi')\n")
+    (tmp_path / ".dockerignore").write_text("# local junk\n*.md\n!README.md\n./cache/\nDockerfile\n")
+    tag = deploy_pipeline.content_tag(tmp_path)
+
+    (tmp_path / "notes.md").write_text("not in the image")
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache" / "blob").write_text("x")
+    assert deploy_pipeline.content_tag(tmp_path) == tag
+
+    (tmp_path / "README.md").write_text("sent to docker")
+    assert deploy_pipeline.content_tag(tmp_path) != tag
+
+    # Docker sends the Dockerfile even when .dockerignore lists it
+    tag = deploy_pipeline.content_tag(tmp_path)
+    (tmp_path / "Dockerfile").write_text("FROM python:3.12-slim\n")
+    assert deploy_pipeline.content_tag(tmp_path) != tag
+
+
+class _Login:
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        self.returncode = None
+        self.stderr = open(__file__)  # any real pipe-like file
+        self.terminated = False
+        _Login.instances.append(self)
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.terminated = True
+        self.returncode = -15
+
+    def communicate(self):
+        self.stderr.close()
+        if self.returncode is None:
+            self.returncode = 0
+        return None, ""
+
+
+@pytest.mark.parametrize("exists", [True, False], ids=["registry-hit", "build-fails"])
+def test_login_process_is_reaped(monkeypatch, tmp_path, exists):
+    _Login.instances.clear()
+    monkeypatch.setattr(deploy_pipeline.subprocess, "Popen", _Login)
+    monkeypatch.setattr(deploy_pipeline, "image_exists", lambda *args: exists)
+
+    def fail(cmd, check):
+        raise subprocess.CalledProcessError(1, cmd)
+
+    monkeypatch.setattr(deploy_pipeline.subprocess, "run", fail)
+    if exists:
+        deploy_pipeline.build_and_push("acr", "repo", source_dir=tmp_path)
+    else:
+        with pytest.raises(subprocess.CalledProcessError):
+            deploy_pipeline.build_and_push("acr", "repo", source_dir=tmp_path)
+
+    (login,) = _Login.instances
+    assert login.terminated and login.stderr.closed
+
+
+def test_deploy_with_pinned_image_skips_build(monkeypatch):
+    monkeypatch.setattr(deploy_pipeline, "build_and_push", lambda *a, **k: pytest.fail("built a pinned image"))
+    created = []
+
+    class _Agents:
+        def create_version(self, agent_name, description, definition):
+            created.append(definition.image)
+            return type("Version", (), {"version": "7"})()
+
+    client = type("Client", (), {"agents": _Agents()})()
+    spec = deploy_pipeline.HostedAgentSpec(agent_name="echo", description="echo")
+    image, versions, _ = deploy_pipeline.deploy(client, "acr", "repo", [spec], start=False, image="acr.azurecr.io/repo:v8")
+    assert (image, versions, created) == ("acr.azurecr.io/repo:v8", {"echo": "7"}, ["acr.azurecr.io/repo:v8"])
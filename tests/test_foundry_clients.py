@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import foundry_clients  # noqa: E402
+
+
+def test_close_all_drops_every_shared_transport(monkeypatch):
+    monkeypatch.delenv("CASSETTE", raising=False)
+    foundry_clients.get_requests_session()
+    foundry_clients.get_httpx_client()
+    assert {"requests", "httpx"} <= foundry_clients.pool_stats().keys()
+
+    foundry_clients.close_all()
+    stats = foundry_clients.pool_stats()
+    assert "requests" not in stats and "httpx" not in stats
+    assert not {"requests_session", "requests_adapter", "httpx"} & foundry_clients._shared.keys()
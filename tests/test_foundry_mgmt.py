@@ -0,0 +1,58 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import foundry_mgmt  # noqa: E402
+
+
+def _profile(tmp_path, subscriptions):
+    text = json.dumps({"subscriptions": subscriptions})
+    (tmp_path / "azureProfile.json").write_text("\ufeff" + text, encoding="utf-8")  # the CLI writes a BOM
+
+
+def test_default_subscription_is_the_cli_default(monkeypatch, tmp_path):
+    monkeypatch.delenv("AZURE_SUBSCRIPTION_ID", raising=False)
+    monkeypatch.setenv("AZURE_CONFIG_DIR", str(tmp_path))
+    _profile(tmp_path, [{"id": "first", "isDefault": False, "state": "Enabled"}, {"id": "chosen", "isDefault": True}])
+    assert foundry_mgmt.default_subscription_id() == "chosen"
+
+    monkeypatch.setenv("AZURE_SUBSCRIPTION_ID", "from-env")
+    assert foundry_mgmt.default_subscription_id() == "from-env"
+
+
+def test_no_default_subscription_raises(monkeypatch, tmp_path):
+    monkeypatch.delenv("AZURE_SUBSCRIPTION_ID", raising=False)
+    monkeypatch.setenv("AZURE_CONFIG_DIR", str(tmp_path))
+    with pytest.raises(ValueError, match="AZURE_SUBSCRIPTION_ID"):
+        foundry_mgmt.default_subscription_id()
+
+
+def test_role_assignments_filter_on_the_resolved_object_id(monkeypatch):
+    def graph_batch(reads):
+        assert reads == {
+            "app:app-1": "/servicePrincipals(appId='app-1')",
+            "obj:app-1": "/servicePrincipals/app-1",
+            "app:obj-2": "/servicePrincipals(appId='obj-2')",
+            "obj:obj-2": "/servicePrincipals/obj-2",
+        }
+        return {
+            "app:app-1": (200, {"id": "obj-1", "appId": "app-1"}),
+            "obj:app-1": (404, {}),
+            "app:obj-2": (404, {}),
+            "obj:obj-2": (200, {"id": "obj-2", "appId": "app-2"}),
+        }
+
+    monkeypatch.setattr(foundry_mgmt, "graph_batch", graph_batch)
+    sps = foundry_mgmt.service_principals(["app-1", "obj-2"])
+    assert {k: v["id"] for k, v in sps.items()} == {"app-1": "obj-1", "obj-2": "obj-2"}
+
+    url, _ = foundry_mgmt.FoundryProject("sub", "rg", "acct", "proj").role_assignments(sps["app-1"]["id"])
+    assert url.endswith("$filter=assignedTo('obj-1')")
+
+
+def test_account_urls_need_no_project():
+    url, _ = foundry_mgmt.FoundryAccount("sub", "rg", "acct").deployments()
+    assert url.endswith("/resourceGroups/rg/providers/Microsoft.CognitiveServices/accounts/acct/deployments")
@@ -0,0 +1,140 @@
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "02-azd-deploy-hosted-agent" / "src" / "my-hosted-agent"))
+from hedging import HedgedCompletions  # noqa: E402
+
+HEDGE_DELAY_S = 0.1
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class _Stream:
+    """A streamed completion whose first token arrives after `ttft_s`."""
+
+    def __init__(self, name, ttft_s):
+        self.name = name
+        self.ttft_s = ttft_s
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        yield _chunk(None)  # role-only chunk, as the service sends first
+        if self.closed.wait(self.ttft_s):
+            return
+        for word in ("hello ", "from ", self.name):
+            yield _chunk(word)
+
+    def close(self):
+        self.closed.set()
+
+
+class _Client:
+    def __init__(self, name, ttft_s=0.0, error=None):
+        self.name = name
+        self.ttft_s = ttft_s
+        self.error = error
+        self.calls = []  # (time of call, stream)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, stream, **kwargs):
+        if self.error is not None:
+            self.calls.append((time.perf_counter(), None))
+            raise self.error
+        response = _Stream(self.name, self.ttft_s)
+        self.calls.append((time.perf_counter(), response))
+        if not stream:
+            time.sleep(self.ttft_s)
+            return f"completion from {self.name}"
+        return response
+
+
+def _hedger(primary, backup, **kwargs):
+    kwargs.setdefault("initial_delay_s", HEDGE_DELAY_S)
+    kwargs.setdefault("max_hedge_rate", 1.0)
+    return HedgedCompletions(primary, "primary-model", backup, "backup-model", **kwargs)
+
+
+def _text(stream):
+    return "".join(c.choices[0].delta.content or "" for c in stream if c.choices)
+
+
+def _closer_finished(timeout_s=1.0):
+    deadline = time.perf_counter() + timeout_s
+    while time.perf_counter() < deadline:
+        if not any(t.name == "hedge-close" for t in threading.enumerate()):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_fast_primary_never_hedges():
+    primary, backup = _Client("primary", ttft_s=0.01), _Client("backup")
+    hedger = _hedger(primary, backup)
+
+    assert _text(hedger.create(messages=[], stream=True)) == "hello from primary"
+    assert backup.calls == []
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_backup_fires_only_after_the_delay_and_first_token_wins():
+    primary, backup = _Client("primary", ttft_s=2.0), _Client("backup", ttft_s=0.01)
+    hedger = _hedger(primary, backup)
+
+    started = time.perf_counter()
+    assert _text(hedger.create(messages=[], stream=True)) == "hello from backup"
+    (backup_at, _), = backup.calls
+    assert backup_at - started >= HEDGE_DELAY_S * 0.9
+    assert time.perf_counter() - started < 1.0
+    assert hedger.stats()["hedged"] == 1
+
+    # The losing primary notices the cancellation, closes its stream and still reports back,
+    # so the closer thread exits right away instead of waiting out its timeout.
+    (_, primary_stream), = primary.calls
+    assert primary_stream.closed.wait(3)
+    assert _closer_finished()
+
+
+def test_slow_backup_loses_and_is_closed():
+    primary, backup = _Client("primary", ttft_s=0.2), _Client("backup", ttft_s=0.5)
+    hedger = _hedger(primary, backup)
+
+    assert _text(hedger.create(messages=[], stream=True)) == "hello from primary"
+    # The backup can only see the cancellation between chunks: it closes itself at its first token
+    (_, backup_stream), = backup.calls
+    assert backup_stream.closed.wait(2)
+    assert _closer_finished()
+
+
+def test_hedge_rate_is_capped():
+    primary, backup = _Client("primary", ttft_s=0.2), _Client("backup", ttft_s=0.01)
+    hedger = _hedger(primary, backup, max_hedge_rate=0.0)
+
+    assert _text(hedger.create(messages=[], stream=True)) == "hello from primary"
+    assert backup.calls == []
+
+
+def test_primary_failure_fails_over_without_hedge_budget():
+    primary = _Client("primary", error=RuntimeError("503"))
+    backup = _Client("backup", ttft_s=0.01)
+    hedger = _hedger(primary, backup, max_hedge_rate=0.0)
+
+    assert _text(hedger.create(messages=[], stream=True)) == "hello from backup"
+    assert len(backup.calls) == 1
+
+
+def test_both_failing_raises():
+    hedger = _hedger(_Client("primary", error=RuntimeError("503")), _Client("backup", error=ValueError("400")))
+    with pytest.raises(ValueError):
+        hedger.create(messages=[], stream=True)
+
+
+def test_non_streaming_returns_completion():
+    hedger = _hedger(_Client("primary", ttft_s=0.01), _Client("backup"))
+    assert hedger.create(messages=[]) == "completion from primary"
@@ -0,0 +1,120 @@
+"""Tests for intro_engine.py: frame coalescing, drift-corrected holds, batched typing and headless export."""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import intro_engine as ie  # noqa: E402
+
+
+class RecordingTerminal:
+    def __init__(self, clock=None):
+        self.clock = clock
+        self.writes = []  # (time, data)
+
+    def write(self, data):
+        self.writes.append((self.clock.now() if self.clock else 0.0, data))
+
+    @property
+    def text(self):
+        return "".join(data for _, data in self.writes)
+
+
+class SteppingClock:
+    """Virtual clock; every write or sleep can be made to cost extra time to simulate lag."""
+
+    def __init__(self, oversleep_s=0.0):
+        self.t = 0.0
+        self.oversleep_s = oversleep_s
+        self.sleeps = []
+
+    def now(self):
+        return self.t
+
+    def sleep_until(self, t):
+        if t > self.t:
+            self.sleeps.append(t - self.t)
+            self.t = t + self.oversleep_s
+
+
+def _play(scenes, clock, **kwargs):
+    terminal = RecordingTerminal(clock)
+    ie.Player(terminal=terminal, clock=clock, **kwargs).play(scenes)
+    return terminal
+
+
+def test_steps_until_a_hold_are_one_write():
+    scene = ie.Scene("s", [ie.clear(), ie.show("a"), ie.show("b", "c"), ie.show("d", hold=1), ie.show("e")])
+    terminal = _play([scene], SteppingClock())
+
+    first, second = (data for _, data in terminal.writes)
+    assert first == ie.HIDE_CURSOR + ie.CLEAR_SCREEN + "a\nb\nc\nd\n"
+    assert second == "e\n" + ie.RESET + ie.SHOW_CURSOR
+
+
+def test_holds_are_drift_corrected():
+    # Every sleep overshoots by 50 ms; the schedule still lands each frame on its slot
+    clock = SteppingClock(oversleep_s=0.05)
+    scene = ie.Scene("s", [ie.show(str(i), hold=0.5) for i in range(10)])
+    terminal = _play([scene], clock)
+
+    frame_times = [t for t, _ in terminal.writes[:10]]
+    assert frame_times[-1] <= 0.5 * 9 + 0.05 + 1e-9
+    assert all(abs(s - 0.45) < 1e-9 for s in clock.sleeps[1:])
+
+
+def test_type_fast_batches_characters():
+    clock = SteppingClock(oversleep_s=0.02)  # a slow terminal: several characters due per wake-up
+    scene = ie.Scene("s", [ie.type_fast("x" * 100, ie.GREEN, char_s=0.005), ie.show("done")])
+    terminal = _play([scene], clock)
+
+    typed = [data for _, data in terminal.writes if ie.GREEN in data]
+    assert "".join(typed).replace(ie.HIDE_CURSOR, "").replace(ie.GREEN, "").replace(ie.RESET, "") == "x" * 100
+    assert len(typed) < 30
+    assert clock.now() >= 100 * 0.005
+
+
+def test_speed_scales_the_timeline():
+    clock = SteppingClock()
+    _play([ie.Scene("s", [ie.show("a", hold=2), ie.pause(1)])], clock, speed=4)
+    assert clock.now() == 0.75
+
+
+def test_render_is_headless_and_reports_budgets():
+    scene = ie.Scene("s", [ie.show("a", hold=1.5), ie.type_fast("abc", char_s=0.1)], budget_s=2)
+    started = time.perf_counter()
+    timings, recorder = ie.render([scene, ie.Scene("end", [ie.show("z")])])
+    assert time.perf_counter() - started < 0.1
+
+    (s, end) = timings
+    assert (s.start_s, s.end_s, end.duration_s) == (0.0, 1.8, 0.0)
+    assert ie.over_budget(timings) == [s]
+    report = ie.format_report(timings)
+    assert "-0.20s  UNDER" in report and "end" in report
+
+
+def test_cast_file_is_asciicast_v2(tmp_path):
+    timings, recorder = ie.render([ie.Scene("s", [ie.clear(), ie.show("héllo", hold=1), ie.show("bye")])])
+    path = recorder.save(tmp_path / "out" / "intro.cast", title="t", cols=100, rows=40)
+
+    header, *events = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert header == {"version": 2, "width": 100, "height": 40, "env": {"TERM": "xterm-256color"}, "title": "t"}
+    assert [(t, kind) for t, kind, _ in events] == [(0.0, "o"), (1.0, "o")]
+    assert "héllo\r\n" in events[0][2]
+    assert all("\n" not in data.replace("\r\n", "") for _, _, data in events)
+
+
+@pytest.mark.parametrize("script", ["shadow_agents.py", "demo-intro.py"])
+def test_intro_scripts_render_headless(script):
+    scenes = ie.load_scenes(REPO_ROOT / script)
+    timings, recorder = ie.render(scenes)
+
+    assert [t.name for t in timings] == [scene.name for scene in scenes]
+    assert 9 < timings[-1].end_s < 13  # "Duration: 10-12 seconds"
+    assert recorder.events[0][1].startswith(ie.HIDE_CURSOR + ie.CLEAR_SCREEN)
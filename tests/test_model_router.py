@@ -0,0 +1,198 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "01-agent-framework-foundry-hosted-agents"))
+from model_router import CHAT, REASONING, ModelRouter, Route, _is_throttle, classify  # noqa: E402
+
+
+def _router(timeout_s: float = 60.0) -> ModelRouter:
+    return ModelRouter(
+        Route(name=CHAT, deployment="gpt-4o-mini", slo_ms=2000, timeout_s=timeout_s),
+        Route(name=REASONING, deployment="o4-mini", slo_ms=8000, reasoning_effort="minimal", timeout_s=timeout_s),
+    )
+
+
+def _fill(router: ModelRouter, name: str, latency_ms: float, n: int = 10) -> None:
+    for _ in range(n):
+        router.stats[name].record(latency_ms)
+
+
+class _Throttled(Exception):
+    def __init__(self, message="rate limited", status_code=429, retry_after="3"):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers={"retry-after": retry_after})
+
+
+# ----- classify ----------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    ["", "hi", "What's the capital of France?", "thanks, that worked", "list my open tickets"],
+)
+def test_classify_chat(prompt):
+    assert classify(prompt) == CHAT
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    [
+        "Explain why the cache misses and compare the two designs",
+        "```python\ndef f(x): return x\n```",
+        "what is 17 * 23 + 4?",
+        "Why does it fail? Is it the config? Or the network?",
+        " ".join(["word"] * 70),
+    ],
+)
+def test_classify_reasoning(prompt):
+    assert classify(prompt) == REASONING
+
+
+# ----- select ------------------------------------------------------------------
+
+
+def test_select_uses_classification_with_fallback():
+    router = _router()
+    decision = router.select("hi")
+    assert (decision.route.name, decision.fallback.name, decision.reason) == (CHAT, REASONING, "classified")
+
+
+def test_select_skips_throttled_route():
+    router = _router()
+    router.stats[CHAT].throttled_until = time.monotonic() + 30
+    decision = router.select("hi")
+    assert (decision.route.name, decision.fallback) == (REASONING, None)
+
+
+def test_select_when_both_throttled_picks_first_to_recover():
+    router = _router()
+    router.stats[CHAT].throttled_until = time.monotonic() + 30
+    router.stats[REASONING].throttled_until = time.monotonic() + 5
+    decision = router.select("hi")
+    assert (decision.route.name, decision.fallback, decision.reason) == (REASONING, None, "both routes throttled")
+
+
+def test_select_has_no_fallback_to_a_throttled_route():
+    router = _router()
+    router.stats[REASONING].throttled_until = time.monotonic() + 30
+    decision = router.select("hi")
+    assert (decision.route.name, decision.fallback) == (CHAT, None)
+
+
+def test_select_moves_off_a_route_over_its_slo():
+    router = _router()
+    _fill(router, CHAT, 5000)
+    _fill(router, REASONING, 3000)
+    decision = router.select("hi")
+    assert (decision.route.name, decision.fallback.name) == (REASONING, CHAT)
+    assert "p95" in decision.reason
+
+    # ...but not when the other route is slower still
+    _fill(router, REASONING, 9000, n=50)
+    assert router.select("hi").route.name == CHAT
+
+
+# ----- throttle detection ------------------------------------------------------
+
+
+def test_is_throttle_reads_status_and_retry_after():
+    assert _is_throttle(_Throttled()) == (True, 3.0)
+    try:
+        try:
+            raise _Throttled(retry_after="bogus")
+        except _Throttled as inner:
+            raise RuntimeError("wrapped") from inner
+    except RuntimeError as outer:
+        assert _is_throttle(outer) == (True, 10.0)
+
+
+def test_is_throttle_ignores_429_in_message():
+    assert _is_throttle(ValueError("order 4291 not found")) == (False, 0.0)
+    assert _is_throttle(_Throttled("429 in text", status_code=500)) == (False, 0.0)
+
+
+# ----- run ---------------------------------------------------------------------
+
+
+class _Agent:
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.calls = 0
+
+    async def run(self, prompt):
+        self.calls += 1
+        if self.behaviour == "hang":
+            await asyncio.sleep(10)
+        if isinstance(self.behaviour, Exception):
+            raise self.behaviour
+        return f"{self.behaviour}: {prompt}"
+
+
+def _with_agents(router, chat, reasoning):
+    agents = {CHAT: _Agent(chat), REASONING: _Agent(reasoning)}
+    router._agent_for = lambda route, instructions, name: agents[route.name]
+    return agents
+
+
+def test_run_timeout_raises_p95_and_moves_traffic():
+    router = _router(timeout_s=0.01)
+    router.routes[CHAT].slo_ms = 5  # below the 10 ms timeout, so timeouts alone breach it
+    agents = _with_agents(router, "hang", "ok")
+
+    for _ in range(5):
+        result, decision, _ = asyncio.run(router.run("hi", "be brief"))
+        assert result == "ok: hi"
+
+    assert router.stats[CHAT].failures == 5
+    assert router.stats[CHAT].p95_ms() == 10.0  # timeout_s * 1000
+    assert router.select("hi").route.name == REASONING
+    asyncio.run(router.run("hi", "be brief"))
+    assert agents[CHAT].calls == 5
+
+
+def test_run_falls_back_on_throttle_and_cools_down():
+    router = _router()
+    agents = _with_agents(router, _Throttled(retry_after="30"), "ok")
+
+    result, decision, _ = asyncio.run(router.run("hi", "be brief"))
+    assert result == "ok: hi"
+    assert router.stats[CHAT].is_throttled()
+    assert router.select("hi").route.name == REASONING
+    assert agents[CHAT].calls == 1
+
+
+def test_run_does_not_retry_other_errors():
+    router = _router()
+    _with_agents(router, ValueError("bad request 429"), "ok")
+    with pytest.raises(ValueError):
+        asyncio.run(router.run("hi", "be brief"))
+
+
+def test_run_records_throttle_on_its_only_attempt():
+    router = _router()
+    router.stats[CHAT].throttled_until = time.monotonic() + 30  # so "hi" goes to reasoning with no fallback
+    _with_agents(router, "ok", _Throttled(retry_after="30"))
+
+    with pytest.raises(_Throttled):
+        asyncio.run(router.run("hi", "be brief"))
+    assert router.stats[REASONING].is_throttled()
+    assert router.stats[REASONING].failures == 1
+
+
+def test_run_waits_out_the_cooldown_when_both_routes_are_throttled():
+    router = _router()
+    router.stats[CHAT].throttled_until = time.monotonic() + 0.2
+    router.stats[REASONING].throttled_until = time.monotonic() + 30
+    agents = _with_agents(router, "ok", "reasoning")
+
+    started = time.monotonic()
+    result, decision, _ = asyncio.run(router.run("hi", "be brief"))
+    assert (result, decision.reason) == ("ok: hi", "both routes throttled")
+    assert time.monotonic() - started >= 0.15
+    assert agents[REASONING].calls == 0
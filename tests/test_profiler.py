@@ -0,0 +1,67 @@
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+AGENT_DIR = Path(__file__).resolve().parents[1] / "02-azd-deploy-hosted-agent" / "src" / "my-hosted-agent"
+sys.path.insert(0, str(AGENT_DIR))
+import profiler  # noqa: E402
+
+
+@pytest.fixture
+def start(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", tmp_path)
+    started = []
+
+    def _start(**kwargs):
+        started.append(profiler.start_profile(duration_s=30, interval_s=0.005, fmt="collapsed", **kwargs))
+        return started[-1]
+
+    yield _start
+    for p in started:
+        p.stop()
+        assert p.finished.wait(5)
+
+
+def test_callable_text_is_only_built_for_a_filtered_profile(start):
+    def text():
+        raise AssertionError("request text built without a filter")
+
+    with profiler.track_request(text):  # idle
+        pass
+    start()
+    with profiler.track_request(text):  # running, but unfiltered
+        pass
+
+
+def test_filtered_profile_tracks_matching_agent_requests(start):
+    pytest.importorskip("agent_framework")
+    spec = importlib.util.spec_from_file_location("chatbot_main_profiled", AGENT_DIR / "main.py")
+    main = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(main)
+
+    tracked = []
+    agent = main.ChatbotAgent()
+    agent._redactor_built = True
+    active = start(request_filter="invoice")
+
+    def create(messages, stream=False):
+        tracked.append(bool(active._tracked))
+        if stream:
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="ok"))])])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+    agent._create_completion = create
+
+    async def drive():
+        await agent.run("where is invoice 42?")
+        await agent.run("hello")
+        [u async for u in agent.run_stream(main.ChatMessage(role=main.Role.USER, text="invoice please"))]
+        [u async for u in agent.run_stream("hello")]
+
+    asyncio.run(drive())
+    assert tracked == [True, False, True, False]
+    assert not active._tracked  # untracked once each request ends
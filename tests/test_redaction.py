@@ -0,0 +1,138 @@
+import importlib.util
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+AGENT_DIR = Path(__file__).resolve().parents[1] / "02-azd-deploy-hosted-agent" / "src" / "my-hosted-agent"
+sys.path.insert(0, str(AGENT_DIR))
+import redaction  # noqa: E402
+from redaction import Redactor  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["+1 425-555-0100", "+14255550100", "+44 (20) 7946 0958", "(425) 555-0100", "425-555-0100", "425.555.0100"],
+)
+def test_phone_numbers_are_redacted(text):
+    assert Redactor().redact(f"call {text} today") == "call [PHONE] today"
+
+
+@pytest.mark.parametrize("text", ["order 4255550100", "ticket 12345678", "build 202410191230", "on 2024-10-19"])
+def test_bare_digit_runs_are_not_phones(text):
+    assert Redactor().redact(text) == text
+
+
+def test_stream_matches_whole_text_redaction():
+    redactor = Redactor(terms=["Project Falcon"])
+    text = "mail jane.doe@contoso.com or +1 425-555-0100 about project falcon, order 4255550100, ip 10.0.12.7"
+    for size in (1, 3, 7, 64):
+        stream = redactor.stream()
+        out = [stream.feed(text[i:i + size]) for i in range(0, len(text), size)] + [stream.flush()]
+        assert "".join(out) == redactor.redact(text)
+
+
+def _exported(provider, exporter):
+    tracer = provider.get_tracer("test")
+    with tracer.start_as_current_span("chat gpt-5-nano") as span:
+        span.set_attribute("gen_ai.prompt", "mail jane.doe@contoso.com about it")
+        span.set_attribute("gen_ai.usage.input_tokens", 12)
+        span.add_event("gen_ai.choice", {"message": "call +1 425-555-0100 today"})
+    provider.force_flush()
+    (exported,) = exporter.get_finished_spans()
+    return exported
+
+
+def test_exported_span_attributes_and_events_are_redacted():
+    in_memory = pytest.importorskip("opentelemetry.sdk.trace.export.in_memory_span_exporter")
+    exporter = in_memory.InMemorySpanExporter()
+    exported = _exported(redaction.redacting_tracer_provider([exporter], Redactor()), exporter)
+
+    assert exported.attributes["gen_ai.prompt"] == "mail [EMAIL] about it"
+    assert exported.attributes["gen_ai.usage.input_tokens"] == 12
+    assert exported.events[0].attributes["message"] == "call [PHONE] today"
+
+
+def _chatbot_main(name):
+    pytest.importorskip("agent_framework")
+    spec = importlib.util.spec_from_file_location(name, AGENT_DIR / "main.py")
+    main = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(main)
+    return main
+
+
+class _Server:
+    """The parts of the hosting adapter install_redacted_tracing() relies on."""
+
+    def init_tracing(self):
+        raise AssertionError("the adapter's own, unredacted tracing setup ran")
+
+    def get_trace_attributes(self):
+        return {"service.name": "azure.ai.agentserver"}
+
+
+def test_hosting_adapter_tracing_exports_redacted_spans(monkeypatch):
+    in_memory = pytest.importorskip("opentelemetry.sdk.trace.export.in_memory_span_exporter")
+    from opentelemetry import trace
+
+    main = _chatbot_main("chatbot_main_tracing")
+    exporter = in_memory.InMemorySpanExporter()
+    monkeypatch.setattr(main, "_span_exporters", lambda: [exporter])
+    providers = []
+    monkeypatch.setattr(trace, "set_tracer_provider", providers.append)
+
+    server = _Server()
+    main.install_redacted_tracing(server, Redactor())
+    server.init_tracing()  # what server.run() calls, once the process is about to serve
+
+    (provider,) = providers
+    exported = _exported(provider, exporter)
+    assert exported.attributes["gen_ai.prompt"] == "mail [EMAIL] about it"
+    assert exported.events[0].attributes["message"] == "call [PHONE] today"
+    assert exported.resource.attributes["service.name"] == "azure.ai.agentserver"
+
+
+def test_no_tracing_when_exporters_cannot_be_created(monkeypatch):
+    from opentelemetry import trace
+
+    main = _chatbot_main("chatbot_main_no_tracing")
+
+    def broken():
+        raise RuntimeError("no credential")
+
+    monkeypatch.setattr(main, "_span_exporters", broken)
+    monkeypatch.setattr(trace, "set_tracer_provider", lambda provider: pytest.fail("set an unredacted provider"))
+    server = _Server()
+    main.install_redacted_tracing(server, Redactor())
+    server.init_tracing()
+    assert server.tracer is not None
+
+
+def test_agent_builds_its_redactor_once_and_retries_after_a_failure(monkeypatch):
+    main = _chatbot_main("chatbot_main_redactor")
+    monkeypatch.setenv("REDACT_PII", "1")
+
+    builds = []
+
+    def from_env():
+        builds.append(threading.current_thread().name)
+        if len(builds) == 1:
+            raise OSError("REDACT_TERMS_FILE not readable yet")
+        time.sleep(0.05)  # slow enough for every caller to arrive while it builds
+        return Redactor()
+
+    monkeypatch.setattr(Redactor, "from_env", staticmethod(from_env))
+    agent = main.ChatbotAgent()
+    with pytest.raises(OSError):
+        agent.redactor
+
+    seen = []
+    callers = [threading.Thread(target=lambda: seen.append(agent.redactor)) for _ in range(8)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    assert len(builds) == 2
+    assert len(seen) == 8 and all(r is not None and r is seen[0] for r in seen)
@@ -0,0 +1,157 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "02-azd-deploy-hosted-agent" / "src" / "my-hosted-agent"))
+pytest.importorskip("agent_framework")
+import thread_store  # noqa: E402
+from thread_store import StoredAgentThread, ThreadStore, ThreadStoreMessageStore  # noqa: E402
+
+
+def _payloads(tid, start, n):
+    return [f"{tid}-{i:04d}".encode() + b"." * 40 for i in range(start, start + n)]
+
+
+def _segments(directory):
+    return sorted(p.name for p in Path(directory).glob("seg-*.log"))
+
+
+def test_reopen_truncates_torn_tail(tmp_path):
+    store = ThreadStore(tmp_path, max_messages=100)
+    store.append("a", _payloads("a", 0, 3))
+    store.close()
+
+    (segment,) = tmp_path.glob("seg-*.log")
+    intact = segment.stat().st_size
+    record = store._record_bytes(b"a", b"lost in the crash", 0, time.time(), 4, thread_store._MESSAGE)
+    with open(segment, "ab") as f:
+        f.write(record[: len(record) // 2])
+
+    store = ThreadStore(tmp_path, max_messages=100)
+    assert segment.stat().st_size == intact
+    assert store.read("a") == _payloads("a", 0, 3) and store.count("a") == 3
+
+    store.append("a", _payloads("a", 3, 1))
+    store.close()
+    store = ThreadStore(tmp_path, max_messages=100)
+    assert store.read("a") == _payloads("a", 0, 4)
+    store.close()
+
+
+def test_deleted_thread_stays_deleted_after_compact_and_reopen(tmp_path):
+    # seg 1: "gone" and plenty of live "keep"; seg 2: the tombstone and dead filler
+    store = ThreadStore(tmp_path, segment_bytes=2048, max_messages=1000)
+    store.append("gone", _payloads("gone", 0, 2))
+    store.append("keep", _payloads("keep", 0, 30))
+    store.delete("gone")
+    store.append("filler", _payloads("filler", 0, 30))
+    store.delete("filler")
+    store.append("tail", _payloads("tail", 0, 1))
+    assert len(_segments(tmp_path)) == 3
+
+    stats = store.compact(live_ratio=0.5)
+    # Only the mostly-dead seg 2 goes; seg 1 still holds "gone", so its tombstone moves on
+    assert stats["segments"] == 1 and _segments(tmp_path) == ["seg-00000001.log", "seg-00000003.log"]
+    store.close()
+
+    store = ThreadStore(tmp_path, segment_bytes=2048, max_messages=1000)
+    assert "gone" not in store and "filler" not in store
+    assert store.read("keep") == _payloads("keep", 0, 30)
+
+    store.compact(live_ratio=1.0)
+    store.close()
+    store = ThreadStore(tmp_path, segment_bytes=2048, max_messages=1000)
+    assert sorted(store._index) == ["keep", "tail"]
+    assert store.read("keep") == _payloads("keep", 0, 30) and store.read("tail") == _payloads("tail", 0, 1)
+    store.close()
+
+
+def test_compact_syncs_before_unlinking(tmp_path, monkeypatch):
+    store = ThreadStore(tmp_path, segment_bytes=512, max_messages=2, fsync=False)
+    store.append("a", _payloads("a", 0, 20))
+    store.append("a", _payloads("a", 20, 1))
+
+    events = []
+    monkeypatch.setattr(thread_store.os, "fsync", lambda fd: events.append("fsync"))
+    unlink = Path.unlink
+    monkeypatch.setattr(Path, "unlink", lambda self, *a: (events.append("unlink"), unlink(self, *a))[1])
+
+    assert store.compact(live_ratio=0.5)["segments"] == 1
+    assert events == ["fsync", "unlink"]
+    store.close()
+
+
+def test_ttl_expires_idle_threads(tmp_path):
+    store = ThreadStore(tmp_path, segment_bytes=512, max_messages=100, ttl_s=60)
+    store.append("idle", _payloads("idle", 0, 5), ts=time.time() - 120)
+    store.append("active", _payloads("active", 0, 5))
+    store.append("active", _payloads("active", 5, 1))  # rolls: the first segment is sealed
+
+    stats = store.compact(live_ratio=0.0)  # nothing is dead by retention; only the TTL applies
+    assert stats["threads_expired"] == 1
+    assert "idle" not in store and store.read("active") == _payloads("active", 0, 6)
+    store.close()
+
+    store = ThreadStore(tmp_path, segment_bytes=512, max_messages=100, ttl_s=60)
+    assert "idle" not in store and store.read("active") == _payloads("active", 0, 6)
+    store.close()
+
+
+def test_reads_racing_compaction_see_whole_suffixes(tmp_path):
+    store = ThreadStore(tmp_path, segment_bytes=4096, max_messages=8)
+    threads = [f"t{i}" for i in range(5)]
+    done = threading.Event()
+    errors = []
+
+    def reader():
+        while not done.is_set():
+            for tid in threads:
+                with store._lock:
+                    got, count = store.read(tid), store.count(tid)
+                start = count - len(got)
+                if got != _payloads(tid, start, len(got)) or len(got) != min(count, 8):
+                    errors.append((tid, got, count))
+
+    def compactor():
+        while not done.is_set():
+            store.compact(live_ratio=0.9)
+
+    workers = [threading.Thread(target=reader) for _ in range(2)] + [threading.Thread(target=compactor)]
+    for worker in workers:
+        worker.start()
+    try:
+        for turn in range(200):
+            for tid in threads:
+                store.append(tid, _payloads(tid, turn * 2, 2))
+    finally:
+        done.set()
+        for worker in workers:
+            worker.join()
+
+    assert errors == []
+    for tid in threads:
+        assert store.read(tid) == _payloads(tid, 392, 8)
+    store.close()
+
+
+def test_stored_thread_round_trips_through_deserialize(tmp_path):
+    from agent_framework import ChatMessage
+
+    store = ThreadStore(tmp_path)
+
+    async def scenario():
+        thread = StoredAgentThread(message_store=ThreadStoreMessageStore(store=store))
+        await thread.message_store.add_messages([ChatMessage(role="user", text="hi"), ChatMessage(role="assistant", text="hello")])
+        state = await thread.serialize()
+
+        restored = await StoredAgentThread.deserialize(state, store=store)
+        assert isinstance(restored.message_store, ThreadStoreMessageStore)
+        assert restored.message_store.thread_id == thread.message_store.thread_id
+        return [m.text for m in await restored.message_store.list_messages()]
+
+    assert asyncio.run(scenario()) == ["hi", "hello"]
+    store.close()
@@ -0,0 +1,131 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "10-tool-catalog-registration-in-foundry"))
+import tool_catalog  # noqa: E402
+from tool_catalog import ApiCenterSync, CatalogEntry, ToolCatalog  # noqa: E402
+
+
+def _api(name, etag, mcp_endpoint=None, stage="production", capabilities=(), tags=()):
+    custom = {"capabilities": list(capabilities), "tags": list(tags)}
+    if mcp_endpoint:
+        custom["mcpEndpoint"] = mcp_endpoint
+    return {"name": name, "etag": etag, "properties": {"kind": "mcp", "lifecycleStage": stage, "customProperties": custom}}
+
+
+def _deployments(url):
+    return {"value": [{"properties": {"server": {"runtimeUri": [url]}}}]}
+
+
+class _ApiCenter:
+    """Stands in for foundry_mgmt.arm_get / arm_get_many and counts detail fetches."""
+
+    def __init__(self, monkeypatch):
+        self.apis = []
+        self.deployments = {}
+        self.fetched = []
+        monkeypatch.setattr(tool_catalog, "arm_get", lambda url, api_version=None: {"value": list(self.apis)})
+        monkeypatch.setattr(tool_catalog, "arm_get_many", self.get_many)
+
+    def get_many(self, requests):
+        self.fetched += list(requests)
+        return {name: self.deployments[name] for name in requests}
+
+
+@pytest.fixture
+def center(monkeypatch):
+    return _ApiCenter(monkeypatch)
+
+
+def _sync(catalog):
+    return ApiCenterSync(catalog, "sub", "rg", "apic")
+
+
+def test_incremental_sync_only_fetches_changed_apis(center, tmp_path):
+    center.apis = [_api("tickets", "1", capabilities=["incident-management"]), _api("docs", "1", mcp_endpoint="https://docs/mcp")]
+    center.deployments = {"tickets": _deployments("https://tickets/mcp")}
+    catalog = ToolCatalog(tmp_path / "catalog.json")
+
+    stats = _sync(catalog).refresh(force=True)
+    assert (stats.listed, stats.fetched, stats.unchanged) == (2, 2, 0)
+    assert center.fetched == ["tickets"]  # docs has mcpEndpoint: no deployments call
+    assert catalog.get("tickets").url == "https://tickets/mcp"
+
+    center.fetched.clear()
+    center.apis[0] = _api("tickets", "2", capabilities=["incident-management"])
+    stats = _sync(catalog).refresh(min_interval_s=0)
+    assert (stats.fetched, stats.unchanged) == (1, 1) and center.fetched == ["tickets"]
+
+    # Within the minimum interval nothing is listed at all
+    center.apis = []
+    assert _sync(catalog).refresh().skipped
+
+
+def test_removed_apis_are_dropped_from_every_index(center, tmp_path):
+    center.apis = [_api("a", "1", mcp_endpoint="https://a/mcp", capabilities=["search"], tags=["team-x"]),
+                   _api("b", "1", mcp_endpoint="https://b/mcp", capabilities=["search"])]
+    catalog = ToolCatalog(tmp_path / "catalog.json")
+    _sync(catalog).refresh(force=True)
+
+    center.apis = center.apis[1:]
+    assert _sync(catalog).refresh(min_interval_s=0).removed == 1
+    assert catalog.get("a") is None
+    assert [e.name for e in catalog.find(capability="search")] == ["b"]
+    assert catalog.find(tag="team-x") == []
+    assert "team-x" not in catalog._by_tag
+
+    # and from the persisted file
+    assert ToolCatalog(tmp_path / "catalog.json").get("a") is None
+
+
+def test_failed_deployments_fetch_is_retried_next_sync(center, tmp_path):
+    center.apis = [_api("tickets", "1")]
+    center.deployments = {"tickets": RuntimeError("429 Too Many Requests")}
+    catalog = ToolCatalog(tmp_path / "catalog.json")
+
+    stats = _sync(catalog).refresh(force=True)
+    assert (stats.fetched, stats.failed) == (0, 1)
+    assert catalog.get("tickets") is None
+
+    center.deployments = {"tickets": _deployments("https://tickets/mcp")}
+    stats = _sync(catalog).refresh(min_interval_s=0)
+    assert (stats.fetched, stats.failed) == (1, 0)
+    assert catalog.get("tickets").url == "https://tickets/mcp"
+
+    # An entry already mirrored keeps its old URL and token when a refetch fails
+    center.apis = [_api("tickets", "2")]
+    center.deployments = {"tickets": RuntimeError("503")}
+    _sync(catalog).refresh(min_interval_s=0)
+    assert catalog.get("tickets").change_token == "1"
+    center.fetched.clear()
+    center.deployments = {"tickets": _deployments("https://tickets-v2/mcp")}
+    _sync(catalog).refresh(min_interval_s=0)
+    assert center.fetched == ["tickets"] and catalog.get("tickets").url == "https://tickets-v2/mcp"
+
+
+def test_indexes_follow_upserts(tmp_path):
+    catalog = ToolCatalog(tmp_path / "catalog.json")
+    catalog.upsert([CatalogEntry(name="a", kind="mcp", tags=["Team-X"], capabilities=["Search"])])
+    catalog.upsert([CatalogEntry(name="a", kind="mcp", tags=["team-y"], capabilities=["summarize"])])
+
+    assert catalog.find(capability="search") == [] and catalog.find(tag="team-x") == []
+    assert [e.name for e in catalog.find(capability=" SUMMARIZE ", tag="team-y")] == ["a"]
+    assert [e.name for e in catalog.find(capability="summarize", kind=None)] == ["a"]
+    assert catalog.find(capability="summarize", kind="rest") == []
+
+
+def test_resolve_prefers_production_and_skips_entries_without_url(tmp_path):
+    catalog = ToolCatalog(tmp_path / "catalog.json")
+    catalog.upsert([
+        CatalogEntry(name="beta", kind="mcp", url="https://beta/mcp", lifecycle_stage="preview", capabilities=["search"]),
+        CatalogEntry(name="prod", kind="mcp", url="https://prod/mcp", lifecycle_stage="production", capabilities=["search"]),
+        CatalogEntry(name="nourl", kind="mcp", lifecycle_stage="production", capabilities=["search"]),
+    ])
+    assert catalog.resolve(capability="search").name == "prod"
+    assert catalog.resolve(name="nourl").name == "nourl"
+    with pytest.raises(KeyError):
+        catalog.resolve(name="missing")
+    with pytest.raises(KeyError):
+        catalog.resolve(capability="billing")
@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "02-azd-deploy-hosted-agent"))
+try:
+    import wait_for_agent  # noqa: E402
+except ImportError as exc:
+    pytest.skip(f"wait_for_agent imports unavailable: {exc}", allow_module_level=True)
+
+
+class _Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class _Client:
+    """Answers container GETs in order; the typed agents API must not be needed."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        self._config = SimpleNamespace(api_version="2025-11-15-preview")
+
+    def send_request(self, request):
+        self.requests.append(request)
+        return self.responses.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    monkeypatch.setattr(wait_for_agent.time, "sleep", lambda s: None)
+
+
+def test_polls_the_container_in_process():
+    client = _Client(
+        _Response(404),  # container not created yet
+        _Response(503),
+        _Response(200, {"status": "Starting"}),
+        _Response(200, {"status": "Running", "error_message": None}),
+    )
+    timings = wait_for_agent.wait_until_running(client, "echo", "3")
+    assert timings.polls == 4 and timings.running_s is not None
+
+    request = client.requests[0]
+    assert request.method == "GET"
+    assert request.url.startswith("{endpoint}/agents/echo/versions/3/containers/default")
+    assert "api-version=2025-11-15-preview" in request.url
+
+
+def test_container_block_inside_a_version_payload():
+    client = _Client(_Response(200, {"status": "Active", "container": {"status": "Running"}}))
+    assert wait_for_agent.wait_until_running(client, "echo", "3").polls == 1
+
+
+def test_container_error_message_fails_the_wait():
+    client = _Client(_Response(200, {"status": "Starting", "error_message": "ImagePullBackOff"}))
+    with pytest.raises(RuntimeError, match="ImagePullBackOff"):
+        wait_for_agent.wait_until_running(client, "echo", "3")
+
+
+def test_auth_errors_are_not_polled_through():
+    client = _Client(_Response(403))
+    with pytest.raises(RuntimeError, match="403"):
+        wait_for_agent.wait_until_running(client, "echo", "3")